@@ -0,0 +1,47 @@
+"""
+批量路径计算基准测试：在随机权重的网格上比较逐对调用 dijkstra() 与 BatchRouter（不同工作进程数）
+计算同一组起讫点对的耗时。
+
+用法：python benchmarks/benchmark_batch_router.py [网格边长 起点数 每个起点的终点数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_contraction_hierarchies import build_grid
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.analysis.batch_router import BatchRouter
+
+
+def main(side, num_sources, targets_per_source):
+    network = build_grid(side)
+    rng = random.Random(0)
+    stops = list(network.stops)
+    pairs = [(source, rng.choice(stops)) for source in rng.sample(stops, num_sources)
+             for _ in range(targets_per_source)]
+    print(f"站点 {len(stops)}，起讫点对 {len(pairs)}，CPU {os.cpu_count()}")
+
+    sample = pairs[:200]
+    started = time.perf_counter()
+    for origin, destination in sample:
+        dijkstra(network, origin, destination)
+    per_pair = (time.perf_counter() - started) / len(sample)
+    print(f"逐对 dijkstra(): {per_pair * len(pairs):.2f}s（按 {len(sample)} 对估算）")
+
+    with tempfile.TemporaryDirectory() as directory:
+        router = BatchRouter.from_network(network, directory)
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            router.max_workers = workers
+            started = time.perf_counter()
+            count = sum(1 for _ in router.iter_routes(pairs))
+            assert count == len(pairs)
+            print(f"BatchRouter {workers} 个进程: {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [100, 200, 100]))
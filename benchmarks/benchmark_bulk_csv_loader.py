@@ -0,0 +1,59 @@
+"""
+CSV加载基准测试：比较 NetworkDataManager 原有的逐行加载（csv.DictReader + 每行 add_stop/add_route）
+与 bulk_load=True 的批量加载。
+
+生成的网络中每个站点有固定数量的出边，线路文件的行数 = 站点数 × 出度。
+
+用法：python benchmarks/benchmark_bulk_csv_loader.py [站点数 出度]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.core.csv_network_data_manager import NetworkDataManager
+
+
+def write_csv(directory, num_stops, out_degree, seed=0):
+    rng = np.random.default_rng(seed)
+    stops_path = os.path.join(directory, 'stops.csv')
+    routes_path = os.path.join(directory, 'routes.csv')
+    zones = ['RESIDENTIAL', 'COMMERCIAL', 'INDUSTRIAL', 'MIXED']
+    with open(stops_path, 'w', encoding='utf-8') as f:
+        f.write('stop_id,name,latitude,longitude,zone_type\n')
+        lats = 48.0 + rng.uniform(0, 1, num_stops)
+        lons = 2.0 + rng.uniform(0, 1, num_stops)
+        f.writelines(f'{i},Stop {i},{lat:.6f},{lon:.6f},{zones[i % 4]}\n'
+                     for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())))
+    with open(routes_path, 'w', encoding='utf-8') as f:
+        f.write('start_stop_id,end_stop_id,distance\n')
+        for start in range(num_stops):
+            # 每个站点连向后面的 out_degree 个站点，保证没有重复线路
+            ends = [(start + k) % num_stops for k in range(1, out_degree + 1)]
+            distances = rng.uniform(0.1, 5.0, out_degree).tolist()
+            f.writelines(f'{start},{end},{distance:.2f}\n' for end, distance in zip(ends, distances))
+    return stops_path, routes_path
+
+
+def main(num_stops, out_degree):
+    with tempfile.TemporaryDirectory() as directory:
+        stops_path, routes_path = write_csv(directory, num_stops, out_degree)
+        print(f"站点 {num_stops}，线路 {num_stops * out_degree}")
+        timings = {}
+        for label, bulk in (('逐行加载', False), ('批量加载', True)):
+            start = time.perf_counter()
+            manager = NetworkDataManager(stops_path, routes_path, bulk_load=bulk)
+            timings[label] = time.perf_counter() - start
+            num_routes = sum(len(routes) for routes in manager.network.adjacency_list.values())
+            print(f"{label}: {timings[label]:.2f}s，加载线路 {num_routes}")
+            del manager
+        print(f"加速比: {timings['逐行加载'] / timings['批量加载']:.1f}x")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [200000, 10]))
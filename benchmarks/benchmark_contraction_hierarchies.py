@@ -0,0 +1,62 @@
+"""
+收缩层次索引基准测试：在随机权重的双向网格上测量预处理时间、索引边数（相对原始边数的倍数），
+以及查询与Dijkstra的平均耗时，并抽样核对查询结果与Dijkstra一致。
+
+用法：python benchmarks/benchmark_contraction_hierarchies.py [网格边长 ...]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.algorithms.contraction_hierarchies import ContractionHierarchy
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+QUERIES = 200
+
+
+def build_grid(side, seed=0):
+    """side x side 的网格，相邻站点双向连通，两个方向的距离各自随机"""
+    rng = random.Random(seed)
+    network = TransportNetwork()
+    for i in range(side * side):
+        network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            for other in ((node + 1) if col + 1 < side else None, (node + side) if row + 1 < side else None):
+                if other is not None:
+                    network.add_route(node, other, rng.uniform(1, 10))
+                    network.add_route(other, node, rng.uniform(1, 10))
+    return network
+
+
+def main(sides):
+    print(f"{'stops':>8} {'routes':>8} {'build':>9} {'edges x':>8} {'CH query':>10} {'Dijkstra':>10}")
+    for side in sides:
+        network = build_grid(side)
+        num_routes = sum(len(routes) for routes in network.adjacency_list.values())
+        started = time.perf_counter()
+        hierarchy = ContractionHierarchy.build(network)
+        build_time = time.perf_counter() - started
+        ratio = len(hierarchy.middle) / num_routes
+
+        rng = random.Random(1)
+        pairs = [(rng.randrange(side * side), rng.randrange(side * side)) for _ in range(QUERIES)]
+        started = time.perf_counter()
+        results = [hierarchy.query(s, t)[1] for s, t in pairs]
+        query_time = (time.perf_counter() - started) / QUERIES
+        started = time.perf_counter()
+        expected = [dijkstra(network, s, t)[1] for s, t in pairs]
+        dijkstra_time = (time.perf_counter() - started) / QUERIES
+        assert all(abs(a - b) < 1e-9 for a, b in zip(results, expected))
+        print(f"{side * side:>8} {num_routes:>8} {build_time:>8.2f}s {ratio:>7.2f}x "
+              f"{query_time * 1000:>8.2f}ms {dijkstra_time * 1000:>8.2f}ms")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [30, 60, 100])
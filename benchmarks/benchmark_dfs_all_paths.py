@@ -0,0 +1,75 @@
+"""
+全路径枚举基准测试：在合成网格网络上比较旧版"复制路径 + 线性环路检查"的DFS
+与当前基于回溯栈 + visited位图的实现的吞吐量（路径/秒）。
+
+用法：python benchmarks/benchmark_dfs_all_paths.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.algorithms.dfs_all_paths_algorithm import iter_all_paths
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+
+
+def build_grid_network(rows, cols):
+    """rows x cols 的双向网格，相邻站点间距离为1"""
+    network = TransportNetwork()
+    for r in range(rows):
+        for c in range(cols):
+            network.add_stop(Stop(r * cols + c, f"S{r}_{c}", 48.8 + r * 0.01, 2.3 + c * 0.01, ZoneType.MIXED))
+    for r in range(rows):
+        for c in range(cols):
+            stop_id = r * cols + c
+            if c + 1 < cols:
+                network.add_route(stop_id, stop_id + 1, 1)
+                network.add_route(stop_id + 1, stop_id, 1)
+            if r + 1 < rows:
+                network.add_route(stop_id, stop_id + cols, 1)
+                network.add_route(stop_id + cols, stop_id, 1)
+    return network
+
+
+def legacy_iter_all_paths(network, start_id, end_id, max_distance):
+    """旧版实现：每次入栈复制整条路径，用 list 线性查找判断环路"""
+    stack = [(start_id, [start_id], 0)]
+    while stack:
+        current_id, current_path, current_distance = stack.pop()
+        if max_distance is not None and current_distance > max_distance:
+            continue
+        if current_id == end_id:
+            yield current_path, current_distance
+            continue
+        for neighbor_id, weight in reversed(network.adjacency_list.get(current_id, [])):
+            new_distance = current_distance + weight
+            if max_distance is not None and new_distance > max_distance:
+                continue
+            if neighbor_id not in current_path:
+                stack.append((neighbor_id, current_path + [neighbor_id], new_distance))
+
+
+def measure(enumerate_paths):
+    started = time.perf_counter()
+    count = sum(1 for _ in enumerate_paths())
+    return count, time.perf_counter() - started
+
+
+def main():
+    cases = [(4, 4, None), (3, 8, None), (2, 14, None), (5, 5, 14), (6, 6, 14), (8, 8, 18)]
+    print(f"{'grid':>8} {'max_dist':>8} {'paths':>10} {'legacy p/s':>12} {'current p/s':>12} {'speedup':>8}")
+    for rows, cols, max_distance in cases:
+        network = build_grid_network(rows, cols)
+        network.to_csr()  # 预先构建CSR视图，不计入枚举时间
+        start, end = 0, rows * cols - 1
+        legacy_count, legacy_time = measure(lambda: legacy_iter_all_paths(network, start, end, max_distance))
+        count, current_time = measure(lambda: iter_all_paths(network, start, end, max_distance))
+        assert count == legacy_count
+        print(f"{rows}x{cols:<6} {str(max_distance):>8} {count:>10} {legacy_count / legacy_time:>12.0f} "
+              f"{count / current_time:>12.0f} {legacy_time / current_time:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+启动加载基准测试：比较 NetworkDataManager 解析CSV（逐行 / 批量）、从二进制快照加载网络
+与只读映射快照（read_only=True）的耗时。
+
+第一次带 snapshot_dir 加载时解析CSV并写入快照，之后CSV未修改时直接从快照恢复。
+
+用法：python benchmarks/benchmark_network_snapshot.py [站点数 出度]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_bulk_csv_loader import write_csv
+from project.core.csv_network_data_manager import NetworkDataManager
+
+
+def timed(**kwargs):
+    start = time.perf_counter()
+    manager = NetworkDataManager(**kwargs)
+    return time.perf_counter() - start, manager
+
+
+def main(num_stops, out_degree):
+    with tempfile.TemporaryDirectory() as directory:
+        stops_path, routes_path = write_csv(directory, num_stops, out_degree)
+        snapshot_dir = os.path.join(directory, 'snapshot')
+        paths = dict(stops_csv_path=stops_path, routes_csv_path=routes_path)
+        print(f"站点 {num_stops}，线路 {num_stops * out_degree}")
+        elapsed, _ = timed(**paths)
+        print(f"逐行解析CSV: {elapsed:.2f}s")
+        elapsed, _ = timed(bulk_load=True, **paths)
+        print(f"批量解析CSV: {elapsed:.2f}s")
+        elapsed, _ = timed(bulk_load=True, snapshot_dir=snapshot_dir, **paths)
+        print(f"批量解析CSV并写入快照: {elapsed:.2f}s")
+        for columnar in (False, True):
+            elapsed, manager = timed(snapshot_dir=snapshot_dir, columnar_stops=columnar, **paths)
+            assert manager.loaded_from_snapshot
+            label = '列式站点表' if columnar else 'Stop对象'
+            print(f"从快照加载（{label}）: {elapsed:.2f}s")
+        elapsed, manager = timed(snapshot_dir=snapshot_dir, read_only=True, **paths)
+        assert manager.loaded_from_snapshot
+        print(f"只读映射快照: {elapsed:.3f}s")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [200000, 10]))
@@ -0,0 +1,89 @@
+"""
+线路索引基准测试：比较邻接表为普通列表（添加线路时逐个扫描查重、删除时用推导式重建列表）
+与当前按目标站点建立字典索引的 TransportNetwork。
+
+网络为若干个枢纽站点，每个枢纽与所有普通站点双向相连，测量批量添加线路、
+逐条删除一个枢纽的线路以及删除全部枢纽站点的耗时。
+
+用法：python benchmarks/benchmark_route_index.py [每个枢纽的线路数 ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+NUM_HUBS = 4
+
+
+class LegacyTransportNetwork(TransportNetwork):
+    """使用列表邻接表的原实现"""
+
+    def add_stop(self, stop):
+        super().add_stop(stop)
+        self.adjacency_list[stop.stop_ID] = []
+        self.reverse_adjacency[stop.stop_ID] = []
+
+    def add_route(self, from_id, to_id, distance):
+        if distance < 0:
+            raise ValueError("Distance must be non-negative")
+        for neighbor_id, _ in self.adjacency_list[from_id]:
+            if neighbor_id == to_id:
+                raise ValueError(f"Route from {from_id} to {to_id} already exists")
+        self.adjacency_list[from_id].append((to_id, distance))
+        self.reverse_adjacency[to_id].append((from_id, distance))
+        self.version += 1
+
+    def remove_stop(self, stop_id):
+        for from_id, _ in list(self.reverse_adjacency[stop_id]):
+            self.adjacency_list[from_id] = [(n, d) for n, d in self.adjacency_list[from_id] if n != stop_id]
+        for to_id, _ in list(self.adjacency_list[stop_id]):
+            self.reverse_adjacency[to_id] = [(n, d) for n, d in self.reverse_adjacency[to_id] if n != stop_id]
+        del self.adjacency_list[stop_id]
+        del self.reverse_adjacency[stop_id]
+        del self.stops[stop_id]
+        self.version += 1
+
+    def remove_route(self, from_id, to_id):
+        self.adjacency_list[from_id] = [(n, d) for n, d in self.adjacency_list[from_id] if n != to_id]
+        self.reverse_adjacency[to_id] = [(n, d) for n, d in self.reverse_adjacency[to_id] if n != from_id]
+        self.version += 1
+
+
+def run(network_cls, fanout):
+    network = network_cls()
+    hubs = list(range(NUM_HUBS))
+    leaves = list(range(NUM_HUBS, NUM_HUBS + fanout))
+    for stop_id in hubs + leaves:
+        network.add_stop(Stop(stop_id, f'S{stop_id}', 0.0, 0.0, ZoneType.MIXED))
+    timings = []
+    start = time.perf_counter()
+    for hub in hubs:
+        for leaf in leaves:
+            network.add_route(hub, leaf, 1.0)
+            network.add_route(leaf, hub, 1.0)
+    timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for leaf in leaves:
+        network.remove_route(hubs[0], leaf)
+    timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for hub in hubs:
+        network.remove_stop(hub)
+    timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(fanouts):
+    print(f"{'线路数/枢纽':>10} {'实现':>8} {'批量添加(s)':>12} {'删除线路(s)':>12} {'删除枢纽(s)':>12}")
+    for fanout in fanouts:
+        for label, network_cls in (('列表', LegacyTransportNetwork), ('索引', TransportNetwork)):
+            add, remove_routes, remove_hubs = run(network_cls, fanout)
+            print(f"{fanout:>10} {label:>8} {add:>12.3f} {remove_routes:>12.3f} {remove_hubs:>12.3f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000])
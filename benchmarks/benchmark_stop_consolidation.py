@@ -0,0 +1,94 @@
+"""
+可合并站点搜索基准测试：比较逐对标量Haversine的 O(N²) 双重循环、分块向量化的两两比较，
+以及当前按 max_distance 网格分桶的 find_stops_for_consolidation。
+
+站点按约每平方公里一个的密度随机分布，规模越大覆盖的区域越大。
+O(N²) 的实现只在较小规模下运行，较大规模按平方关系外推。
+
+用法：python benchmarks/benchmark_stop_consolidation.py [站点数 ...]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.algorithms.coordinate_utils import CoordinateUtils
+from project.analysis.stop_utilization_analyzer import StopUtilizationAnalyzer
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+MAX_DISTANCE = 2.0
+LEGACY_LIMIT = 2000
+PAIRWISE_LIMIT = 20000
+
+
+class _DataManager:
+    def __init__(self, network):
+        self.network = network
+
+
+def build_analyzer(num_stops, seed=0):
+    rng = np.random.default_rng(seed)
+    # 约每平方公里一个站点
+    side_km = math.sqrt(num_stops)
+    lats = 48.0 + rng.uniform(0, side_km / 111.0, num_stops)
+    lons = 2.0 + rng.uniform(0, side_km / (111.0 * math.cos(math.radians(48.0))), num_stops)
+    network = TransportNetwork()
+    for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+        network.add_stop(Stop(str(i), f"S{i}", lat, lon, ZoneType.MIXED))
+    analyzer = StopUtilizationAnalyzer(_DataManager(network))
+    analyzer.generate_random_data()
+    analyzer.calculate_stop_efficiency()
+    return analyzer
+
+
+def legacy_pair_count(analyzer, max_distance):
+    """旧版实现的距离计算部分：双重循环 + 标量Haversine"""
+    stops = list(analyzer.network.stops.values())
+    count = 0
+    for i in range(len(stops)):
+        for j in range(i + 1, len(stops)):
+            if analyzer._calculate_distance(stops[i].latitude, stops[i].longitude,
+                                            stops[j].latitude, stops[j].longitude) <= max_distance:
+                count += 1
+    return count
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main(sizes):
+    print(f"{'stops':>8} {'pairs':>9} {'O(N^2) scalar':>14} {'pairwise numpy':>15} {'grid':>8}")
+    for num_stops in sizes:
+        analyzer = build_analyzer(num_stops)
+        pairs, grid_time = timed(lambda: analyzer.find_stops_for_consolidation(MAX_DISTANCE))
+
+        if num_stops <= LEGACY_LIMIT:
+            count, legacy_time = timed(lambda: legacy_pair_count(analyzer, MAX_DISTANCE))
+            assert count == len(pairs)
+            legacy = f"{legacy_time:.2f}s"
+        else:
+            _, sample_time = timed(lambda: legacy_pair_count(build_analyzer(LEGACY_LIMIT), MAX_DISTANCE))
+            legacy = f"~{sample_time * (num_stops / LEGACY_LIMIT) ** 2:.0f}s*"
+
+        if num_stops <= PAIRWISE_LIMIT:
+            stops = list(analyzer.network.stops.values())
+            (rows, _, _), pairwise_time = timed(
+                lambda: CoordinateUtils.pairwise_haversine(stops, max_distance=MAX_DISTANCE))
+            assert len(rows) == len(pairs)
+            pairwise = f"{pairwise_time:.2f}s"
+        else:
+            pairwise = "skipped"
+        print(f"{num_stops:>8} {len(pairs):>9} {legacy:>14} {pairwise:>15} {grid_time:>7.2f}s")
+    print("* extrapolated quadratically from a 2000-stop run")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [2000, 10000, 100000])
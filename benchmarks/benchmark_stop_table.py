@@ -0,0 +1,88 @@
+"""
+站点存储内存基准测试：比较 stop_ID → Stop 的普通字典（带实例 __dict__ 的旧Stop与 __slots__ 的Stop）
+与列式 StopTable 保存N个站点时占用的内存。
+
+内存用 tracemalloc 统计从CSV式的逐行数据构建后、释放输入数据时仍保留的内存（含ID、名称字符串和索引字典），
+名称按真实数据的情况大量重复（如同名的"Main St"站点），以体现字符串驻留的效果。构建时间单独计时。
+
+用法：python benchmarks/benchmark_stop_table.py [站点数 ...]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project.data_structures.stop_entity import Stop
+from project.data_structures.stop_table import StopTable, ZONE_TYPES
+
+
+class _LegacyStop:
+    """增加 __slots__ 之前的Stop：每个实例带一个 __dict__"""
+    def __init__(self, stop_ID, name, latitude, longitude, zone_type):
+        self.stop_ID = stop_ID
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+        self._zone_type = zone_type
+
+
+def make_columns(num_stops, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [str(i) for i in range(num_stops)]
+    # 名称每次重新拼接，模拟从CSV逐行读到的独立字符串
+    names = [f'Street {k}' for k in rng.integers(0, max(1, num_stops // 10), num_stops).tolist()]
+    lats = (48.0 + rng.uniform(0, 1, num_stops)).tolist()
+    lons = (2.0 + rng.uniform(0, 1, num_stops)).tolist()
+    codes = rng.integers(0, len(ZONE_TYPES), num_stops).tolist()
+    return ids, names, lats, lons, codes
+
+
+def build_legacy_dict(ids, names, lats, lons, codes):
+    return {stop_id: _LegacyStop(stop_id, name, lat, lon, ZONE_TYPES[code])
+            for stop_id, name, lat, lon, code in zip(ids, names, lats, lons, codes)}
+
+
+def build_dict(ids, names, lats, lons, codes):
+    return {stop_id: Stop(stop_id, name, lat, lon, ZONE_TYPES[code])
+            for stop_id, name, lat, lon, code in zip(ids, names, lats, lons, codes)}
+
+
+def build_table(ids, names, lats, lons, codes):
+    return StopTable.from_columns(ids, names, lats, lons, codes)
+
+
+def measure(builder, num_stops):
+    gc.collect()
+    tracemalloc.start()
+    columns = make_columns(num_stops)
+    store = builder(*columns)
+    # 只保留站点存储本身：输入列表释放后，仍被存储引用的ID、名称和坐标对象继续计入
+    del columns
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    columns = make_columns(num_stops)
+    start = time.perf_counter()
+    builder(*columns)
+    return retained, time.perf_counter() - start
+
+
+def main(sizes):
+    builders = [('dict+旧Stop', build_legacy_dict), ('dict+Stop', build_dict), ('StopTable', build_table)]
+    print(f"{'站点数':>10}" + ''.join(f" {name + '(MB)':>16} {'构建(s)':>8}" for name, _ in builders))
+    for num_stops in sizes:
+        row = f"{num_stops:>10}"
+        for _, builder in builders:
+            retained, elapsed = measure(builder, num_stops)
+            row += f" {retained / 2**20:>16.1f} {elapsed:>8.2f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -13,7 +13,10 @@ from project.analysis.stop_utilization_analyzer import StopUtilizationAnalyzer
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    data_manager = NetworkDataManager()
+    # CSV未修改时直接从二进制快照加载网络；保存时只追加修改日志，日志较长或退出时再合并回CSV
+    cache_dir = os.path.join(project_root, '.cache')
+    data_manager = NetworkDataManager(snapshot_dir=os.path.join(cache_dir, 'network_snapshot'),
+                                      journal_path=os.path.join(cache_dir, 'network_changes.jsonl'))
     traffic_manager = TrafficConditionManager()
     path_analyzer = PathAnalyzer(data_manager, traffic_manager)
     stop_utilization_analyzer = StopUtilizationAnalyzer(data_manager)
@@ -23,4 +26,7 @@ if __name__ == "__main__":
     window.drawing_module.init_scene()
     window.drawing_module.draw_network()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    exit_code = app.exec_()
+    # 退出时把已保存到修改日志中的修改合并回CSV
+    data_manager.close()
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import heapq
+import math
+import os
+import numpy as np
+from project.data_structures.stop_entity import Stop
+from project.data_structures.csr_graph import CSRGraph
+
+# 自动选择算法时的成本系数：Floyd–Warshall 每步是一次NumPy向量运算（约 V³ 次元素操作），
+# 重复Dijkstra 在Python中逐条边松弛，单次操作约贵这么多倍
+DIJKSTRA_COST_FACTOR = 25
+# Floyd–Warshall 每次处理的行块的中间结果上限（字节）
+FLOYD_WARSHALL_BLOCK_BYTES = 32 * 1024 * 1024
+METHODS = ('auto', 'floyd_warshall', 'dijkstra')
+
+
+class AllPairsShortestPaths:
+    """
+    全源最短路径结果：distances[i, j] 为第i个站点到第j个站点的最短距离（float32，不可达为inf），
+    predecessors[i, j] 为该路径上j的前一个站点下标（-1 表示无路径或 i == j）。
+    下标顺序与 stop_ids 一致（即网络CSR视图的下标）。
+
+    使用 spill_dir 时两个矩阵是磁盘上的 distances.npy / predecessors.npy 的内存映射，
+    可以之后用 np.load(..., mmap_mode='r') 重新打开。
+    """
+
+    def __init__(self, graph, distances, predecessors, method):
+        self.graph = graph
+        self.stop_ids = graph.stop_ids
+        self.distances = distances
+        self.predecessors = predecessors
+        self.method = method
+
+    def distance(self, start_stop, end_stop):
+        """两站点之间的最短距离，站点不存在或不可达时返回 float('inf')"""
+        i, j = self._indices(start_stop, end_stop)
+        if i is None or j is None:
+            return float('inf')
+        return float(self.distances[i, j])
+
+    def path_ids(self, start_stop, end_stop):
+        """两站点之间的最短路径（stop_ID列表），不可达时返回None"""
+        i, j = self._indices(start_stop, end_stop)
+        if i is None or j is None or self.distances[i, j] == np.inf:
+            return None
+        path = [j]
+        row = self.predecessors[i]
+        while path[-1] != i:
+            path.append(int(row[path[-1]]))
+        return [self.stop_ids[k] for k in reversed(path)]
+
+    def path(self, start_stop, end_stop):
+        """与 dijkstra() 相同的返回格式：(Stop对象列表, 总距离)，不可达时返回(None, inf)"""
+        path = self.path_ids(start_stop, end_stop)
+        if path is None:
+            return None, float('inf')
+        return [self.graph.get_stop_by_id(stop_id) for stop_id in path], self.distance(start_stop, end_stop)
+
+    def _indices(self, start_stop, end_stop):
+        start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+        end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+        return self.graph.index_of(start_id), self.graph.index_of(end_id)
+
+
+def all_pairs_shortest_paths(network, method="auto", spill_dir=None):
+    """
+    计算所有站点对之间的最短距离和前驱矩阵，代替对每个站点对调用 dijkstra()。
+
+    - floyd_warshall：逐个中间站点对整个矩阵做向量化松弛，O(V³)，适合站点少或线路稠密的网络
+    - dijkstra：在CSR视图上从每个站点运行一次堆Dijkstra，O(V·E·logV)，适合大型稀疏网络。
+      线路距离不能为负（TransportNetwork 会拒绝），因此不需要Johnson算法的重新赋权步骤
+    - auto：按两者的估计成本选择
+
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param method: 'auto'、'floyd_warshall' 或 'dijkstra'
+    :param spill_dir: 可选，矩阵写入该目录下的 .npy 文件并以内存映射方式返回，不占用内存；
+                      V 较大时（矩阵约 V² × 8 字节）使用
+    :return: AllPairsShortestPaths
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method}")
+    if isinstance(network, CSRGraph):
+        graph = network
+    elif hasattr(network, 'to_csr'):
+        graph = network.to_csr()
+    else:
+        graph = CSRGraph.from_network(network)
+    if method == 'auto':
+        method = _choose_method(graph.num_stops, graph.num_routes)
+
+    n = graph.num_stops
+    # 前驱用能容纳全部下标的最小整数类型
+    predecessor_dtype = np.int16 if n <= np.iinfo(np.int16).max else np.int32
+    distances = _new_matrix(spill_dir, 'distances', n, np.float32)
+    predecessors = _new_matrix(spill_dir, 'predecessors', n, predecessor_dtype)
+    if method == 'floyd_warshall':
+        _floyd_warshall(graph, distances, predecessors)
+    else:
+        _repeated_dijkstra(graph, distances, predecessors)
+    if spill_dir is not None:
+        distances.flush()
+        predecessors.flush()
+    return AllPairsShortestPaths(graph, distances, predecessors, method)
+
+
+def _choose_method(num_stops, num_routes):
+    """比较 V³ 与 Dijkstra 的估计成本 V·(V+E)·logV（乘以Python逐条松弛的成本系数）"""
+    if num_stops == 0:
+        return 'floyd_warshall'
+    floyd_cost = num_stops ** 3
+    dijkstra_cost = DIJKSTRA_COST_FACTOR * num_stops * (num_stops + num_routes) * math.log2(num_stops + 1)
+    return 'floyd_warshall' if floyd_cost <= dijkstra_cost else 'dijkstra'
+
+
+def _new_matrix(spill_dir, name, n, dtype):
+    if spill_dir is None:
+        return np.empty((n, n), dtype=dtype)
+    os.makedirs(spill_dir, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(spill_dir, name + '.npy'), mode='w+',
+                                     dtype=dtype, shape=(n, n))
+
+
+def _floyd_warshall(graph, distances, predecessors):
+    """向量化的Floyd–Warshall：第k轮用经过k的路径 D[i,k] + D[k,j] 更新整个矩阵"""
+    n = graph.num_stops
+    distances[:] = np.inf
+    predecessors[:] = -1
+    sources = np.repeat(np.arange(n), np.diff(graph.offsets))
+    # 同一对站点之间只有一条线路，直接按边赋值
+    distances[sources, graph.targets] = graph.weights
+    predecessors[sources, graph.targets] = sources
+    diagonal = np.arange(n)
+    distances[diagonal, diagonal] = 0
+    predecessors[diagonal, diagonal] = -1
+    # 按行分块处理，中间结果不超过 FLOYD_WARSHALL_BLOCK_BYTES（矩阵可能是磁盘映射）
+    block = max(1, FLOYD_WARSHALL_BLOCK_BYTES // max(1, n * distances.itemsize))
+    for k in range(n):
+        row_k = np.array(distances[k])
+        predecessor_k = np.array(predecessors[k])
+        for start in range(0, n, block):
+            end = min(n, start + block)
+            rows = distances[start:end]
+            through = rows[:, k, None] + row_k
+            improved = through < rows
+            if improved.any():
+                np.copyto(rows, through, where=improved)
+                np.copyto(predecessors[start:end], predecessor_k, where=improved)
+
+
+def _repeated_dijkstra(graph, distances, predecessors):
+    """从每个站点运行一次CSR上的Dijkstra，逐行写入矩阵"""
+    n = graph.num_stops
+    # memoryview 逐元素读取比直接索引NumPy数组快得多
+    offsets = memoryview(graph.offsets)
+    targets = memoryview(graph.targets)
+    weights = memoryview(graph.weights)
+    for source in range(n):
+        row = [float('inf')] * n
+        previous = [-1] * n
+        row[source] = 0
+        queue = [(0, source)]
+        while queue:
+            current_distance, current = heapq.heappop(queue)
+            if current_distance > row[current]:
+                continue
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                distance = current_distance + weights[k]
+                if distance < row[neighbor]:
+                    row[neighbor] = distance
+                    previous[neighbor] = current
+                    heapq.heappush(queue, (distance, neighbor))
+        distances[source] = row
+        predecessors[source] = previous
@@ -1,5 +1,6 @@
 import math
 from math import sin, cos, sqrt, atan2, radians
+import numpy as np
 
 class CoordinateUtils:
     """坐标工具类：提供地理坐标计算和转换功能"""
@@ -15,6 +16,11 @@ class CoordinateUtils:
     DEFAULT_VIEW_HEIGHT = 900
     DEFAULT_PADDING = 80
     
+    # 地球半径（公里）
+    EARTH_RADIUS_KM = 6371.0
+    # 批量计算时每块的最大元素数，限制中间数组占用的内存（约几十MB）
+    HAVERSINE_CHUNK_ELEMENTS = 1 << 20
+    
     @staticmethod
     def calculate_haversine_distance(lat1, lon1, lat2, lon2):
         """
@@ -49,6 +55,93 @@ class CoordinateUtils:
         
         return distance
     
+    @staticmethod
+    def haversine_many(lats1, lons1, lats2, lons2):
+        """
+        向量化的Haversine距离计算，参数可为标量或NumPy数组（按广播规则配对）
+        
+        Args:
+            lats1, lons1: 第一组点的纬度、经度
+            lats2, lons2: 第二组点的纬度、经度
+            
+        Returns:
+            numpy.ndarray: 对应点对间的距离（公里），形状为广播后的形状
+        """
+        lat1_rad = np.radians(np.asarray(lats1, dtype=np.float64))
+        lon1_rad = np.radians(np.asarray(lons1, dtype=np.float64))
+        lat2_rad = np.radians(np.asarray(lats2, dtype=np.float64))
+        lon2_rad = np.radians(np.asarray(lons2, dtype=np.float64))
+        
+        # 与 calculate_haversine_distance 相同的公式
+        a = np.sin((lat2_rad - lat1_rad) / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin((lon2_rad - lon1_rad) / 2)**2
+        # 浮点误差可能使a略超出[0, 1]
+        a = np.clip(a, 0.0, 1.0)
+        return CoordinateUtils.EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    @staticmethod
+    def stop_coordinate_arrays(stops):
+        """
+        把站点序列转换为纬度、经度数组
+        
+        Args:
+            stops: Stop对象、含lat/lon键的站点字典或(纬度, 经度)元组的序列
+            
+        Returns:
+            tuple: (纬度数组, 经度数组)
+        """
+        lats = []
+        lons = []
+        for stop in stops:
+            if hasattr(stop, 'latitude'):
+                lats.append(stop.latitude)
+                lons.append(stop.longitude)
+            elif isinstance(stop, dict):
+                lats.append(stop['lat'])
+                lons.append(stop['lon'])
+            else:
+                lats.append(stop[0])
+                lons.append(stop[1])
+        return np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    
+    @staticmethod
+    def pairwise_haversine(stops, max_distance=None, chunk_size=None):
+        """
+        计算站点两两之间（i < j）的距离，按行分块以限制内存
+        
+        Args:
+            stops: 站点序列，格式见 stop_coordinate_arrays
+            max_distance: 可选，只返回距离不超过该值（公里）的点对
+            chunk_size: 每块处理的行数，默认按 HAVERSINE_CHUNK_ELEMENTS 推算
+            
+        Returns:
+            tuple: (i数组, j数组, 距离数组)，按 (i, j) 升序排列
+        """
+        lats, lons = CoordinateUtils.stop_coordinate_arrays(stops)
+        n = len(lats)
+        if chunk_size is None:
+            chunk_size = max(1, CoordinateUtils.HAVERSINE_CHUNK_ELEMENTS // max(n, 1))
+        rows, cols, distances = [], [], []
+        for start in range(0, n, chunk_size):
+            end = min(n, start + chunk_size)
+            # 只需计算 j > i 的部分：第 start 行之后的列
+            block = CoordinateUtils.haversine_many(
+                lats[start:end, None], lons[start:end, None],
+                lats[None, start + 1:], lons[None, start + 1:]
+            )
+            i_local = np.arange(end - start)[:, None]
+            j_local = np.arange(n - start - 1)[None, :]
+            mask = j_local >= i_local
+            if max_distance is not None:
+                mask &= block <= max_distance
+            i_idx, j_idx = np.nonzero(mask)
+            rows.append(i_idx + start)
+            cols.append(j_idx + start + 1)
+            distances.append(block[i_idx, j_idx])
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), np.zeros(0, dtype=np.float64)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(distances)
+    
     @staticmethod
     def calculate_distance_between_stops(stop1, stop2):
         """
@@ -1,45 +1,149 @@
 from project.data_structures.stop_entity import Stop
 from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.csr_graph import CSRGraph
+import heapq
+import time
+
+# 每尝试多少条出边检查一次超时和取消标志（被剪掉的出边也计数）；每次产出路径前也会检查
+_CHECK_INTERVAL = 256
+# 剪枝比较时容许的相对浮点误差：正向累加与反向累加的距离可能相差几个ulp，
+# 剪枝只需保守，最终是否超限仍按正向累计距离严格判断
+_PRUNE_TOLERANCE = 1e-9
 
 def find_all_paths(network: TransportNetwork, start_stop, end_stop, max_distance=80):
+    """
+    查找两个站点之间距离不超过max_distance的所有无环路径。
+    :return: [(Stop对象列表, 总距离), ...]
+    """
+    return [
+        ([network.get_stop_by_id(stop_id) for stop_id in path], distance)
+        for path, distance in iter_all_paths(network, start_stop, end_stop, max_distance)
+    ]
+
+def iter_all_paths(network: TransportNetwork, start_stop, end_stop, max_distance=80,
+                   limit=None, timeout=None, cancel_token=None):
+    """
+    惰性地逐条产出所有无环路径，调用方可随时停止迭代。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :param max_distance: 距离上限，None表示不限
+    :param limit: 最多产出的路径数
+    :param timeout: 搜索时间上限（秒），超时后停止产出
+    :param cancel_token: 取消标志，提供 is_set() 方法（如 threading.Event），被设置后停止产出
+    :return: 生成器，逐条产出 (stop_ID列表, 总距离)，不解析Stop对象；起点或终点不存在时不产出任何路径
+    """
     # 提取起点和终点ID
     start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
     end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
-    
-    # 初始化结果列表
-    all_paths = []
-    # 栈结构：每个元素是(当前节点ID, 当前路径, 当前距离)
-    stack = [(start_id, [start_id], 0)]
-    
-    # 当栈不为空时继续搜索
-    while stack:
-        # 从栈顶弹出一个元素
-        current_id, current_path, current_distance = stack.pop()
-        # 剪枝：如果超过最大距离，则不再考虑该路径
-        if max_distance is not None and current_distance > max_distance:
-            continue
-        
-        # 如果到达终点，将路径添加到结果
-        if current_id == end_id:
-            # 转换路径中的ID为Stop对象
-            stop_path = [network.get_stop_by_id(pid) for pid in current_path]
-            all_paths.append((stop_path, current_distance))
-            continue
-        if current_id not in network.adjacency_list:
-            continue
-        neighbors = list(network.adjacency_list[current_id])
-        for neighbor_id, weight in reversed(neighbors):
-            # 计算新的累计距离
-            new_distance = current_distance + weight
-            
-            # 剪枝：如果超过最大距离，则不再考虑该路径
-            if max_distance is not None and new_distance > max_distance:
+    if limit is not None and limit <= 0:
+        return
+    # 搜索统一在稠密下标上进行：TransportNetwork 使用按版本缓存的CSR视图
+    if isinstance(network, CSRGraph):
+        graph = network
+    elif hasattr(network, 'to_csr'):
+        graph = network.to_csr()
+    else:
+        graph = CSRGraph.from_network(network)
+    start, end = graph.index_of(start_id), graph.index_of(end_id)
+    if start is None or end is None:
+        return
+    if start == end:
+        yield [start_id], 0
+        return
+    deadline = None if timeout is None else time.monotonic() + timeout
+    limit_distance = float('inf') if max_distance is None else max_distance
+    # 从终点沿反向边运行一次Dijkstra，得到各站点到终点的最短距离下界：
+    # 已走距离 + 剩余下界 超过上限（或根本到不了终点）的分支直接剪掉
+    bound = limit_distance * (1 + _PRUNE_TOLERANCE) + _PRUNE_TOLERANCE
+    remaining = _distances_to_target(graph, end, bound)
+    unreachable = float('inf')
+    if remaining[start] == unreachable or remaining[start] > bound:
+        return
+    stop_ids = graph.stop_ids
+    # 出边元组列表只为搜索实际展开的站点按需创建，随本次搜索结束释放，不缓存在图上
+    offsets = graph.offsets.tolist()
+    targets, weights = graph.targets, graph.weights
+    neighbor_lists = [None] * graph.num_stops
+
+    def edges_of(node):
+        edges = neighbor_lists[node]
+        if edges is None:
+            begin, stop = offsets[node], offsets[node + 1]
+            edges = neighbor_lists[node] = list(zip(targets[begin:stop].tolist(), weights[begin:stop].tolist()))
+        return edges
+
+    # 回溯栈：path 为当前路径（所有分支共享同一份，只在产出时复制），
+    # iterators 记录每层尚未尝试的出边，visited 位图做O(1)环路检查
+    visited = bytearray(graph.num_stops)
+    visited[start] = 1
+    path = [start]
+    path_distances = [0]
+    iterators = [iter(edges_of(start))]
+    distance = 0
+    found = 0
+    examined = 0
+
+    def stopped():
+        return ((cancel_token is not None and cancel_token.is_set())
+                or (deadline is not None and time.monotonic() > deadline))
+
+    while iterators:
+        for neighbor, weight in iterators[-1]:
+            examined += 1
+            if examined % _CHECK_INTERVAL == 0 and stopped():
+                return
+            # 计算新的累计距离，超过最大距离则剪枝；已在路径上的站点跳过以避免环路；
+            # 即使沿最短路走到终点也会超限的分支同样剪掉
+            new_distance = distance + weight
+            if new_distance > limit_distance or visited[neighbor]:
+                continue
+            # 到不了终点的站点必须单独判断：不限距离时 bound 为inf，inf > inf 不成立
+            if remaining[neighbor] == unreachable or new_distance + remaining[neighbor] > bound:
                 continue
-                
-            # 避免环路
-            if neighbor_id not in current_path:
-                # 创建新路径
-                new_path = current_path + [neighbor_id]
-                stack.append((neighbor_id, new_path, new_distance))
-    
-    return all_paths 
\ No newline at end of file
+            if neighbor == end:
+                if stopped():
+                    return
+                yield [stop_ids[i] for i in path] + [stop_ids[end]], new_distance
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+                continue
+            # 深入一层
+            visited[neighbor] = 1
+            path.append(neighbor)
+            path_distances.append(new_distance)
+            iterators.append(iter(edges_of(neighbor)))
+            distance = new_distance
+            break
+        else:
+            # 当前节点的出边已全部尝试，回溯
+            visited[path.pop()] = 0
+            path_distances.pop()
+            iterators.pop()
+            if path_distances:
+                distance = path_distances[-1]
+
+def _distances_to_target(graph: CSRGraph, target, max_distance):
+    """
+    在转置图上从target运行Dijkstra，返回按稠密下标排列的"到target的最短距离"列表。
+    距离超过max_distance的站点不再展开，保持为 float('inf')。
+    """
+    reverse = graph.reverse()
+    offsets = memoryview(reverse.offsets)
+    sources = memoryview(reverse.targets)
+    weights = memoryview(reverse.weights)
+    distances = [float('inf')] * graph.num_stops
+    distances[target] = 0
+    queue = [(0, target)]
+    while queue:
+        current_distance, current = heapq.heappop(queue)
+        if current_distance > distances[current]:
+            continue
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = sources[k]
+            distance = current_distance + weights[k]
+            if distance < distances[neighbor] and distance <= max_distance:
+                distances[neighbor] = distance
+                heapq.heappush(queue, (distance, neighbor))
+    return distances
@@ -1,11 +1,14 @@
 from project.data_structures.stop_entity import Stop
 from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.csr_graph import CSRGraph
+from project.algorithms.coordinate_utils import CoordinateUtils
 import heapq
+import numpy as np
 
 def dijkstra(network: TransportNetwork, start_stop, end_stop):
     """
     使用Dijkstra算法查找两个站点之间的最短路径。
-    :param network: TransportNetwork 对象
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
     :param start_stop: 起始 Stop 对象或stop_ID
     :param end_stop: 终点 Stop 对象或stop_ID
     :return: 一个元组，包含最短路径（Stop对象列表）和总距离。如果找不到路径，则返回(None, float('inf'))。
@@ -13,13 +16,15 @@ def dijkstra(network: TransportNetwork, start_stop, end_stop):
     # 支持传入Stop对象或stop_ID
     start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
     end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if isinstance(network, CSRGraph):
+        return _dijkstra_csr(network, start_id, end_id)
     if start_id not in network.adjacency_list or end_id not in network.adjacency_list:
         return None, float('inf')
 
     distances = {stop_id: float('inf') for stop_id in network.adjacency_list}
     previous_stops = {stop_id: None for stop_id in network.adjacency_list}
     distances[start_id] = 0
-    
+
     queue = [(0, start_id)]
     heapq.heapify(queue)
 
@@ -51,4 +56,407 @@ def dijkstra(network: TransportNetwork, start_stop, end_stop):
         # 返回Stop对象列表
         return [network.get_stop_by_id(stop_id) for stop_id in path], distances[end_id]
     else:
-        return None, float('inf') 
\ No newline at end of file
+        return None, float('inf')
+
+def _dijkstra_csr(graph: CSRGraph, start_id, end_id):
+    """在CSR视图上运行Dijkstra，距离和前驱保存在按下标索引的列表中"""
+    source = graph.index_of(start_id)
+    target = graph.index_of(end_id)
+    if source is None or target is None:
+        return None, float('inf')
+
+    # memoryview 逐元素读取比直接索引NumPy数组快得多
+    offsets = memoryview(graph.offsets)
+    targets = memoryview(graph.targets)
+    weights = memoryview(graph.weights)
+    distances = [float('inf')] * graph.num_stops
+    previous = [-1] * graph.num_stops
+    distances[source] = 0
+
+    queue = [(0, source)]
+    while queue:
+        current_distance, current = heapq.heappop(queue)
+        if current_distance > distances[current]:
+            continue
+        if current == target:
+            break
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[k]
+            distance = current_distance + weights[k]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                previous[neighbor] = current
+                heapq.heappush(queue, (distance, neighbor))
+
+    if distances[target] == float('inf'):
+        return None, float('inf')
+    path = []
+    current = target
+    while current != -1:
+        path.append(graph.stop_id_of(current))
+        current = previous[current]
+    path.reverse()
+    return [graph.get_stop_by_id(stop_id) for stop_id in path], distances[target]
+
+class ShortestPathTree:
+    """
+    单源最短路径树：一次Dijkstra搜索的结果，可重复查询任意终点的距离和路径。
+    对CSR视图，distances/previous 是按稠密下标索引的列表；对普通网络，是只包含已到达站点的字典。
+    只搜索到给定终点就提前结束的树，radius 为最后确定的距离，只有距离不超过 radius 的站点结果是精确的（见 covers）。
+    """
+
+    def __init__(self, network, source_id, distances, previous, index=None, radius=None):
+        self.network = network
+        self.source_id = source_id
+        self._distances = distances
+        self._previous = previous
+        self._index = index  # CSR视图时为 graph.index_of，否则为None
+        self.radius = radius  # 完整搜索时为None
+
+    def __len__(self):
+        """树占用的条目数（CSR视图为站点总数，普通网络为已到达的站点数）"""
+        return len(self._distances)
+
+    def covers(self, stop):
+        """到stop的结果是否精确：完整的树总是精确，提前结束的树只对距离不超过 radius 的站点精确"""
+        return self.radius is None or self.distance_to(stop) <= self.radius
+
+    def _key(self, stop_id):
+        if self._index is None:
+            return stop_id
+        return self._index(stop_id)
+
+    def distance_to(self, stop):
+        """到终点的最短距离，不可达时返回 float('inf')"""
+        stop_id = stop.stop_ID if isinstance(stop, Stop) else stop
+        key = self._key(stop_id)
+        if key is None:
+            return float('inf')
+        if self._index is None:
+            return self._distances.get(key, float('inf'))
+        return self._distances[key]
+
+    def path_ids_to(self, stop):
+        """到终点的最短路径（stop_ID列表），不可达时返回None"""
+        stop_id = stop.stop_ID if isinstance(stop, Stop) else stop
+        if self.distance_to(stop_id) == float('inf'):
+            return None
+        path = []
+        if self._index is None:
+            current = stop_id
+            while current is not None:
+                path.append(current)
+                current = self._previous.get(current)
+        else:
+            current = self._index(stop_id)
+            while current != -1:
+                path.append(self.network.stop_id_of(current))
+                current = self._previous[current]
+        path.reverse()
+        return path
+
+    def path_to(self, stop):
+        """与 dijkstra() 相同的返回格式：(Stop对象列表, 总距离)，不可达时返回(None, inf)"""
+        path = self.path_ids_to(stop)
+        if path is None:
+            return None, float('inf')
+        return [self.network.get_stop_by_id(stop_id) for stop_id in path], self.distance_to(path[-1])
+
+    def reachable_stop_ids(self):
+        """从源点可达的所有站点ID"""
+        if self._index is None:
+            return list(self._distances.keys())
+        return [self.network.stop_id_of(i) for i, d in enumerate(self._distances) if d != float('inf')]
+
+def shortest_path_tree(network: TransportNetwork, source, targets=None):
+    """
+    从源点运行一次Dijkstra，返回可复用的最短路径树。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param source: 源点 Stop 对象或stop_ID
+    :param targets: 可选，只关心的终点集合；全部确定后提前结束搜索（此时只有这些终点的结果保证最优）
+    :return: ShortestPathTree；源点不存在时返回None
+    """
+    source_id = source.stop_ID if isinstance(source, Stop) else source
+    pending = None
+    if targets is not None:
+        pending = {t.stop_ID if isinstance(t, Stop) else t for t in targets}
+
+    if isinstance(network, CSRGraph):
+        start = network.index_of(source_id)
+        if start is None:
+            return None
+        if pending is not None:
+            pending = {network.index_of(t) for t in pending} - {None}
+        offsets = memoryview(network.offsets)
+        targets_view = memoryview(network.targets)
+        weights = memoryview(network.weights)
+        distances = [float('inf')] * network.num_stops
+        previous = [-1] * network.num_stops
+        distances[start] = 0
+        radius = None
+        queue = [(0, start)]
+        while queue:
+            current_distance, current = heapq.heappop(queue)
+            if current_distance > distances[current]:
+                continue
+            if pending is not None:
+                pending.discard(current)
+                if not pending:
+                    radius = current_distance
+                    break
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets_view[k]
+                distance = current_distance + weights[k]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current
+                    heapq.heappush(queue, (distance, neighbor))
+        return ShortestPathTree(network, source_id, distances, previous, index=network.index_of, radius=radius)
+
+    if source_id not in network.adjacency_list:
+        return None
+    # 只记录已到达的站点，避免为每次查询初始化覆盖全网的字典
+    distances = {source_id: 0}
+    previous = {source_id: None}
+    settled = set()
+    radius = None
+    queue = [(0, source_id)]
+    while queue:
+        current_distance, current_id = heapq.heappop(queue)
+        if current_id in settled:
+            continue
+        settled.add(current_id)
+        if pending is not None:
+            pending.discard(current_id)
+            if not pending:
+                radius = current_distance
+                break
+        for neighbor_id, weight in network.adjacency_list.get(current_id, []):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor_id, float('inf')):
+                distances[neighbor_id] = distance
+                previous[neighbor_id] = current_id
+                heapq.heappush(queue, (distance, neighbor_id))
+    return ShortestPathTree(network, source_id, distances, previous, radius=radius)
+
+def distance_matrix(network: TransportNetwork, sources, targets):
+    """
+    批量计算多源多汇最短距离：每个源点只运行一次Dijkstra（所有终点确定后提前结束）。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param sources: 源点 Stop 对象或stop_ID 序列
+    :param targets: 终点 Stop 对象或stop_ID 序列
+    :return: 形状为 (len(sources), len(targets)) 的 float64 数组，不可达为 inf
+    """
+    source_ids = [s.stop_ID if isinstance(s, Stop) else s for s in sources]
+    target_ids = [t.stop_ID if isinstance(t, Stop) else t for t in targets]
+    matrix = np.full((len(source_ids), len(target_ids)), np.inf)
+    trees = {}
+    for row, source_id in enumerate(source_ids):
+        if source_id not in trees:
+            trees[source_id] = shortest_path_tree(network, source_id, targets=target_ids)
+        tree = trees[source_id]
+        if tree is None:
+            continue
+        for col, target_id in enumerate(target_ids):
+            matrix[row, col] = tree.distance_to(target_id)
+    return matrix
+
+def bidirectional_dijkstra(network: TransportNetwork, start_stop, end_stop):
+    """
+    双向Dijkstra：同时从起点沿正向邻接表、从终点沿 reverse_adjacency 反向搜索，在中间相遇。
+    点对点查询时两侧各只需搜索约一半半径，确定的站点数通常远少于单向搜索。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :return: 与 dijkstra() 相同：(Stop对象列表, 总距离)，找不到路径时返回(None, float('inf'))
+    """
+    start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+    end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if isinstance(network, CSRGraph):
+        source, target = network.index_of(start_id), network.index_of(end_id)
+        if source is None or target is None:
+            return None, float('inf')
+        reverse = network.reverse()
+        result = _bidirectional_search(source, target, network.neighbors, reverse.neighbors)
+        if result is None:
+            return None, float('inf')
+        path, distance = result
+        return [network.get_stop_by_id(network.stop_id_of(i)) for i in path], distance
+
+    reverse_adjacency = getattr(network, 'reverse_adjacency', None)
+    if reverse_adjacency is None:
+        # 没有反向邻接表的网络退化为单向搜索
+        return dijkstra(network, start_id, end_id)
+    if start_id not in network.adjacency_list or end_id not in network.adjacency_list:
+        return None, float('inf')
+    result = _bidirectional_search(
+        start_id, end_id,
+        lambda stop_id: network.adjacency_list.get(stop_id, []),
+        lambda stop_id: reverse_adjacency.get(stop_id, [])
+    )
+    if result is None:
+        return None, float('inf')
+    path, distance = result
+    return [network.get_stop_by_id(stop_id) for stop_id in path], distance
+
+def _bidirectional_search(source, target, forward_neighbors, backward_neighbors):
+    """双向搜索核心，返回(节点路径, 距离)或None；节点可以是stop_ID或CSR下标"""
+    if source == target:
+        return [source], 0
+    distances = ({source: 0}, {target: 0})
+    previous = ({source: None}, {target: None})
+    settled = (set(), set())
+    queues = ([(0, source)], [(0, target)])
+    neighbor_functions = (forward_neighbors, backward_neighbors)
+    best = float('inf')
+    meeting = None
+
+    while queues[0] and queues[1]:
+        # 两侧队首距离之和不小于当前最优值时，最优路径已确定
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # 每次扩展队列较小的一侧
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        current_distance, current = heapq.heappop(queues[side])
+        if current in settled[side]:
+            continue
+        settled[side].add(current)
+        own_distances, other_distances = distances[side], distances[1 - side]
+        for neighbor, weight in neighbor_functions[side](current):
+            distance = current_distance + weight
+            if distance < own_distances.get(neighbor, float('inf')):
+                own_distances[neighbor] = distance
+                previous[side][neighbor] = current
+                heapq.heappush(queues[side], (distance, neighbor))
+            if neighbor in other_distances:
+                total = own_distances[neighbor] + other_distances[neighbor]
+                if total < best:
+                    best = total
+                    meeting = neighbor
+
+    if meeting is None:
+        return None
+    # 拼接两段路径：起点 -> 相遇点 -> 终点
+    path = []
+    current = meeting
+    while current is not None:
+        path.append(current)
+        current = previous[0][current]
+    path.reverse()
+    current = previous[1][meeting]
+    while current is not None:
+        path.append(current)
+        current = previous[1][current]
+    return path, best
+
+def _stop_coordinates(network, stop_id):
+    """返回站点的(纬度, 经度)，站点不存在或缺少坐标时返回None"""
+    stop = network.get_stop_by_id(stop_id)
+    latitude = getattr(stop, 'latitude', None)
+    longitude = getattr(stop, 'longitude', None)
+    if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
+        return None
+    return latitude, longitude
+
+def _iter_routes(network):
+    """遍历网络所有线路，产出(起点ID, 终点ID, 距离)"""
+    if isinstance(network, CSRGraph):
+        for i, from_id in enumerate(network.stop_ids):
+            for j, distance in network.neighbors(i):
+                yield from_id, network.stop_id_of(j), distance
+    else:
+        for from_id, neighbors in network.adjacency_list.items():
+            for to_id, distance in neighbors:
+                yield from_id, to_id, distance
+
+def haversine_heuristic_scale(network: TransportNetwork):
+    """
+    校验大圆距离能否作为A*的下界，返回启发函数的缩放系数。
+    若每条线路的距离都不小于两端站点的大圆距离，返回1.0；否则返回
+    min(线路距离 / 大圆距离)，缩放后的启发函数仍然可采纳且一致。
+    :return: (0, 1] 内的缩放系数；站点缺少坐标或存在"零距离远距"线路时返回None（应退回Dijkstra）
+    """
+    scale = 1.0
+    coordinates = {}
+    for from_id, to_id, distance in _iter_routes(network):
+        for stop_id in (from_id, to_id):
+            if stop_id not in coordinates:
+                coordinates[stop_id] = _stop_coordinates(network, stop_id)
+                if coordinates[stop_id] is None:
+                    return None
+        geodesic = CoordinateUtils.calculate_haversine_distance(*coordinates[from_id], *coordinates[to_id])
+        if geodesic <= 0 or distance >= geodesic * scale:
+            continue
+        if distance <= 0:
+            return None
+        scale = distance / geodesic
+    return scale
+
+def astar(network: TransportNetwork, start_stop, end_stop, heuristic_scale=None):
+    """
+    使用A*算法查找最短路径，以站点间大圆距离（乘以缩放系数）作为启发函数。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :param heuristic_scale: haversine_heuristic_scale() 的结果；为None时现场校验（O(E)），
+                            对同一网络多次查询时应由调用方缓存
+    :return: 与 dijkstra() 相同：(Stop对象列表, 总距离)，找不到路径时返回(None, float('inf'))
+    """
+    start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+    end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if heuristic_scale is None:
+        heuristic_scale = haversine_heuristic_scale(network)
+    target_coordinates = _stop_coordinates(network, end_id)
+    if not heuristic_scale or target_coordinates is None:
+        # 启发函数不可用时退回普通Dijkstra
+        return dijkstra(network, start_id, end_id)
+
+    is_csr = isinstance(network, CSRGraph)
+    if is_csr:
+        source, target = network.index_of(start_id), network.index_of(end_id)
+        neighbors = network.neighbors
+        node_stop_id = network.stop_id_of
+    else:
+        source = start_id if start_id in network.adjacency_list else None
+        target = end_id if end_id in network.adjacency_list else None
+        neighbors = lambda stop_id: network.adjacency_list.get(stop_id, [])
+        node_stop_id = lambda stop_id: stop_id
+    if source is None or target is None:
+        return None, float('inf')
+
+    heuristics = {}
+
+    def heuristic(node):
+        if node not in heuristics:
+            coordinates = _stop_coordinates(network, node_stop_id(node))
+            heuristics[node] = 0 if coordinates is None else heuristic_scale * \
+                CoordinateUtils.calculate_haversine_distance(*coordinates, *target_coordinates)
+        return heuristics[node]
+
+    distances = {source: 0}
+    previous = {source: None}
+    settled = set()
+    queue = [(heuristic(source), 0, source)]
+    while queue:
+        _, current_distance, current = heapq.heappop(queue)
+        if current in settled:
+            continue
+        settled.add(current)
+        if current == target:
+            break
+        for neighbor, weight in neighbors(current):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                previous[neighbor] = current
+                heapq.heappush(queue, (distance + heuristic(neighbor), distance, neighbor))
+
+    if target not in settled:
+        return None, float('inf')
+    path = []
+    current = target
+    while current is not None:
+        path.append(node_stop_id(current))
+        current = previous[current]
+    path.reverse()
+    return [network.get_stop_by_id(stop_id) for stop_id in path], distances[target]
@@ -8,4 +8,11 @@ def calculate_distance_between_stops(stop1, stop2):
     return CoordinateUtils.calculate_distance_between_stops(stop1, stop2)
 
 def calculate_distance_between_stops_by_id(data_manager, stop1_id, stop2_id):
-    return CoordinateUtils.calculate_distance_between_stops_by_id(data_manager, stop1_id, stop2_id) 
\ No newline at end of file
+    return CoordinateUtils.calculate_distance_between_stops_by_id(data_manager, stop1_id, stop2_id)
+
+# 向量化批量计算
+def haversine_many(lats1, lons1, lats2, lons2):
+    return CoordinateUtils.haversine_many(lats1, lons1, lats2, lons2)
+
+def pairwise_haversine(stops, max_distance=None, chunk_size=None):
+    return CoordinateUtils.pairwise_haversine(stops, max_distance=max_distance, chunk_size=chunk_size)
@@ -0,0 +1,99 @@
+from project.data_structures.stop_entity import Stop
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.csr_graph import CSRGraph
+import heapq
+
+def k_shortest_paths(network: TransportNetwork, start_stop, end_stop, k=None, max_distance=None):
+    """
+    使用Yen算法按距离从小到大生成前k条无环路径。
+    与DFS穷举不同，每产出一条路径只需O(L)次受限Dijkstra，延迟可预期。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :param k: 最多产出的路径数，None表示直到没有更多路径
+    :param max_distance: 可选，距离上限；路径按距离递增产出，超过上限即停止
+    :return: 生成器，逐条产出 (Stop对象列表, 总距离)，与 find_all_paths 的元素格式相同
+    """
+    start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+    end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if isinstance(network, CSRGraph):
+        source, target = network.index_of(start_id), network.index_of(end_id)
+        neighbors = network.neighbors
+        to_stop = lambda node: network.get_stop_by_id(network.stop_id_of(node))
+    else:
+        source = start_id if start_id in network.adjacency_list else None
+        target = end_id if end_id in network.adjacency_list else None
+        neighbors = lambda stop_id: network.adjacency_list.get(stop_id, [])
+        to_stop = network.get_stop_by_id
+    if source is None or target is None or (k is not None and k <= 0):
+        return
+
+    first = _restricted_shortest_path(neighbors, source, target, set(), set())
+    if first is None:
+        return
+    found = [first]
+    candidates = []
+    seen = {tuple(first[0])}
+    while True:
+        path, cumulative = found[-1]
+        if max_distance is not None and cumulative[-1] > max_distance:
+            return
+        yield [to_stop(node) for node in path], cumulative[-1]
+        if k is not None and len(found) >= k:
+            return
+
+        # 以上一条路径的每个节点作为偏离点，生成候选路径
+        for j in range(len(path) - 1):
+            spur_node = path[j]
+            root = path[:j + 1]
+            removed_edges = {(p[j], p[j + 1]) for p, _ in found if len(p) > j + 1 and p[:j + 1] == root}
+            removed_nodes = set(root[:-1])
+            spur = _restricted_shortest_path(neighbors, spur_node, target, removed_nodes, removed_edges)
+            if spur is None:
+                continue
+            spur_path, spur_cumulative = spur
+            candidate = root + spur_path[1:]
+            key = tuple(candidate)
+            if key in seen:
+                continue
+            seen.add(key)
+            candidate_cumulative = cumulative[:j + 1] + [cumulative[j] + d for d in spur_cumulative[1:]]
+            heapq.heappush(candidates, (candidate_cumulative[-1], len(candidate), candidate, candidate_cumulative))
+        if not candidates:
+            return
+        _, _, next_path, next_cumulative = heapq.heappop(candidates)
+        found.append((next_path, next_cumulative))
+
+def _restricted_shortest_path(neighbors, source, target, removed_nodes, removed_edges):
+    """
+    在删除指定节点和边后的图上运行Dijkstra。
+    :return: (节点路径, 各节点的累计距离列表) 或 None
+    """
+    distances = {source: 0}
+    previous = {source: None}
+    settled = set()
+    queue = [(0, source)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        for neighbor, weight in neighbors(node):
+            if neighbor in removed_nodes or (node, neighbor) in removed_edges:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous[neighbor] = node
+                heapq.heappush(queue, (new_distance, neighbor))
+    if target not in settled:
+        return None
+    path = []
+    node = target
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    path.reverse()
+    return path, [distances[node] for node in path]
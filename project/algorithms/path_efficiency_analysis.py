@@ -1,5 +1,7 @@
 from typing import List, Dict, Any
-from project.algorithms.traffic_condition_manager import TrafficConditionManager
+from project.data_structures.stop_entity import Stop
+from project.data_structures.csr_graph import CSRGraph
+import heapq
 
 # 计算路径效率
 
@@ -85,4 +87,98 @@ def compare_paths_by_efficiency_and_distance(
         'efficiency_value': eff_path.get('efficiency', 0.0),
         'efficiency_distance': eff_path.get('distance', 0.0),
         'is_same': dijkstra_path == eff_path.get('path', [])
-    } 
\ No newline at end of file
+    } 
+
+# 直接搜索最高效路径
+
+def find_most_efficient_path_by_search(network, start_stop, end_stop, wait_times: dict, speed: float = 23.0, traffic_manager = None,
+                                       cost_table = None) -> Dict[str, Any]:
+    """
+    用标号设定(label-setting)搜索直接求总行程时间最短的路径，无需枚举全部路径。
+    目标是总行程时间最短：每段行驶时间 = 该段距离 / 出发站所在区域的速度，
+    每个出发站（终点除外）加上该站的等候时间；返回的 'travel_time' 就是这个目标值。
+    返回的 'efficiency' 仍按 calculate_efficiency 计算（总距离 / 各段速度的平均值，再加等候时间），
+    与搜索的时间模型不同，因此返回的路径不保证是 'efficiency' 最高的路径；
+    也不同于 find_most_efficient_path 在枚举出的路径中取效率最高者。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :param wait_times: 各类型站点的等候时间字典（未提供traffic_manager时使用）
+    :param speed: 行驶速度，默认23km/h（未提供traffic_manager时使用）
+    :param traffic_manager: 交通状况管理器
+    :param cost_table: 可选，traffic_manager 为network（须为CSRGraph）编译的当前时段代价表，按下标取等候时间和速度
+    :return: {'path': [...], 'distance': ..., 'efficiency': ..., 'travel_time': 小时}，找不到路径时返回{}
+    """
+    start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+    end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if isinstance(network, CSRGraph):
+        source, target = network.index_of(start_id), network.index_of(end_id)
+        neighbors = network.neighbors
+        stop_id_of = network.stop_id_of
+    else:
+        source = start_id if start_id in network.adjacency_list else None
+        target = end_id if end_id in network.adjacency_list else None
+        neighbors = lambda stop_id: network.adjacency_list.get(stop_id, [])
+        stop_id_of = lambda stop_id: stop_id
+    if source is None or target is None:
+        return {}
+
+    departure_costs = {}
+
+    def departure_cost(node):
+        """在该站上车的等候时间(小时)和之后一段的速度，按站点缓存"""
+        if node not in departure_costs:
+            if cost_table is not None:
+                departure_costs[node] = (float(cost_table.wait_minutes[node]) / 60.0,
+                                         float(cost_table.departure_speeds[node]))
+                return departure_costs[node]
+            stop = network.get_stop_by_id(stop_id_of(node))
+            if traffic_manager:
+                zone = stop.zone_type.value.lower()
+                departure_costs[node] = (traffic_manager.get_wait_time(zone) / 60.0, traffic_manager.get_speed(zone))
+            else:
+                departure_costs[node] = (wait_times.get(stop.zone_type, 3) / 60.0, speed)
+        return departure_costs[node]
+
+    # 标号：(总时间, 总距离)；按时间确定，时间相同时取距离较短者
+    labels = {source: (0.0, 0)}
+    previous = {source: None}
+    settled = set()
+    queue = [(0.0, 0, source)]
+    while queue:
+        time, distance, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        wait, section_speed = departure_cost(node)
+        if section_speed <= 0:
+            continue
+        for neighbor, weight in neighbors(node):
+            label = (time + wait + weight / section_speed, distance + weight)
+            if label < labels.get(neighbor, (float('inf'), float('inf'))):
+                labels[neighbor] = label
+                previous[neighbor] = node
+                heapq.heappush(queue, (label[0], label[1], neighbor))
+    if target not in settled:
+        return {}
+
+    path = []
+    node = target
+    while node is not None:
+        path.append(stop_id_of(node))
+        node = previous[node]
+    path.reverse()
+    travel_time, total_distance = labels[target]
+    if cost_table is not None:
+        efficiency = cost_table.path_efficiency([network.index_of(stop_id) for stop_id in path], total_distance)
+    else:
+        path_stops = [network.get_stop_by_id(stop_id) for stop_id in path]
+        efficiency = calculate_efficiency(path_stops, total_distance, wait_times, speed, traffic_manager)
+    return {
+        'path': path,
+        'distance': total_distance,
+        'efficiency': efficiency,
+        'travel_time': travel_time
+    }
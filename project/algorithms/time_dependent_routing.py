@@ -0,0 +1,155 @@
+from project.data_structures.stop_entity import Stop
+from project.data_structures.csr_graph import CSRGraph
+import heapq
+
+# 时间依赖的最短行程时间搜索：按出发时刻所在的时段计算等候时间和每条边的速度，
+# 行程跨越时段切换时按新时段的速度继续计算
+
+
+def boarding_time(traffic_manager, zone, arrival):
+    """
+    在站点上车的时刻：到站时刻加上当时所在时段的等候时间。
+    等候期间切换到等候时间更短的时段时，按更早的上车时刻计算（相当于允许在站内多等一会儿），
+    保证晚到站的乘客不会比早到站的更早上车（FIFO），时间依赖的Dijkstra因此是精确的。
+    :param traffic_manager: TrafficConditionManager
+    :param zone: 站点区域类型（小写字符串）
+    :param arrival: 到站时刻（小时）
+    :return: 上车时刻（小时）
+    """
+    return _boarding_time(traffic_manager, lambda period: traffic_manager.get_wait_time(zone, period), arrival)
+
+
+def _boarding_time(traffic_manager, wait_minutes, arrival):
+    """boarding_time 的实现，wait_minutes(period) 给出该站在各时段的等候时间（分钟）"""
+    best = arrival + wait_minutes(traffic_manager.period_at(arrival)) / 60.0
+    change = traffic_manager.next_period_change(arrival)
+    while change < best:
+        best = min(best, change + wait_minutes(traffic_manager.period_at(change)) / 60.0)
+        change = traffic_manager.next_period_change(change)
+    return best
+
+
+def edge_arrival_time(traffic_manager, from_zone, to_zone, distance, departure):
+    """
+    按 get_edge_speed 分段计算走完一条边的到达时刻：每个时段内用该时段的速度，
+    在时段切换的时刻改用新时段的速度。
+    :param from_zone: 起点区域类型（小写字符串）
+    :param to_zone: 终点区域类型（小写字符串）
+    :param distance: 边的距离(km)
+    :param departure: 出发时刻（小时）
+    :return: 到达时刻（小时）；遇到速度为0的时段时返回 float('inf')
+    """
+    return _edge_arrival_time(traffic_manager, lambda period: traffic_manager.get_edge_speed(from_zone, to_zone, period),
+                              distance, departure)
+
+
+def _edge_arrival_time(traffic_manager, edge_speed, distance, departure):
+    """edge_arrival_time 的实现，edge_speed(period) 给出该边在各时段的速度（km/h）"""
+    time = departure
+    remaining = distance
+    while remaining > 0:
+        speed = edge_speed(traffic_manager.period_at(time))
+        if speed <= 0:
+            return float('inf')
+        change = traffic_manager.next_period_change(time)
+        arrival = time + remaining / speed
+        if arrival <= change:
+            return arrival
+        remaining -= speed * (change - time)
+        time = change
+    return time
+
+
+def time_dependent_fastest_path(network, start_stop, end_stop, departure_time, traffic_manager, cost_tables=None):
+    """
+    时间依赖的Dijkstra：给定出发时刻，一次搜索求出到达时刻最早的路径。
+    与 find_most_efficient_path_by_search 一样，每个出发站（终点除外）加上等候时间；
+    等候时间按到站时刻所在的时段计算，每条边的速度由 get_edge_speed 按行驶时所在的时段给出
+    （见 boarding_time、edge_arrival_time）。
+    提供cost_tables时等候时间和边速度按下标从各时段的代价表中取数：
+    一条边在上车时段内就能走完时，到达时刻直接用 edge_times 得出，不再逐段计算。
+    :param network: TransportNetwork 对象，或其CSR视图 CSRGraph
+    :param start_stop: 起始 Stop 对象或stop_ID
+    :param end_stop: 终点 Stop 对象或stop_ID
+    :param departure_time: 出发时刻（小时，如8.5表示08:30）
+    :param traffic_manager: 交通状况管理器，提供 PERIOD_SCHEDULE 及按时段的等候时间和边速度
+    :param cost_tables: 可选，traffic_manager 为network（须为CSRGraph）编译的全部时段代价表 {时段: PeriodCostTable}
+    :return: {'path': [...], 'distance': ..., 'departure_time': ..., 'arrival_time': ...,
+              'travel_time': 小时, 'efficiency': km/h}，找不到路径时返回{}
+    """
+    start_id = start_stop.stop_ID if isinstance(start_stop, Stop) else start_stop
+    end_id = end_stop.stop_ID if isinstance(end_stop, Stop) else end_stop
+    if isinstance(network, CSRGraph):
+        source, target = network.index_of(start_id), network.index_of(end_id)
+        neighbors = network.neighbors
+        stop_id_of = network.stop_id_of
+    else:
+        source = start_id if start_id in network.adjacency_list else None
+        target = end_id if end_id in network.adjacency_list else None
+        neighbors = lambda stop_id: network.adjacency_list.get(stop_id, [])
+        stop_id_of = lambda stop_id: stop_id
+    if source is None or target is None:
+        return {}
+
+    zones = {}
+
+    def zone_of(node):
+        if node not in zones:
+            zones[node] = network.get_stop_by_id(stop_id_of(node)).zone_type.value.lower()
+        return zones[node]
+
+    # 标号：(到达时刻, 总距离)；按时刻确定，时刻相同时取距离较短者
+    labels = {source: (departure_time, 0)}
+    previous = {source: None}
+    settled = set()
+    queue = [(departure_time, 0, source)]
+    while queue:
+        time, distance, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node == target:
+            break
+        if cost_tables is not None:
+            board = _boarding_time(traffic_manager, lambda period: float(cost_tables[period].wait_minutes[node]), time)
+            edge_times = cost_tables[traffic_manager.period_at(board)].edge_times
+            change = traffic_manager.next_period_change(board)
+            first_edge = int(network.offsets[node])
+        else:
+            board = boarding_time(traffic_manager, zone_of(node), time)
+        for position, (neighbor, weight) in enumerate(neighbors(node)):
+            if neighbor in settled:
+                continue
+            if cost_tables is None:
+                arrival = edge_arrival_time(traffic_manager, zone_of(node), zone_of(neighbor), weight, board)
+            else:
+                k = first_edge + position
+                arrival = board + float(edge_times[k])
+                if not arrival <= change:
+                    # 跨越时段切换（或速度为0）时按各时段的边速度逐段计算
+                    arrival = _edge_arrival_time(traffic_manager, lambda period: float(cost_tables[period].edge_speeds[k]),
+                                                 weight, board)
+            label = (arrival, distance + weight)
+            if label < labels.get(neighbor, (float('inf'), float('inf'))):
+                labels[neighbor] = label
+                previous[neighbor] = node
+                heapq.heappush(queue, (label[0], label[1], neighbor))
+    if target not in settled:
+        return {}
+
+    path = []
+    node = target
+    while node is not None:
+        path.append(stop_id_of(node))
+        node = previous[node]
+    path.reverse()
+    arrival_time, total_distance = labels[target]
+    travel_time = arrival_time - departure_time
+    return {
+        'path': path,
+        'distance': total_distance,
+        'departure_time': departure_time,
+        'arrival_time': arrival_time,
+        'travel_time': travel_time,
+        'efficiency': total_distance / travel_time if travel_time > 0 else 0.0
+    }
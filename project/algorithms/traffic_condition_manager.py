@@ -1,4 +1,46 @@
+import bisect
+import math
+import numpy as np
 from project.data_structures.stop_entity import ZoneType
+from project.data_structures.stop_table import ZONE_TYPES, ZONE_CODES
+
+
+class PeriodCostTable:
+    """
+    某一时段按CSR下标编译好的稠密代价数组，路径评分只需按下标取数：
+        wait_minutes[i]      第i个站点的等候时间（分钟，get_wait_time）
+        departure_speeds[i]  从第i个站点出发一段的速度（km/h，get_speed，与 calculate_efficiency 一致）
+        edge_speeds[k]       第k条边的速度（km/h，get_edge_speed），与 graph.targets 对齐
+        edge_times[k]        第k条边的行驶时间（小时）
+    """
+
+    def __init__(self, period, graph, wait_minutes, departure_speeds, edge_speeds):
+        self.period = period
+        self.graph = graph
+        self.wait_minutes = wait_minutes
+        self.departure_speeds = departure_speeds
+        self.edge_speeds = edge_speeds
+        with np.errstate(divide='ignore'):
+            self.edge_times = graph.weights / edge_speeds
+        for array in (wait_minutes, departure_speeds, edge_speeds, self.edge_times):
+            array.flags.writeable = False
+
+    def path_efficiency(self, indices, total_distance):
+        """
+        与 calculate_efficiency(..., traffic_manager=...) 相同的效率值(km/h)，按下标取数计算。
+        :param indices: 路径上各站点的CSR下标
+        :param total_distance: 路径总距离(km)
+        """
+        if len(indices) < 2:
+            return 0.0
+        departures = np.asarray(indices[:-1])
+        # 取出后按路径顺序用 sum 累加，结果与 calculate_efficiency 逐位相同
+        wait_time = sum(self.wait_minutes[departures].tolist())
+        avg_speed = sum(self.departure_speeds[departures].tolist()) / len(departures)
+        if avg_speed <= 0:
+            return 0.0
+        total_time = total_distance / avg_speed + wait_time / 60.0
+        return total_distance / total_time if total_time > 0 else 0.0
 
 class TrafficConditionManager:
     """
@@ -52,11 +94,24 @@ class TrafficConditionManager:
         }
     }
 
+    # 一天中各时段的开始时间（小时），按时间排序，用于按出发时间确定时段
+    PERIOD_SCHEDULE = (
+        (0.0, NORMAL),
+        (7.0, PEAK_MORNING),
+        (9.0, NORMAL),
+        (17.0, PEAK_EVENING),
+        (19.0, NORMAL),
+    )
+
     def __init__(self):
         self.period = self.NORMAL
         self.base_speed = 23
         self.congestion_wait_time = 2 
         self.congestion_speed = 15   
+        # 按CSR视图编译的各时段代价表：(graph, zones_version, {时段: PeriodCostTable})
+        self._compiled = None
+        # 当前时段的代价表，set_period 时整体替换
+        self.current_table = None
 
     def set_period(self, period: str):
         """
@@ -65,23 +120,96 @@ class TrafficConditionManager:
         if period not in [self.PEAK_MORNING, self.NORMAL, self.PEAK_EVENING]:
             raise ValueError(f"无效的时段: {period}")
         self.period = period
+        if self._compiled is not None:
+            # 各时段的表已编译好，切换时段只替换引用，不重新计算
+            self.current_table = self._compiled[2][period]
 
-    def get_area_congestion(self, area_type: str):
+    def cost_table(self, graph, period=None, zones_version=None):
         """
-        判断指定区域类型在当前时段是否拥堵。
+        返回某一时段（默认为当前时段）在graph上的代价表。
+        第一次使用某个CSR视图时一次编译全部时段；网络修改后CSR视图会换成新对象，届时重新编译。
+        :param graph: CSRGraph（如 TransportNetwork.to_csr() 的结果），站点需能通过 get_stop_by_id 取到
+        :param period: 可选，时段
+        :param zones_version: 可选，站点区域类型的版本号；站点类型被修改（不改变CSR视图）时传入新值以重新编译
+        :return: PeriodCostTable
         """
-        if self.period == self.PEAK_MORNING:
+        return self.cost_tables(graph, zones_version)[period or self.period]
+
+    def cost_tables(self, graph, zones_version=None):
+        """
+        返回graph上全部时段的代价表 {时段: PeriodCostTable}，与 cost_table 共用同一份编译结果，
+        供行程跨越多个时段的搜索（如 time_dependent_fastest_path）使用。
+        """
+        if self._compiled is None or self._compiled[0] is not graph or self._compiled[1] != zones_version:
+            tables = self.compile_tables(graph)
+            self._compiled = (graph, zones_version, tables)
+            self.current_table = tables[self.period]
+        return self._compiled[2]
+
+    def compile_tables(self, graph):
+        """
+        为graph编译全部时段的代价表：先按区域类型编码求出每个时段的小查找表，再按下标整体取数。
+        :return: {时段: PeriodCostTable}
+        """
+        codes = np.array([ZONE_CODES[graph.get_stop_by_id(stop_id).zone_type] for stop_id in graph.stop_ids],
+                         dtype=np.intp)
+        sources = np.repeat(codes, np.diff(graph.offsets))
+        targets = codes[graph.targets]
+        zones = [zone.value.lower() for zone in ZONE_TYPES]
+        tables = {}
+        for _, period in self.PERIOD_SCHEDULE:
+            if period in tables:
+                continue
+            wait = np.array([self.get_wait_time(zone, period) for zone in zones], dtype=np.float64)
+            speed = np.array([self._period_speed(zone, period) for zone in zones], dtype=np.float64)
+            edge_speed = np.array([[self.get_edge_speed(a, b, period) for b in zones] for a in zones],
+                                  dtype=np.float64)
+            tables[period] = PeriodCostTable(period, graph, wait[codes], speed[codes], edge_speed[sources, targets])
+        return tables
+
+    def _period_speed(self, area_type, period):
+        """按给定时段计算 get_speed 的结果"""
+        current, self.period = self.period, period
+        try:
+            return self.get_speed(area_type)
+        finally:
+            self.period = current
+
+    def period_at(self, time_of_day: float):
+        """
+        返回某一时刻所在的时段（按 PERIOD_SCHEDULE）。
+        :param time_of_day: 时刻（小时，如8.5表示08:30），超过24的部分按第二天计算
+        """
+        starts = [start for start, _ in self.PERIOD_SCHEDULE]
+        return self.PERIOD_SCHEDULE[bisect.bisect_right(starts, time_of_day % 24) - 1][1]
+
+    def next_period_change(self, time: float):
+        """
+        返回time之后（不含）下一次时段切换的时刻（小时，与time在同一时间轴上，可能超过24）。
+        """
+        day = math.floor(time / 24) * 24
+        for start, _ in self.PERIOD_SCHEDULE:
+            if day + start > time:
+                return day + start
+        return day + 24 + self.PERIOD_SCHEDULE[0][0]
+
+    def get_area_congestion(self, area_type: str, period=None):
+        """
+        判断指定区域类型在当前时段（或给定的period）是否拥堵。
+        """
+        period = period or self.period
+        if period == self.PEAK_MORNING:
             return area_type.lower() == self.RESIDENTIAL
-        elif self.period == self.PEAK_EVENING:
+        elif period == self.PEAK_EVENING:
             return area_type.lower() in [self.COMMERCIAL, self.INDUSTRIAL]
         return False
 
-    def get_wait_time(self, area_type: str):
+    def get_wait_time(self, area_type: str, period=None):
         """
-        获取指定区域类型的当前等待时间。
+        获取指定区域类型在当前时段（或给定的period）的等待时间。
         """
         area_type = area_type.lower()
-        wait_times = self.PEAK_WAIT_TIMES.get(self.period, self.PEAK_WAIT_TIMES[self.NORMAL])
+        wait_times = self.PEAK_WAIT_TIMES.get(period or self.period, self.PEAK_WAIT_TIMES[self.NORMAL])
         return wait_times.get(area_type, wait_times[self.MIXED])
 
     def get_speed(self, area_type: str, is_entering_or_leaving_peak_area=False):
@@ -96,14 +224,16 @@ class TrafficConditionManager:
     def get_current_period(self):
         return self.period 
 
-    def get_edge_speed(self, from_area_type: str, to_area_type: str):
+    def get_edge_speed(self, from_area_type: str, to_area_type: str, period=None):
         """
         获取一条边（from→to）的速度：只要起点或终点是高峰区域，速度都降为15km/h，否则为正常速度。
         用于路径分析时遍历边，确保进边和出边都降速，且不会重复计算。
         :param from_area_type: 起点区域类型（字符串）
         :param to_area_type: 终点区域类型（字符串）
+        :param period: 可选，按该时段计算，默认为当前时段
         :return: 该边的速度（int）
         """
-        if self.get_area_congestion(from_area_type) or self.get_area_congestion(to_area_type):
-            return self.PEAK_SPEEDS[self.period]["congested"]
-        return self.PEAK_SPEEDS[self.period]["normal"] 
\ No newline at end of file
+        period = period or self.period
+        if self.get_area_congestion(from_area_type, period) or self.get_area_congestion(to_area_type, period):
+            return self.PEAK_SPEEDS[period]["congested"]
+        return self.PEAK_SPEEDS[period]["normal"] 
\ No newline at end of file
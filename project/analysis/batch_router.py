@@ -0,0 +1,171 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from project.algorithms.dijkstra_shortest_path_algorithm import shortest_path_tree
+from project.core.network_snapshot import open_mapped_network, save_snapshot
+from project.data_structures.stop_entity import Stop
+
+# 结果行的列：起点ID、终点ID、最短距离（不可达为inf）、路径（站点ID用 PATH_SEPARATOR 连接，不需要路径时为空）
+RESULT_COLUMNS = ('origin', 'destination', 'distance', 'path')
+PATH_SEPARATOR = '>'
+
+# 工作进程中打开的网络CSR视图，由 _init_worker 设置
+_worker_graph = None
+
+
+def _init_worker(snapshot_dir):
+    """工作进程初始化：以内存映射方式打开快照，所有工作进程共享同一份线路数组"""
+    global _worker_graph
+    network = open_mapped_network(snapshot_dir)
+    if network is None:
+        raise ValueError(f"No usable network snapshot in {snapshot_dir}")
+    _worker_graph = network.to_csr()
+
+
+def _route_sources(tasks, include_paths):
+    """
+    工作进程中执行的任务：每个起点运行一次Dijkstra（全部终点确定后提前结束），查询该起点的所有终点
+
+    :param tasks: [(起点ID, [终点ID, ...]), ...]
+    :return: 结果行列表，列见 RESULT_COLUMNS
+    """
+    rows = []
+    for source, targets in tasks:
+        tree = shortest_path_tree(_worker_graph, source, targets=targets)
+        for target in targets:
+            if tree is None:
+                rows.append((source, target, float('inf'), ''))
+                continue
+            distance = tree.distance_to(target)
+            path = ''
+            if include_paths and distance != float('inf'):
+                path = PATH_SEPARATOR.join(str(stop_id) for stop_id in tree.path_ids_to(target))
+            rows.append((source, target, distance, path))
+    return rows
+
+
+class BatchRouter:
+    """
+    多进程批量最短路径计算（按距离，与 PathAnalyzer.find_best_path 的默认结果相同）。
+
+    网络以快照形式交给工作进程：每个进程启动时内存映射同一份快照（见 open_mapped_network），
+    不需要序列化整个网络。起讫点对按起点分组，同一起点的所有终点共用一棵最短路径树；
+    起点再按 sources_per_task 个一组分配给 ProcessPoolExecutor，结果按完成顺序流式产出。
+    """
+    # 每个任务包含的起点数，以及每个工作进程最多排队的任务数
+    SOURCES_PER_TASK = 16
+    TASKS_PER_WORKER = 2
+
+    def __init__(self, snapshot_dir, max_workers=None, sources_per_task=None):
+        """
+        :param snapshot_dir: 网络快照目录（save_snapshot 或带 snapshot_dir 的 NetworkDataManager 生成）
+        :param max_workers: 工作进程数，默认为CPU核数
+        :param sources_per_task: 每个任务包含的起点数，默认 SOURCES_PER_TASK
+        """
+        if open_mapped_network(snapshot_dir) is None:
+            raise ValueError(f"No usable network snapshot in {snapshot_dir}")
+        self.snapshot_dir = snapshot_dir
+        self.max_workers = max_workers
+        self.sources_per_task = sources_per_task or self.SOURCES_PER_TASK
+
+    @classmethod
+    def from_network(cls, network, snapshot_dir, max_workers=None, sources_per_task=None):
+        """把网络保存为快照后创建 BatchRouter"""
+        save_snapshot(network, snapshot_dir, source_hash=None)
+        return cls(snapshot_dir, max_workers=max_workers, sources_per_task=sources_per_task)
+
+    def iter_routes(self, pairs, include_paths=False):
+        """
+        计算起讫点对的最短距离，按任务完成顺序逐行产出（不保证与输入顺序相同）
+
+        :param pairs: (起点, 终点) 的可迭代对象，元素可以是 Stop 对象或stop_ID
+        :param include_paths: 是否输出路径
+        :return: 结果行 (origin, destination, distance, path) 的迭代器
+        """
+        grouped = {}
+        for origin, destination in pairs:
+            origin = origin.stop_ID if isinstance(origin, Stop) else origin
+            destination = destination.stop_ID if isinstance(destination, Stop) else destination
+            grouped.setdefault(origin, []).append(destination)
+        return self._run(list(grouped.items()), include_paths)
+
+    def iter_od_matrix(self, sources, targets, include_paths=False):
+        """计算 sources × targets 的全部起讫点对，不需要先展开成点对列表"""
+        targets = [t.stop_ID if isinstance(t, Stop) else t for t in targets]
+        tasks = [(s.stop_ID if isinstance(s, Stop) else s, targets) for s in sources]
+        return self._run(tasks, include_paths)
+
+    def _run(self, tasks, include_paths):
+        chunks = [tasks[i:i + self.sources_per_task] for i in range(0, len(tasks), self.sources_per_task)]
+        if not chunks:
+            return
+        workers = self.max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.snapshot_dir,)) as executor:
+            # 限制排队的任务数，结果写出后才提交新任务，内存占用与起点总数无关
+            window = self.TASKS_PER_WORKER * workers
+            pending = set()
+            chunks = iter(chunks)
+            for chunk in chunks:
+                pending.add(executor.submit(_route_sources, chunk, include_paths))
+                if len(pending) >= window:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.add(executor.submit(_route_sources, chunk, include_paths))
+
+    def route_to_csv(self, pairs, file_path, include_paths=False):
+        """
+        计算起讫点对并逐行写入CSV（列见 RESULT_COLUMNS）
+
+        :return: 写入的行数
+        """
+        count = 0
+        with open(file_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(RESULT_COLUMNS)
+            for row in self.iter_routes(pairs, include_paths):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def route_to_parquet(self, pairs, file_path, include_paths=False, batch_size=100000):
+        """
+        计算起讫点对并按批写入Parquet文件（需要安装 pyarrow）；没有起讫点对时不创建文件
+
+        :param batch_size: 每个行组的行数
+        :return: 写入的行数
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet requires pyarrow (pip install pyarrow)")
+        count = 0
+        writer = None
+        batch = []
+
+        def flush():
+            nonlocal writer
+            table = pa.Table.from_pydict({name: list(column) for name, column in zip(RESULT_COLUMNS, zip(*batch))})
+            if writer is None:
+                writer = pq.ParquetWriter(file_path, table.schema)
+            writer.write_table(table)
+            batch.clear()
+
+        try:
+            for row in self.iter_routes(pairs, include_paths):
+                batch.append(row)
+                count += 1
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
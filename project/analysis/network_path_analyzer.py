@@ -1,9 +1,13 @@
-from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
-from project.algorithms.dfs_all_paths_algorithm import find_all_paths as find_all_paths_algo
-from project.algorithms.path_efficiency_analysis import calculate_efficiency, find_most_efficient_path, compare_paths_by_efficiency_and_distance
-from project.data_structures.transport_network_structure import TransportNetwork
-from project.data_structures.stop_entity import Stop, ZoneType
+from collections import OrderedDict
+from project.algorithms.dijkstra_shortest_path_algorithm import shortest_path_tree, bidirectional_dijkstra, astar, haversine_heuristic_scale
+from project.algorithms.contraction_hierarchies import ContractionHierarchy
+from project.algorithms.dfs_all_paths_algorithm import iter_all_paths
+from project.algorithms.k_shortest_paths_algorithm import k_shortest_paths
+from project.algorithms.path_efficiency_analysis import calculate_efficiency, find_most_efficient_path_by_search
+from project.algorithms.time_dependent_routing import time_dependent_fastest_path
+from project.data_structures.stop_entity import ZoneType
 from project.algorithms.traffic_condition_manager import TrafficConditionManager
+from project.data_structures.csr_graph import CSRGraph
 
 class PathAnalyzer:
     # 定义各类型站点的等待时间（分钟）
@@ -13,10 +17,25 @@ class PathAnalyzer:
         ZoneType.INDUSTRIAL: 3,
         ZoneType.MIXED: 3,
     }
+    # 缓存的最短路径树的总条目数上限（见 ShortestPathTree.__len__），按LRU淘汰
+    MAX_CACHED_TREE_NODES = 1000000
+    # 枚举路径时的默认距离上限（DFS与Yen算法共用，保证两种方式返回同一范围内的路径）
+    MAX_PATH_DISTANCE = 80
 
-    def __init__(self, data_manager, traffic_manager=None):
+    def __init__(self, data_manager, traffic_manager=None, use_csr=False):
+        """
+        :param use_csr: 为True时在网络的CSR只读视图上运行搜索（大规模网络更省内存、更快）
+        """
         self.data_manager = data_manager
         self.traffic_manager = traffic_manager or TrafficConditionManager()
+        self.use_csr = use_csr
+        self._tree_cache = OrderedDict()
+        self._tree_cache_nodes = 0
+        # 缓存所属的网络对象及其版本号；网络被替换或修改后清空缓存
+        self._tree_cache_network = None
+        self._tree_cache_version = None
+        self._heuristic_scale_cache = (None, None)
+        self.contraction_hierarchy = None
     
     def set_traffic_manager(self, traffic_manager):
         """设置交通状况管理器"""
@@ -25,29 +44,176 @@ class PathAnalyzer:
     def _get_stop_by_id(self, stop_id):
         return self.data_manager.network.get_stop_by_id(stop_id)
 
-    def find_all_paths(self, start, end, include_efficiency=False):
+    def _get_search_network(self):
+        """返回搜索算法使用的图：启用CSR时为按版本缓存的CSR视图，否则为原网络"""
+        network = self.data_manager.network
+        if self.use_csr and hasattr(network, 'to_csr'):
+            return network.to_csr()
+        return network
+
+    def cost_table(self):
+        """
+        交通状况管理器为当前网络编译的当前时段代价表（见 TrafficConditionManager.cost_table）；
+        交通状况管理器不支持编译，或网络没有按版本缓存的CSR视图时返回None
+        """
+        network = self.data_manager.network
+        if not isinstance(self.traffic_manager, TrafficConditionManager) or not hasattr(network, 'to_csr'):
+            return None
+        graph = network.to_csr()
+        if not isinstance(graph, CSRGraph) or graph.version is None:
+            return None
+        return self.traffic_manager.cost_table(graph, zones_version=getattr(self.data_manager, 'zones_version', None))
+
+    def score_paths(self, paths):
+        """
+        按当前时段重新计算路径的效率，不重新枚举路径（如切换时段后刷新已找到的路径）
+        :param paths: find_all_paths(include_efficiency=True) 返回的字典列表，只使用其中的 'path' 和 'distance'
+        :return: 新的字典列表，'efficiency' 为当前时段的效率
+        """
+        table = self.cost_table()
+        if table is not None:
+            index = table.graph.index
+            return [dict(item, efficiency=table.path_efficiency([index[stop_id] for stop_id in item['path']],
+                                                                 item['distance']))
+                    for item in paths]
+        return [dict(item, efficiency=calculate_efficiency([self._get_stop_by_id(stop_id) for stop_id in item['path']],
+                                                           item['distance'], self.WAIT_TIMES,
+                                                           traffic_manager=self.traffic_manager))
+                for item in paths]
+
+    def shortest_path_tree(self, start, target=None):
+        """
+        获取以start为源点的最短路径树。
+        网络有版本号时按源点缓存（LRU，总条目数不超过 MAX_CACHED_TREE_NODES），同一起点的多个终点查询只需一次搜索。
+        :param target: 可选，只需要到该终点的结果：搜索到target即结束，缓存的树已覆盖target时直接复用
+        """
+        start_id = start.stop_ID if hasattr(start, 'stop_ID') else start
+        network = self._get_search_network()
+        targets = None if target is None else [target]
+        owner = self.data_manager.network
+        version = getattr(owner, 'version', None)
+        if not isinstance(version, int):
+            return shortest_path_tree(network, start_id, targets=targets)
+        if owner is not self._tree_cache_network or version != self._tree_cache_version:
+            self._tree_cache.clear()
+            self._tree_cache_nodes = 0
+            self._tree_cache_network = owner
+            self._tree_cache_version = version
+        key = (start_id, self.use_csr)
+        tree = self._tree_cache.get(key)
+        if tree is not None and (tree.radius is None or (target is not None and tree.covers(target))):
+            self._tree_cache.move_to_end(key)
+            return tree
+        tree = shortest_path_tree(network, start_id, targets=targets)
+        if tree is None:
+            return None
+        # 未覆盖target的旧树半径更小，新树覆盖它能回答的全部终点，直接替换
+        if key in self._tree_cache:
+            self._tree_cache_nodes -= len(self._tree_cache.pop(key))
+        self._tree_cache[key] = tree
+        self._tree_cache_nodes += len(tree)
+        while self._tree_cache_nodes > self.MAX_CACHED_TREE_NODES and len(self._tree_cache) > 1:
+            _, evicted = self._tree_cache.popitem(last=False)
+            self._tree_cache_nodes -= len(evicted)
+        return tree
+
+    def _shortest_path(self, start_id, end_id):
+        """通过缓存的最短路径树查询（搜索到终点即结束），返回格式与 dijkstra() 相同"""
+        tree = self.shortest_path_tree(start_id, end_id)
+        if tree is None:
+            return None, float('inf')
+        return tree.path_to(end_id)
+
+    def _get_heuristic_scale(self):
+        """A*启发函数的缩放系数，按网络对象及其版本缓存，避免每次点击都校验全部线路"""
+        network = self.data_manager.network
+        version = getattr(network, 'version', None)
+        cached_key, scale = self._heuristic_scale_cache
+        if isinstance(version, int) and cached_key is not None and cached_key[0] is network and cached_key[1] == version:
+            return scale
+        scale = haversine_heuristic_scale(self._get_search_network())
+        if isinstance(version, int):
+            self._heuristic_scale_cache = ((network, version), scale)
+        return scale
+
+    def build_contraction_hierarchy(self):
+        """为当前网络构建收缩层次索引，之后的最短路径查询会优先使用它"""
+        self.contraction_hierarchy = ContractionHierarchy.build(self.data_manager.network)
+        return self.contraction_hierarchy
+
+    def save_contraction_hierarchy(self, file_path):
+        if self.contraction_hierarchy is None:
+            raise ValueError("No contraction hierarchy has been built")
+        self.contraction_hierarchy.save(file_path)
+
+    def load_contraction_hierarchy(self, file_path):
+        """
+        从磁盘加载收缩层次索引。
+        :return: 索引与当前网络内容一致时返回True；不一致时不启用并返回False
+        """
+        hierarchy = ContractionHierarchy.load(file_path)
+        if not hierarchy.bind(self.data_manager.network):
+            return False
+        self.contraction_hierarchy = hierarchy
+        return True
+
+    def _get_valid_hierarchy(self):
+        """返回与当前网络版本一致的收缩层次索引；网络已被编辑时返回None"""
+        hierarchy = self.contraction_hierarchy
+        if hierarchy is not None and hierarchy.is_valid_for(self.data_manager.network):
+            return hierarchy
+        return None
+
+    def iter_all_paths(self, start, end, limit=None, timeout=None, cancel_token=None, max_distance=MAX_PATH_DISTANCE):
+        """
+        惰性地逐条产出起点到终点的路径 (stop_ID列表, 距离)，参数含义见 dfs_all_paths_algorithm.iter_all_paths
+        """
+        start_id = start if isinstance(start, int) else (start.stop_ID if hasattr(start, 'stop_ID') else start)
+        end_id = end if isinstance(end, int) else (end.stop_ID if hasattr(end, 'stop_ID') else end)
+        if not self._get_stop_by_id(start_id) or not self._get_stop_by_id(end_id):
+            return iter(())
+        return iter_all_paths(self._get_search_network(), start_id, end_id, max_distance=max_distance,
+                              limit=limit, timeout=timeout, cancel_token=cancel_token)
+
+    def find_all_paths(self, start, end, include_efficiency=False, k=None, limit=None, timeout=None, cancel_token=None,
+                       max_distance=MAX_PATH_DISTANCE):
+        """
+        查找起点到终点的路径
+        :param k: 为None时用DFS枚举距离上限内的全部路径；给定时用Yen算法只返回距离最短的前k条路径
+        :param max_distance: 路径的距离上限（两种方式相同），None表示不限
+        :param limit: DFS枚举时最多返回的路径数
+        :param timeout: DFS枚举的时间上限（秒），超时后返回已找到的路径
+        :param cancel_token: DFS枚举的取消标志（提供 is_set()，如 threading.Event）
+        """
         start_id = start if isinstance(start, int) else (start.stop_ID if hasattr(start, 'stop_ID') else start)
         end_id = end if isinstance(end, int) else (end.stop_ID if hasattr(end, 'stop_ID') else end)
         start_stop = self._get_stop_by_id(start_id)
         end_stop = self._get_stop_by_id(end_id)
         if not start_stop or not end_stop:
             return [] if not include_efficiency else []
-        all_paths = find_all_paths_algo(self.data_manager.network, start_id, end_id)
+        if k is None:
+            id_paths = self.iter_all_paths(start_id, end_id, limit=limit, timeout=timeout, cancel_token=cancel_token,
+                                           max_distance=max_distance)
+        else:
+            id_paths = (([stop.stop_ID for stop in path], distance)
+                        for path, distance in k_shortest_paths(self._get_search_network(), start_id, end_id, k=k,
+                                                               max_distance=max_distance))
         if not include_efficiency:
-            return [[stop.stop_ID for stop in path] for path, _ in all_paths]
+            return [path for path, _ in id_paths]
         else:
-            return [{
-                'path': [stop.stop_ID for stop in path],
-                'distance': distance,
-                'efficiency': calculate_efficiency(path, distance, self.WAIT_TIMES, 
-                                                traffic_manager=self.traffic_manager)
-            } for path, distance in all_paths]
+            return self.score_paths([{'path': path, 'distance': distance} for path, distance in id_paths])
 
-    def find_best_path(self, start, end, by_efficiency=False):
+    def find_best_path(self, start, end, by_efficiency=False, algorithm=None):
         """
         查找最优路径
-        :param by_efficiency: True按效率优化，False按距离优化
-        :return: 路径ID列表 or 带效率的字典
+        :param by_efficiency: True时返回总行程时间（含各站等候时间）最短的路径，False按距离优化。
+                              注意行程时间最短不等于效率（距离/时间）最高：绕远的路径可能效率更高但更慢
+        :param algorithm: 按距离优化时的搜索方式：None（有最新的收缩层次索引时使用它，否则同'dijkstra'）、
+                          'ch'（使用收缩层次索引，索引过期时退回'dijkstra'）、
+                          'dijkstra'（复用缓存的最短路径树）、
+                          'bidirectional'（双向Dijkstra，适合一次性的点对点交互查询）或
+                          'astar'（以大圆距离为启发函数的A*，坐标不可用时自动退回Dijkstra）
+        :return: 路径ID列表 or 带效率的字典（含 'path'、'distance'、'efficiency'、'travel_time'）
         """
         start_stop = self._get_stop_by_id(start)
         end_stop = self._get_stop_by_id(end)
@@ -56,27 +222,84 @@ class PathAnalyzer:
             return [] if not by_efficiency else {}
 
         if not by_efficiency:
-            path_stops, _ = dijkstra(self.data_manager.network, start_stop, end_stop)
-            return [s.stop_ID for s in path_stops] if path_stops else []
+            path_ids, _ = self._distance_path(start_stop.stop_ID, end_stop.stop_ID, algorithm)
+            return path_ids
+        else:
+            return self._find_most_efficient_path(start_stop.stop_ID, end_stop.stop_ID)
+
+    def _distance_path(self, start_id, end_id, algorithm=None):
+        """
+        按 algorithm 指定的方式（含义见 find_best_path）搜索距离最短的路径
+        :return: (路径ID列表, 距离)，找不到路径时为 ([], float('inf'))
+        """
+        hierarchy = self._get_valid_hierarchy() if algorithm in (None, 'ch') else None
+        if hierarchy is not None:
+            path_ids, distance = hierarchy.query(start_id, end_id)
+            return (path_ids, distance) if path_ids else ([], float('inf'))
+        if algorithm == 'bidirectional':
+            path_stops, distance = bidirectional_dijkstra(self._get_search_network(), start_id, end_id)
+        elif algorithm == 'astar':
+            path_stops, distance = astar(self._get_search_network(), start_id, end_id,
+                                         heuristic_scale=self._get_heuristic_scale())
+        elif algorithm in (None, 'ch', 'dijkstra'):
+            path_stops, distance = self._shortest_path(start_id, end_id)
         else:
-            all_paths = self.find_all_paths(start, end, include_efficiency=True)
-            return find_most_efficient_path(all_paths) if all_paths else {}
+            raise ValueError(f"Unknown search algorithm: {algorithm}")
+        if not path_stops:
+            return [], float('inf')
+        return [s.stop_ID for s in path_stops], distance
+
+    def _find_most_efficient_path(self, start_id, end_id):
+        table = self.cost_table()
+        if table is not None:
+            # 在代价表对应的CSR视图上搜索，等候时间和速度按下标取数
+            return find_most_efficient_path_by_search(table.graph, start_id, end_id, self.WAIT_TIMES,
+                                                      traffic_manager=self.traffic_manager, cost_table=table)
+        return find_most_efficient_path_by_search(self._get_search_network(), start_id, end_id, self.WAIT_TIMES,
+                                                  traffic_manager=self.traffic_manager)
 
-    def compare_best_paths(self, start, end):
+    def find_fastest_path_at(self, start, end, departure_time):
+        """
+        按出发时刻查找到达最早的路径：等候时间和边速度随行程经过的时段变化（见 time_dependent_routing）
+        :param departure_time: 出发时刻（小时，如8.5表示08:30）
+        :return: 含 'path'、'distance'、'departure_time'、'arrival_time'、'travel_time'、'efficiency' 的字典，
+                 找不到路径时返回{}
+        """
+        start_stop = self._get_stop_by_id(start)
+        end_stop = self._get_stop_by_id(end)
+        if not start_stop or not end_stop:
+            return {}
+        table = self.cost_table()
+        if table is not None:
+            # 在代价表对应的CSR视图上搜索，各时段的等候时间和边速度按下标取数
+            tables = self.traffic_manager.cost_tables(table.graph,
+                                                      zones_version=getattr(self.data_manager, 'zones_version', None))
+            return time_dependent_fastest_path(table.graph, start_stop.stop_ID, end_stop.stop_ID,
+                                               departure_time, self.traffic_manager, cost_tables=tables)
+        return time_dependent_fastest_path(self._get_search_network(), start_stop.stop_ID, end_stop.stop_ID,
+                                           departure_time, self.traffic_manager)
+
+    def compare_best_paths(self, start, end, algorithm=None):
+        """
+        比较距离最短的路径与行程时间最短的路径
+        :param algorithm: 距离最短路径的搜索方式，与 find_best_path 相同；
+                          默认与 find_best_path 的默认方式一致，两者先后调用时复用同一索引/最短路径树
+        :return: 字典；'efficiency_path' 等以 efficiency_ 开头的键对应行程时间最短的路径，
+                 'efficiency_value' 为该路径的效率值；没有路径时返回None
+        """
         start_id = start if isinstance(start, int) else (start.stop_ID if hasattr(start, 'stop_ID') else start)
         end_id = end if isinstance(end, int) else (end.stop_ID if hasattr(end, 'stop_ID') else end)
-        dijkstra_path, dist = dijkstra(self.data_manager.network, start_id, end_id)
-        all_paths = self.find_all_paths(start_id, end_id, include_efficiency=True)
-        if not all_paths:
+        dijkstra_ids, dist = self._distance_path(start_id, end_id, algorithm)
+        eff_path = self._find_most_efficient_path(start_id, end_id)
+        if not eff_path:
             return None
-        eff_path = max(all_paths, key=lambda x: x['efficiency'])
         return {
-            'dijkstra_path': [stop.stop_ID for stop in dijkstra_path] if dijkstra_path else [],
+            'dijkstra_path': dijkstra_ids,
             'dijkstra_distance': dist,
             'efficiency_path': eff_path['path'],
             'efficiency_value': eff_path['efficiency'],
             'efficiency_distance': eff_path['distance'],
-            'is_same': [stop.stop_ID for stop in dijkstra_path] if dijkstra_path else [] == eff_path['path']
+            'is_same': dijkstra_ids == eff_path['path']
         }
 
     def find_highest_degree_station(self):
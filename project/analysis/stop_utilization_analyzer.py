@@ -1,7 +1,7 @@
-import heapq
-from collections import defaultdict
-import math
 import numpy as np
+from project.data_structures.spatial_index import GeoGridIndex, pairs_within_distance
+from project.data_structures.stop_table import StopTable
+from project.algorithms.coordinate_utils import CoordinateUtils
 
 class StopUtilizationAnalyzer:
     def __init__(self, data_manager):
@@ -83,35 +83,29 @@ class StopUtilizationAnalyzer:
         return underutilized
     
     def find_stops_for_consolidation(self, max_distance=2.0):
-        consolidation_pairs = []
         stop_ids = list(self.network.stops.keys())
-        for i in range(len(stop_ids)):
-            for j in range(i + 1, len(stop_ids)):
-                stop_id1 = stop_ids[i]
-                stop_id2 = stop_ids[j]
-                
-                stop1 = self.network.get_stop_by_id(stop_id1)
-                stop2 = self.network.get_stop_by_id(stop_id2)
-                distance = self._calculate_distance(
-                    stop1.latitude, stop1.longitude,
-                    stop2.latitude, stop2.longitude
-                )
-                if distance <= max_distance:
-                    score1 = self.utilization_scores.get(stop_id1, 0)
-                    score2 = self.utilization_scores.get(stop_id2, 0)
-                    if score1 >= score2:
-                        keep_id, remove_id = stop_id1, stop_id2
-                        keep_name, remove_name = stop1.name, stop2.name
-                    else:
-                        keep_id, remove_id = stop_id2, stop_id1
-                        keep_name, remove_name = stop2.name, stop1.name
-                    
-                    consolidation_pairs.append({
-                        'distance': distance,
-                        'keep_stop': {'id': keep_id, 'name': keep_name},
-                        'remove_stop': {'id': remove_id, 'name': remove_name}
-                    })
-        return sorted(consolidation_pairs, key=lambda x: x['distance'])
+        # 按 max_distance 大小的经纬度网格分桶，只比较相邻单元中的站点对（i < j），
+        # 结果与逐对比较完全相同
+        lats, lons = self._stop_coordinates()
+        rows, cols, distances = pairs_within_distance(lats, lons, max_distance)
+        # 按距离排序，距离相同时按 (i, j)：与对逐对比较的结果做稳定排序得到的顺序一致
+        order = np.lexsort((cols, rows, distances))
+        rows, cols, distances = rows[order], cols[order], distances[order]
+        # 利用率分数较高（相同时取前一个站点）的站点保留
+        scores = np.array([self.utilization_scores.get(stop_id, 0) for stop_id in stop_ids], dtype=np.float64)
+        keep_first = scores[rows] >= scores[cols]
+        keep_indices = np.where(keep_first, rows, cols).tolist()
+        remove_indices = np.where(keep_first, cols, rows).tolist()
+        stops = self.network.stops
+        names = stops.names() if isinstance(stops, StopTable) else [stop.name for stop in stops.values()]
+        return [
+            {
+                'distance': distance,
+                'keep_stop': {'id': stop_ids[keep], 'name': names[keep]},
+                'remove_stop': {'id': stop_ids[remove], 'name': names[remove]}
+            }
+            for distance, keep, remove in zip(distances.tolist(), keep_indices, remove_indices)
+        ]
     
     def suggest_new_stops(self, num_suggestions=3):
         """
@@ -133,6 +127,8 @@ class StopUtilizationAnalyzer:
             if score > threshold:
                 stop = self.network.get_stop_by_id(stop_id)
                 high_utilized.append((stop, score))
+        # 空间索引：安全距离检查和候选站点查找都只需查看附近的网格单元
+        index = self._get_geo_index()
         # 使用图的社区检测找出潜在的新站点位置
         suggestions = []
         if high_utilized:
@@ -163,7 +159,7 @@ class StopUtilizationAnalyzer:
                     # 如果距离足够大，可能需要一个中间站点
                     if distance > 3.0:  # 降低距离阈值
                         # 检查新站点位置是否远离所有现有站点
-                        if self._is_location_safe_for_new_stop(mid_lat, mid_lon, MIN_DISTANCE_TO_EXISTING_STOPS):
+                        if self._is_location_safe_for_new_stop(mid_lat, mid_lon, MIN_DISTANCE_TO_EXISTING_STOPS, index):
                             suggestions.append({
                                 'latitude': mid_lat,
                                 'longitude': mid_lon,
@@ -177,25 +173,29 @@ class StopUtilizationAnalyzer:
         if len(suggestions) < num_suggestions:
             # 再次尝试，这次将距离阈值降至2公里
             additional_suggestions = []
+            # 站点在 network.stops 中的位置，用于让候选站点保持原有的遍历顺序
+            position = {s_id: k for k, s_id in enumerate(self.network.stops.keys())}
             for stop, score in high_utilized:
+                # high_utilized 按分数降序排列，本轮每条建议的分数为 score * 0.8，同样单调不增；
+                # 排序是稳定的，已有 num_suggestions 条本轮建议后，后续建议不可能进入前 num_suggestions
+                if len(additional_suggestions) >= num_suggestions:
+                    break
                 stop_id = stop.stop_ID
                 first_level = set(n_id for n_id, _ in self.network.adjacency_list.get(stop_id, []))
-                for s_id in self.network.stops.keys():
+                # 只有4公里内的站点才可能满足距离条件，按原遍历顺序检查
+                candidates = sorted(index.within_radius(stop.latitude, stop.longitude, 4.0),
+                                    key=lambda item: position[item[0]])
+                for s_id, distance in candidates:
                     if s_id == stop_id or s_id in first_level:
                         continue
                     s_stop = self.network.get_stop_by_id(s_id)
                     # 计算两个站点之间的中点
                     mid_lat = (stop.latitude + s_stop.latitude) / 2
                     mid_lon = (stop.longitude + s_stop.longitude) / 2
-                    # 计算两站点之间的距离
-                    distance = self._calculate_distance(
-                        stop.latitude, stop.longitude,
-                        s_stop.latitude, s_stop.longitude
-                    )
                     # 进一步降低距离阈值
                     if 1.5 < distance < 4.0:  # 距离在1.5-4公里之间
                         # 检查新站点位置是否远离所有现有站点
-                        if self._is_location_safe_for_new_stop(mid_lat, mid_lon, MIN_DISTANCE_TO_EXISTING_STOPS):
+                        if self._is_location_safe_for_new_stop(mid_lat, mid_lon, MIN_DISTANCE_TO_EXISTING_STOPS, index):
                             additional_suggestions.append({
                                 'latitude': mid_lat,
                                 'longitude': mid_lon,
@@ -234,29 +234,39 @@ class StopUtilizationAnalyzer:
     
     def _calculate_distance(self, lat1, lon1, lat2, lon2):
         """
-        使用Haversine公式计算两点间的地理距离（公里）
+        使用Haversine公式计算两点间的地理距离（公里），委托给CoordinateUtils
         """
-        # 地球半径（公里）
-        R = 6371.0
-        
-        # 转换为弧度
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # 经纬度差值
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+        return CoordinateUtils.calculate_haversine_distance(lat1, lon1, lat2, lon2)
+    
+    def _get_geo_index(self):
+        """
+        获取站点的经纬度空间索引：优先使用数据管理器维护的索引，否则按当前站点临时构建
         
-        # Haversine公式
-        a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        distance = R * c
+        Returns:
+            GeoGridIndex
+        """
+        index = getattr(self.data_manager, 'geo_index', None)
+        if isinstance(index, GeoGridIndex):
+            return index
+        index = GeoGridIndex()
+        lats, lons = self._stop_coordinates()
+        for stop_id, lat, lon in zip(self.network.stops.keys(), lats.tolist(), lons.tolist()):
+            index.insert(stop_id, lat, lon)
+        return index
+    
+    def _stop_coordinates(self):
+        """
+        按 network.stops 的迭代顺序返回全部站点的坐标数组，列式站点表直接取列
         
-        return distance 
+        Returns:
+            tuple: (纬度数组, 经度数组)
+        """
+        stops = self.network.stops
+        if isinstance(stops, StopTable):
+            return stops.coordinate_arrays()
+        return CoordinateUtils.stop_coordinate_arrays(stops.values())
     
-    def _is_location_safe_for_new_stop(self, lat, lon, min_distance):
+    def _is_location_safe_for_new_stop(self, lat, lon, min_distance, index=None):
         """
         检查新站点位置是否与所有现有站点保持足够距离
         
@@ -264,16 +274,19 @@ class StopUtilizationAnalyzer:
             lat: 新站点纬度
             lon: 新站点经度
             min_distance: 与现有站点的最小安全距离(公里)
+            index: 可选，站点的空间索引（GeoGridIndex）
             
         Returns:
             如果位置安全返回True，否则返回False
         """
-        # 检查与每个现有站点的距离
-        for stop_id, stop in self.network.stops.items():
-            distance = self._calculate_distance(lat, lon, stop.latitude, stop.longitude)
-            if distance < min_distance:
-                # 太靠近现有站点
-                return False
-                
-        # 通过所有检查，位置安全
-        return True 
\ No newline at end of file
+        # 有空间索引时，只需检查附近网格单元中的站点
+        if index is None:
+            index = getattr(self.data_manager, 'geo_index', None)
+        if isinstance(index, GeoGridIndex):
+            return not index.any_within(lat, lon, min_distance)
+        # 向量化计算与每个现有站点的距离
+        lats, lons = self._stop_coordinates()
+        if len(lats) == 0:
+            return True
+        # 任一站点太靠近则不安全
+        return not bool(np.any(CoordinateUtils.haversine_many(lat, lon, lats, lons) < min_distance)) 
\ No newline at end of file
@@ -0,0 +1,251 @@
+import csv
+import gc
+import io
+from collections import Counter
+from contextlib import contextmanager
+from itertools import repeat
+import numpy as np
+
+STOP_COLUMNS = ('stop_id', 'name', 'latitude', 'longitude', 'zone_type')
+ROUTE_COLUMNS = ('start_stop_id', 'end_stop_id', 'distance')
+
+
+class LoadSummary:
+    """
+    一个CSV文件批量加载的结果汇总：读取的数据行数、成功加载的行数和被拒绝的行。
+
+    每条被拒绝的行记录为 {'line': 文件中的行号（表头为第1行）, 'reason': 原因, 'row': 原始字段列表}。
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.total_rows = 0
+        self.loaded = 0
+        self.rejected = []
+
+    def reject(self, line, reason, row):
+        self.rejected.append({'line': line, 'reason': reason, 'row': row})
+
+    def reason_counts(self):
+        """按原因统计被拒绝的行数"""
+        return Counter(item['reason'] for item in self.rejected)
+
+    def to_dict(self):
+        return {
+            'file_path': self.file_path,
+            'total_rows': self.total_rows,
+            'loaded': self.loaded,
+            'rejected': list(self.rejected),
+        }
+
+    def __repr__(self):
+        return (f"LoadSummary(file_path={self.file_path!r}, total_rows={self.total_rows}, "
+                f"loaded={self.loaded}, rejected={len(self.rejected)})")
+
+
+@contextmanager
+def _gc_paused():
+    """加载期间暂停循环垃圾回收：批量创建的大量对象会反复触发回收，却没有可回收的循环引用"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_columns(file_path, columns, summary):
+    """
+    读取整个CSV文件并按列拆分
+
+    不含引号的文件按行切分后，把字段数正确的行拼接为一个字段列表，再按步长切片得到各列，
+    不为每行创建列表；含引号的文件和字段数不符的行交给 csv.reader 处理。
+
+    Returns:
+        tuple: (行号列表, 各列字符串列表...)；字段不全的行记入summary并跳过
+
+    Raises:
+        ValueError: 表头缺少必需的列
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        text = file.read()
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    lines = text.split('\n')
+    if not lines[0]:
+        return [[] for _ in range(len(columns) + 1)]
+    header = [name.strip() for name in next(csv.reader(lines[:1]))]
+    missing = [name for name in columns if name not in header]
+    if missing:
+        raise ValueError(f"Missing columns in {file_path}: {', '.join(missing)}")
+    positions = [header.index(name) for name in columns]
+    width = max(positions) + 1
+    if '"' in text:
+        # 带引号的字段可能含逗号或换行，交给 csv.reader 逐行解析
+        reader = csv.reader(io.StringIO(text))
+        next(reader)
+        return _read_rows(((reader.line_num, row) for row in reader), positions, width, summary)
+    del text
+    # 表头在第1行；空行不计入数据行
+    separators = len(header) - 1
+    data = lines[1:]
+    if data and not data[-1]:
+        data.pop()
+    counts = list(map(str.count, data, repeat(',')))
+    if '' not in data and counts.count(separators) == len(counts):
+        # 所有行的字段数都正确（绝大多数文件的情况）
+        line_numbers = range(2, len(data) + 2)
+        regular = data
+        irregular = []
+    else:
+        line_numbers = []
+        regular = []
+        irregular = []
+        for line_number, (line, count) in enumerate(zip(data, counts), start=2):
+            if not line:
+                continue
+            if count == separators:
+                line_numbers.append(line_number)
+                regular.append(line)
+            else:
+                irregular.append((line_number, line.split(',')))
+    del lines, data, counts
+    summary.total_rows += len(regular)
+    fields = ','.join(regular).split(',') if regular else []
+    del regular
+    result = [line_numbers] + [fields[position::len(header)] for position in positions]
+    if irregular:
+        # 字段数不符的行单独处理，合并后按行号恢复原有顺序
+        extra = _read_rows(irregular, positions, width, summary)
+        if extra[0]:
+            merged = sorted(list(zip(*result)) + list(zip(*extra)), key=lambda item: item[0])
+            result = [list(column) for column in zip(*merged)]
+    return result
+
+
+def _read_rows(numbered_rows, positions, width, summary):
+    """按行处理已拆分字段的 (行号, 字段列表)，返回值同 _read_columns"""
+    lines = []
+    columns = [[] for _ in positions]
+    for line_number, row in numbered_rows:
+        if not row:
+            continue
+        summary.total_rows += 1
+        if len(row) < width:
+            summary.reject(line_number, "Missing fields", row)
+            continue
+        lines.append(line_number)
+        for column, position in zip(columns, positions):
+            column.append(row[position])
+    return [lines] + columns
+
+
+def _parse_floats(values):
+    """
+    把字符串列整体转换为float64数组
+
+    Returns:
+        tuple: (数组, 无法解析的下标列表)；无法解析的位置为NaN
+    """
+    try:
+        return np.array(values, dtype=np.float64), []
+    except ValueError:
+        pass
+    parsed = np.empty(len(values), dtype=np.float64)
+    bad = []
+    for i, value in enumerate(values):
+        try:
+            parsed[i] = float(value)
+        except ValueError:
+            parsed[i] = np.nan
+            bad.append(i)
+    return parsed, bad
+
+
+def _keep(columns, valid):
+    return [[column[i] for i in valid] for column in columns]
+
+
+def load_stops_bulk(network, file_path, parse_zone_type):
+    """
+    批量加载站点CSV：整表读入、按列解析和校验，一次写入网络。
+
+    Args:
+        network: TransportNetwork
+        file_path: 站点CSV文件路径（列 stop_id,name,latitude,longitude,zone_type）
+        parse_zone_type: 把 zone_type 字符串转换为 ZoneType 的函数
+
+    Returns:
+        LoadSummary
+    """
+    with _gc_paused():
+        summary = LoadSummary(file_path)
+        lines, ids, names, lats, lons, zones = _read_columns(file_path, STOP_COLUMNS, summary)
+        lat_values, bad_lats = _parse_floats(lats)
+        lon_values, bad_lons = _parse_floats(lons)
+        invalid = {}
+        for i in bad_lats:
+            invalid[i] = f"Invalid latitude: {lats[i]!r}"
+        for i in bad_lons:
+            invalid.setdefault(i, f"Invalid longitude: {lons[i]!r}")
+        raw = (ids, names, lats, lons, zones)
+        valid = [i for i in range(len(ids)) if i not in invalid] if invalid else list(range(len(ids)))
+        for i in sorted(invalid):
+            summary.reject(lines[i], invalid[i], [column[i] for column in raw])
+        # zone_type 取值很少，每种只解析一次
+        zone_lookup = {value: parse_zone_type(value) for value in set(zones)}
+        if invalid:
+            ids, names, zones = _keep((ids, names, zones), valid)
+            lat_values, lon_values = lat_values[valid], lon_values[valid]
+        rejected = network.add_stop_columns(ids, names, lat_values.tolist(), lon_values.tolist(),
+                                            [zone_lookup[zone] for zone in zones])
+        for index, reason in rejected:
+            i = valid[index]
+            summary.reject(lines[i], reason, [column[i] for column in raw])
+        summary.rejected.sort(key=lambda item: item['line'])
+        summary.loaded = len(valid) - len(rejected)
+        return summary
+
+
+def load_routes_bulk(network, file_path, convert_id=None):
+    """
+    批量加载线路CSV：整表读入、按列解析距离，一次遍历写入邻接表。
+
+    Args:
+        network: TransportNetwork（站点需已加载）
+        file_path: 线路CSV文件路径（列 start_stop_id,end_stop_id,distance）
+        convert_id: 可选，把站点ID字符串转换为网络中使用的ID的函数（如int）；默认保持字符串
+
+    Returns:
+        LoadSummary
+    """
+    with _gc_paused():
+        summary = LoadSummary(file_path)
+        lines, starts, ends, distances = _read_columns(file_path, ROUTE_COLUMNS, summary)
+        raw = (starts, ends, distances)
+        distance_values, bad = _parse_floats(distances)
+        invalid = {i: f"Invalid distance: {distances[i]!r}" for i in bad}
+        if convert_id is not None:
+            converted_starts = [None] * len(starts)
+            converted_ends = [None] * len(ends)
+            for i in range(len(starts)):
+                try:
+                    converted_starts[i] = convert_id(starts[i])
+                    converted_ends[i] = convert_id(ends[i])
+                except ValueError:
+                    invalid.setdefault(i, f"Invalid stop ID: {starts[i]!r} -> {ends[i]!r}")
+            starts, ends = converted_starts, converted_ends
+        valid = [i for i in range(len(starts)) if i not in invalid] if invalid else list(range(len(starts)))
+        for i in sorted(invalid):
+            summary.reject(lines[i], invalid[i], [column[i] for column in raw])
+        if invalid:
+            starts, ends = _keep((starts, ends), valid)
+            distance_values = distance_values[valid]
+        rejected = network.add_route_columns(starts, ends, distance_values.tolist())
+        for index, reason in rejected:
+            i = valid[index]
+            summary.reject(lines[i], reason, [column[i] for column in raw])
+        summary.rejected.sort(key=lambda item: item['line'])
+        summary.loaded = len(valid) - len(rejected)
+        return summary
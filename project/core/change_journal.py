@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+from project.data_structures.stop_entity import Stop, ZoneType
+
+STOP_FIELDS = ['stop_id', 'name', 'latitude', 'longitude', 'zone_type']
+ROUTE_FIELDS = ['start_stop_id', 'end_stop_id', 'distance']
+
+
+class ChangeJournal:
+    """
+    网络修改的预写日志（JSON Lines）：每次保存只把新增的修改追加到日志末尾并刷到磁盘，
+    不重写CSV。加载CSV后按顺序重放日志即可得到最新的网络；合并回CSV由 NetworkDataManager
+    在保存（日志过长或 compact=True）或 close() 时显式进行，加载时不改写CSV。
+
+    每条记录是一个字典，'op' 为操作类型：
+        add_stop     {'id', 'name', 'lat', 'lon', 'zone'}
+        remove_stop  {'id'}
+        set_zone     {'id', 'zone'}
+        add_route    {'from', 'to', 'distance'}
+        remove_route {'from', 'to'}
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: 日志文件路径，文件不存在时视为空日志
+        """
+        self.path = path
+        self._count = None
+
+    def __len__(self):
+        """日志中的记录数"""
+        if self._count is None:
+            self._count = len(self.read())
+        return self._count
+
+    def read(self):
+        """
+        读取全部记录。写入时崩溃留下的不完整的最后一行被忽略。
+
+        Returns:
+            list: 记录字典列表
+        """
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        self._count = len(entries)
+        return entries
+
+    def append(self, entries):
+        """
+        追加记录，返回前调用fsync，保证已返回的保存在崩溃后仍然有效
+
+        Args:
+            entries: 记录字典序列
+        """
+        entries = list(entries)
+        if not entries:
+            return
+        count = len(self)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+            file.flush()
+            os.fsync(file.fileno())
+        self._count = count + len(entries)
+
+    def clear(self):
+        """删除日志（修改已合并进CSV之后调用）"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._count = 0
+
+
+def apply_change(network, entry):
+    """
+    把一条日志记录应用到网络上。重放是幂等的：已存在的站点/线路被覆盖，不存在的删除目标被忽略，
+    因此合并中途崩溃后再次重放同一份日志也能得到相同的结果。
+
+    Args:
+        network: TransportNetwork
+        entry: ChangeJournal 的记录字典
+    """
+    op = entry['op']
+    if op == 'add_stop':
+        existing = network.get_stop_by_id(entry['id'])
+        if existing is not None:
+            network.remove_stop(existing)
+        network.add_stop(Stop(entry['id'], entry['name'], entry['lat'], entry['lon'], ZoneType[entry['zone']]))
+    elif op == 'remove_stop':
+        network.remove_stop(entry['id'])
+    elif op == 'set_zone':
+        stop = network.get_stop_by_id(entry['id'])
+        if stop is not None:
+            stop.zone_type = ZoneType[entry['zone']]
+    elif op == 'add_route':
+        if network.has_route(entry['from'], entry['to']):
+            network.update_route(entry['from'], entry['to'], entry['distance'])
+        elif entry['from'] in network.stops and entry['to'] in network.stops:
+            network.add_route(entry['from'], entry['to'], entry['distance'])
+    elif op == 'remove_route':
+        if network.has_route(entry['from'], entry['to']):
+            network.remove_route(entry['from'], entry['to'])
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+def iter_stop_rows(network):
+    """逐行生成站点CSV的数据（zone_type保存枚举名称，如"RESIDENTIAL"）"""
+    for stop in network.stops.values():
+        yield (stop.stop_ID, stop.name, stop.latitude, stop.longitude, stop.zone_type.name)
+
+
+def iter_route_rows(network):
+    """
+    直接遍历邻接表逐行生成路线CSV的数据。
+    距离按 float 的最短精确表示写出（与日志记录的值相同），重新加载CSV得到与内存中完全相同的网络
+    """
+    for start_id, routes in network.adjacency_list.items():
+        for end_id, distance in routes:
+            yield (start_id, end_id, repr(float(distance)))
+
+
+def write_csv_atomic(path, fieldnames, rows):
+    """
+    先写入同目录下的临时文件并fsync，再用 os.replace 替换目标文件：
+    任何时刻目标文件要么是旧的完整内容，要么是新的完整内容
+
+    Args:
+        path: 目标CSV路径
+        fieldnames: 表头
+        rows: 数据行（序列的可迭代对象），边生成边写入
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -2,12 +2,65 @@ import csv
 import os
 from project.data_structures.stop_entity import ZoneType, Stop
 from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.spatial_index import GridIndex, GeoGridIndex
+from project.data_structures.stop_table import StopTable
+from project.core.bulk_csv_loader import load_stops_bulk, load_routes_bulk
+from project.core.change_journal import (ChangeJournal, apply_change, iter_stop_rows, iter_route_rows,
+                                         write_csv_atomic, STOP_FIELDS, ROUTE_FIELDS)
+from project.core.network_snapshot import csv_content_hash, load_snapshot, save_snapshot, open_mapped_network
+from project.data_structures.mapped_network import MappedStops
 from project.algorithms.coordinate_utils import CoordinateUtils
 
 class NetworkDataManager:
-    def __init__(self, stops_csv_path=None, routes_csv_path=None):
-        self.network = TransportNetwork()
+    # 空间索引的网格单元大小：地理索引按公里，GUI索引按场景像素
+    GEO_INDEX_CELL_KM = 1.0
+    GUI_INDEX_CELL_SIZE = 50
+    # 修改日志达到该记录数时，保存会把日志合并回CSV
+    JOURNAL_COMPACT_ENTRIES = 10000
+
+    def __init__(self, stops_csv_path=None, routes_csv_path=None, columnar_stops=False, bulk_load=False,
+                 snapshot_dir=None, read_only=False, journal_path=None):
+        """
+        Args:
+            stops_csv_path: 站点CSV文件路径，默认使用项目自带的数据
+            routes_csv_path: 路线CSV文件路径，默认使用项目自带的数据
+            columnar_stops: 是否用列式的 StopTable 保存站点，站点数量很大时可显著节省内存
+            bulk_load: 是否使用批量加载：整表解析和校验，不合法的行被跳过并记录在 load_summary 中，
+                       而不是打印警告或中止加载
+            snapshot_dir: 可选，二进制快照目录。CSV内容与快照记录的摘要一致时直接从快照加载，
+                          否则解析CSV后重新生成快照
+            read_only: 是否以内存映射方式只读打开快照（MappedNetwork），启动时不重建邻接表，
+                       多个进程共享同一份数据；需要同时提供 snapshot_dir，网络不能再修改
+            journal_path: 可选，修改日志文件路径。提供时 save_data_to_csv 只把新的修改追加到日志，
+                          日志达到 JOURNAL_COMPACT_ENTRIES 条、compact=True 或调用 close() 时才合并回CSV；
+                          加载时只重放日志，不改写CSV。不能与 read_only 同时使用
+        """
+        if read_only and snapshot_dir is None:
+            raise ValueError("read_only requires snapshot_dir")
+        if read_only and journal_path is not None:
+            raise ValueError("read_only cannot be combined with journal_path")
+        self.network = TransportNetwork(StopTable() if columnar_stops else None)
+        self.bulk_load = bulk_load
+        # 批量加载的结果汇总 {'stops': LoadSummary, 'routes': LoadSummary}，未使用批量加载时为None
+        self.load_summary = None
+        self.snapshot_dir = snapshot_dir
+        self.read_only = read_only
+        self.journal = ChangeJournal(journal_path) if journal_path is not None else None
+        # 上次保存之后的修改（日志记录），以及它们所基于的CSV路径
+        self._pending_changes = []
+        self._csv_paths = None
+        # 最近一次加载是否来自快照
+        self.loaded_from_snapshot = False
         self.station_name_to_id = {}
+        # stations/distances 视图缓存，与构建时的网络版本号绑定
+        self._stations_cache = None
+        # 站点区域类型的版本号：类型修改不改变网络版本号，按时段编译的代价表据此判断是否过期
+        self.zones_version = 0
+        self._distances_cache = None
+        self._views_version = None
+        # 站点的空间索引（经纬度 / GUI坐标），与视图缓存一起维护
+        self._geo_index = None
+        self._gui_index = None
         
         # 设置默认CSV文件路径
         if stops_csv_path is None:
@@ -26,11 +79,97 @@ class NetworkDataManager:
             stops_csv_path (str): 站点CSV文件路径
             routes_csv_path (str): 路线CSV文件路径
         """
-        # 加载站点数据
-        self._load_stops_from_csv(stops_csv_path)
+        source_hash = None
+        self.loaded_from_snapshot = False
+        self._pending_changes = []
+        self._csv_paths = (stops_csv_path, routes_csv_path)
+        journal_entries = self.journal.read() if self.journal is not None else []
+        if self.snapshot_dir is not None and os.path.exists(stops_csv_path) and os.path.exists(routes_csv_path):
+            source_hash = csv_content_hash(stops_csv_path, routes_csv_path)
+            if not journal_entries and self._open_snapshot(source_hash):
+                self.loaded_from_snapshot = True
+                return
+        if self.bulk_load:
+            self._bulk_load_from_csv(stops_csv_path, routes_csv_path)
+        else:
+            # 加载站点数据
+            self._load_stops_from_csv(stops_csv_path)
+            
+            # 加载路线数据
+            self._load_routes_from_csv(routes_csv_path)
+        if journal_entries:
+            # 加载时只重放日志，不改写CSV（合并见 save_data_to_csv 和 close）；
+            # 快照只对应CSV本身的内容，CSV之后还有日志时不写快照
+            self._replay_journal(journal_entries)
+            source_hash = None
+        if source_hash is not None:
+            try:
+                save_snapshot(self.network, self.snapshot_dir, source_hash)
+            except (OSError, ValueError) as e:
+                # 快照只是启动加速，写入失败不影响本次加载
+                print(f"Warning: Unable to save network snapshot: {e}")
+            else:
+                # 只读模式下改用刚写入的快照的内存映射，与之后的启动保持一致
+                if self.read_only:
+                    self._open_snapshot(source_hash)
+
+    def _replay_journal(self, entries):
+        """把修改日志按顺序应用到刚从CSV加载的网络上"""
+        for entry in entries:
+            apply_change(self.network, entry)
+        self.invalidate_views()
+        self.station_name_to_id = {}
+        self._index_station_names()
+
+    def _record_change(self, **entry):
+        """记录一次修改，下次保存时写入日志"""
+        if self.journal is not None:
+            self._pending_changes.append(entry)
+
+    def _open_snapshot(self, source_hash):
+        """
+        加载与source_hash一致的快照并替换当前网络
+
+        Returns:
+            bool: 快照是否可用
+        """
+        if self.read_only:
+            network = open_mapped_network(self.snapshot_dir, source_hash)
+        else:
+            network = load_snapshot(self.snapshot_dir, source_hash,
+                                    columnar_stops=isinstance(self.network.stops, StopTable))
+        if network is None:
+            return False
+        self.network = network
+        self.invalidate_views()
+        self.station_name_to_id = {}
+        self._index_station_names()
+        return True
+    
+    def _bulk_load_from_csv(self, stops_csv_path, routes_csv_path):
+        """
+        批量加载站点和路线数据，结果汇总保存在 self.load_summary
         
-        # 加载路线数据
-        self._load_routes_from_csv(routes_csv_path)
+        Args:
+            stops_csv_path (str): 站点CSV文件路径
+            routes_csv_path (str): 路线CSV文件路径
+        """
+        if not os.path.exists(stops_csv_path):
+            raise FileNotFoundError(f"Site CSV file not found: {stops_csv_path}")
+        if not os.path.exists(routes_csv_path):
+            raise FileNotFoundError(f"The route CSV file was not found: {routes_csv_path}")
+        stops_summary = load_stops_bulk(self.network, stops_csv_path, self._parse_zone_type)
+        self._index_station_names()
+        routes_summary = load_routes_bulk(self.network, routes_csv_path)
+        self.load_summary = {'stops': stops_summary, 'routes': routes_summary}
+    
+    def _index_station_names(self):
+        """按网络中的全部站点填充 站点名称 → 站点ID 的映射（同名时后出现的站点覆盖前面的）"""
+        stops = self.network.stops
+        if isinstance(stops, (StopTable, MappedStops)):
+            self.station_name_to_id.update(zip(stops.names(), stops))
+        else:
+            self.station_name_to_id.update((stop.name, stop_id) for stop_id, stop in stops.items())
     
     def _load_stops_from_csv(self, stops_csv_path):
         """
@@ -116,11 +255,18 @@ class NetworkDataManager:
             longitude=lon,
             zone_type=zone_type
         )
+        views_fresh = self._views_are_fresh()
         try:
             self.network.add_stop(stop)
             self.station_name_to_id[name] = new_id
         except ValueError as e:
             raise e
+        self._record_change(op='add_stop', id=new_id, name=name, lat=lat, lon=lon, zone=zone_type.name)
+        if views_fresh:
+            station = self._stations_cache[new_id] = self._build_station_view(stop)
+            self._geo_index.insert(new_id, stop.latitude, stop.longitude)
+            self._gui_index.insert(new_id, station["x"], station["y"])
+            self._mark_views_fresh()
 
     def remove_station(self, name):
         """删除站点 - 委托给TransportNetwork"""
@@ -128,9 +274,24 @@ class NetworkDataManager:
             station_id = self.station_name_to_id[name]
             stop = self.network.get_stop_by_id(station_id)
             if stop:
+                views_fresh = self._views_are_fresh()
+                incoming = [from_id for from_id, _ in self.network.reverse_adjacency.get(station_id, [])]
+                outgoing = [to_id for to_id, _ in self.network.adjacency_list.get(station_id, [])]
                 # 委托给TransportNetwork
                 self.network.remove_stop(stop)
                 del self.station_name_to_id[name]
+                self._record_change(op='remove_stop', id=station_id)
+                if views_fresh:
+                    # 只更新被删除站点及指向它的站点
+                    self._stations_cache.pop(station_id, None)
+                    self._geo_index.remove(station_id)
+                    self._gui_index.remove(station_id)
+                    for from_id in incoming:
+                        self._distances_cache.pop((from_id, station_id), None)
+                        self._refresh_connections(from_id)
+                    for to_id in outgoing:
+                        self._distances_cache.pop((station_id, to_id), None)
+                    self._mark_views_fresh()
 
     def update_station_type(self, name, new_type):
         """更新站点类型 - 直接操作Stop对象"""
@@ -140,6 +301,12 @@ class NetworkDataManager:
             if stop:
                 zone_type = self._convert_string_to_zone_type(new_type)
                 stop.zone_type = zone_type
+                self.zones_version += 1
+                self._record_change(op='set_zone', id=station_id, zone=zone_type.name)
+                # 类型变化不改变拓扑版本号，直接更新缓存中的对应条目
+                if self._stations_cache is not None and station_id in self._stations_cache:
+                    self._stations_cache[station_id]["type"] = zone_type.value
+                    self._stations_cache[station_id]["wait_time"] = self._get_wait_time(zone_type)
 
     def add_connection(self, from_name, to_name, distance):
         """添加连接 - 委托给TransportNetwork"""
@@ -149,10 +316,16 @@ class NetworkDataManager:
         to_id = self.station_name_to_id[to_name]
         if from_id not in self.network.stops or to_id not in self.network.stops:
             raise ValueError("One or both stations not found in network")
+        views_fresh = self._views_are_fresh()
         try:
             self.network.add_route(from_id, to_id, distance)
         except ValueError as e:
             raise e
+        self._record_change(op='add_route', **{'from': from_id, 'to': to_id, 'distance': distance})
+        if views_fresh:
+            self._distances_cache[(from_id, to_id)] = distance
+            self._refresh_connections(from_id)
+            self._mark_views_fresh()
 
     def remove_connection(self, from_name, to_name):
         """删除连接 - 委托给TransportNetwork"""
@@ -161,8 +334,14 @@ class NetworkDataManager:
             to_id = self.station_name_to_id[to_name]
             
             if from_id in self.network.stops and to_id in self.network.stops:
+                views_fresh = self._views_are_fresh()
                 # 委托给TransportNetwork
                 self.network.remove_route(from_id, to_id)
+                self._record_change(op='remove_route', **{'from': from_id, 'to': to_id})
+                if views_fresh:
+                    self._distances_cache.pop((from_id, to_id), None)
+                    self._refresh_connections(from_id)
+                    self._mark_views_fresh()
 
     # 辅助方法 - 坐标和类型转换
     def _convert_gui_to_geo_coords(self, x, y):
@@ -193,38 +372,110 @@ class NetworkDataManager:
         }
         return zone_type_wait_map.get(zone_type, 3)
 
-    # 向后兼容的属性 - 从TransportNetwork获取数据
-    @property
-    def stations(self):
-        """获取所有站点数据 - 从TransportNetwork转换"""
+    # 视图缓存 - stations/distances 按网络版本号缓存，增删操作时增量更新
+    def _network_version(self):
+        """网络的拓扑版本号；网络没有整数版本号时返回None（此时不缓存）"""
+        version = getattr(self.network, 'version', None)
+        return version if isinstance(version, int) else None
+
+    def _views_are_fresh(self):
+        """缓存的视图是否与当前网络一致"""
+        version = self._network_version()
+        return (version is not None and self._stations_cache is not None
+                and self._views_version == version)
+
+    def _mark_views_fresh(self):
+        """增量更新完成后，把缓存绑定到网络的新版本号"""
+        self._views_version = self._network_version()
+
+    def _build_station_view(self, stop):
+        """把一个Stop对象转换为GUI使用的站点字典"""
+        x, y = self._convert_geo_to_gui_coords(stop.latitude, stop.longitude)
+        # 获取连接
+        connections = []
+        if stop.stop_ID in self.network.adjacency_list:
+            connections = [neighbor_id for neighbor_id, _ in self.network.adjacency_list[stop.stop_ID]]
+        return {
+            "id": stop.stop_ID,
+            "name": stop.name,
+            "lat": stop.latitude,
+            "lon": stop.longitude,
+            "x": x,
+            "y": y,
+            "type": stop.zone_type.value,
+            "wait_time": self._get_wait_time(stop.zone_type),
+            "connections": connections
+        }
+
+    def _refresh_connections(self, station_id):
+        """按邻接表重新生成某个站点的出站连接列表"""
+        station = self._stations_cache.get(station_id)
+        if station is not None:
+            station["connections"] = [neighbor_id for neighbor_id, _ in self.network.adjacency_list.get(station_id, [])]
+
+    def _rebuild_views(self):
+        """全量重建 stations/distances 视图及空间索引"""
         stations = {}
+        geo_index = GeoGridIndex(self.GEO_INDEX_CELL_KM)
+        gui_index = GridIndex(self.GUI_INDEX_CELL_SIZE)
         for stop in self.network.stops.values():
-            x, y = self._convert_geo_to_gui_coords(stop.latitude, stop.longitude)
-            # 获取连接
-            connections = []
-            if stop.stop_ID in self.network.adjacency_list:
-                connections = [neighbor_id for neighbor_id, _ in self.network.adjacency_list[stop.stop_ID]]
-            stations[stop.stop_ID] = {
-                "id": stop.stop_ID,
-                "name": stop.name,
-                "lat": stop.latitude,
-                "lon": stop.longitude,
-                "x": x,
-                "y": y,
-                "type": stop.zone_type.value,
-                "wait_time": self._get_wait_time(stop.zone_type),
-                "connections": connections
-            }
-        return stations
-
-    @property
-    def distances(self):
-        """获取所有距离数据 - 从TransportNetwork转换"""
+            station = stations[stop.stop_ID] = self._build_station_view(stop)
+            geo_index.insert(stop.stop_ID, stop.latitude, stop.longitude)
+            gui_index.insert(stop.stop_ID, station["x"], station["y"])
         distances = {}
         for stop_id in self.network.adjacency_list:
             for neighbor_id, distance in self.network.adjacency_list[stop_id]:
                 distances[(stop_id, neighbor_id)] = distance
-        return distances
+        version = self._network_version()
+        if version is not None:
+            self._stations_cache = stations
+            self._distances_cache = distances
+            self._geo_index = geo_index
+            self._gui_index = gui_index
+            self._views_version = version
+        return stations, distances, geo_index, gui_index
+
+    def invalidate_views(self):
+        """丢弃缓存的视图（直接修改了网络或Stop对象后调用），下次访问时重建"""
+        self._stations_cache = None
+        self.zones_version += 1
+        self._distances_cache = None
+        self._geo_index = None
+        self._gui_index = None
+        self._views_version = None
+
+    @property
+    def geo_index(self):
+        """站点的经纬度空间索引（GeoGridIndex，距离单位为公里），随网络增删自动维护"""
+        if self._views_are_fresh():
+            return self._geo_index
+        return self._rebuild_views()[2]
+
+    @property
+    def gui_index(self):
+        """站点的GUI坐标空间索引（GridIndex，距离单位为场景像素），随网络增删自动维护"""
+        if self._views_are_fresh():
+            return self._gui_index
+        return self._rebuild_views()[3]
+
+    # 向后兼容的属性 - 从TransportNetwork获取数据
+    @property
+    def stations(self):
+        """获取所有站点数据 - 从TransportNetwork转换，结果按网络版本号缓存，调用方不应修改"""
+        if self._views_are_fresh():
+            return self._stations_cache
+        return self._rebuild_views()[0]
+
+    @property
+    def distances(self):
+        """获取所有距离数据 - 从TransportNetwork转换，结果按网络版本号缓存，调用方不应修改"""
+        if self._views_are_fresh():
+            return self._distances_cache
+        return self._rebuild_views()[1]
+
+    def get_incoming_connections(self, station_id):
+        """获取指向某站点的入站连接 [(起点ID, 距离), ...]，直接读取反向邻接表"""
+        return list(self.network.reverse_adjacency.get(station_id, []))
 
     @property
     def lines(self):
@@ -244,9 +495,18 @@ class NetworkDataManager:
         """获取邻接表"""
         return self.network.adjacency_list.copy()
 
-    def save_data_to_csv(self, stops_csv_path=None, routes_csv_path=None):
+    def save_data_to_csv(self, stops_csv_path=None, routes_csv_path=None, compact=False):
         """
-        将内存中的站点和路线数据写入CSV文件
+        保存站点和路线数据。
+
+        使用修改日志（journal_path）且保存到加载时的CSV时，只把上次保存之后的修改追加到日志；
+        日志达到 JOURNAL_COMPACT_ENTRIES 条或 compact=True 时合并：逐行写出完整的CSV并清空日志。
+        CSV先写入临时文件再原子替换，保存中途失败或崩溃时原文件保持完整。
+
+        Args:
+            stops_csv_path: 站点CSV路径，默认使用项目自带的数据文件
+            routes_csv_path: 路线CSV路径，默认使用项目自带的数据文件
+            compact: 是否强制合并日志
         """
         # 设置默认保存路径（与加载路径一致）
         if stops_csv_path is None:
@@ -255,34 +515,43 @@ class NetworkDataManager:
             routes_csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'urban_transport_network_routes.csv')
 
         try:
+            if self.journal is not None and (stops_csv_path, routes_csv_path) == self._csv_paths:
+                if not compact and len(self.journal) + len(self._pending_changes) < self.JOURNAL_COMPACT_ENTRIES:
+                    self.journal.append(self._pending_changes)
+                    self._pending_changes = []
+                    return
+                self._compact(stops_csv_path, routes_csv_path)
+                return
+
             # 检查数据目录是否存在，不存在则创建
             data_dir = os.path.dirname(stops_csv_path)
             if not os.path.exists(data_dir):
                 os.makedirs(data_dir, exist_ok=True)
-
-            # 保存站点数据到CSV
-            with open(stops_csv_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['stop_id', 'name', 'latitude', 'longitude', 'zone_type'])
-                writer.writeheader()
-                for stop in self.get_all_stops():
-                    writer.writerow({
-                        'stop_id': stop.stop_ID,
-                        'name': stop.name,
-                        'latitude': stop.latitude,
-                        'longitude': stop.longitude,
-                        'zone_type': stop.zone_type.name  # 保存枚举名称（如"RESIDENTIAL"）
-                    })
-
-            # 保存路线数据到CSV
-            with open(routes_csv_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['start_stop_id', 'end_stop_id', 'distance'])
-                writer.writeheader()
-                for (start_id, end_id), distance in self.distances.items():
-                    writer.writerow({
-                        'start_stop_id': start_id,
-                        'end_stop_id': end_id,
-                        'distance': f"{distance:.2f}"  # 保留两位小数
-                    })
+            self._write_csv_files(stops_csv_path, routes_csv_path)
 
         except Exception as e:
-            raise Exception(f"Save failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Save failed: {str(e)}")
+
+    def close(self):
+        """
+        结束使用（如程序退出时）：把已保存到修改日志中的修改合并回加载时的CSV并清空日志。
+        还有未保存的修改时不合并，以免把它们写入CSV；日志保留，下次加载时重放。
+
+        Returns:
+            bool: 是否进行了合并
+        """
+        if self.journal is None or self._pending_changes or len(self.journal) == 0:
+            return False
+        self._compact(*self._csv_paths)
+        return True
+
+    def _write_csv_files(self, stops_csv_path, routes_csv_path):
+        """直接遍历网络逐行写出两个CSV文件，各自原子替换"""
+        write_csv_atomic(stops_csv_path, STOP_FIELDS, iter_stop_rows(self.network))
+        write_csv_atomic(routes_csv_path, ROUTE_FIELDS, iter_route_rows(self.network))
+
+    def _compact(self, stops_csv_path, routes_csv_path):
+        """把当前网络写回加载时的CSV并清空日志；CSV替换完成之后才删除日志"""
+        self._write_csv_files(stops_csv_path, routes_csv_path)
+        self.journal.clear()
+        self._pending_changes = []
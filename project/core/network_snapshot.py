@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import numpy as np
+from project.core.bulk_csv_loader import _gc_paused
+from project.data_structures.csr_graph import CSRGraph
+from project.data_structures.mapped_network import MappedNetwork, MappedStops
+from project.data_structures.route_list import RouteList
+from project.data_structures.stop_entity import Stop
+from project.data_structures.stop_table import StopTable, ZONE_CODES, ZONE_TYPES
+from project.data_structures.transport_network_structure import TransportNetwork
+
+# 快照格式版本：数组布局变化时递增，旧版本的快照会被忽略并重新生成
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+# 字符串列（站点ID、名称）按UTF-8编码后用该字符连接，存为一个uint8数组
+_STRING_SEPARATOR = '\x00'
+_ARRAY_NAMES = (
+    'stop_ids', 'names', 'latitudes', 'longitudes', 'zone_codes',
+    'offsets', 'targets', 'weights',
+    'reverse_offsets', 'reverse_sources', 'reverse_weights',
+)
+
+
+def csv_content_hash(*file_paths):
+    """
+    计算若干文件内容的SHA-256摘要（按给定顺序），用于判断快照是否对应当前的CSV文件
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        digest.update(os.path.basename(file_path).encode('utf-8') + b'\0')
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _encode_strings(values):
+    for value in values:
+        if _STRING_SEPARATOR in value:
+            raise ValueError("Strings containing NUL characters cannot be stored in a snapshot")
+    return np.frombuffer(_STRING_SEPARATOR.join(values).encode('utf-8'), dtype=np.uint8)
+
+
+def _decode_strings(array, count):
+    if count == 0:
+        return []
+    return array.tobytes().decode('utf-8').split(_STRING_SEPARATOR)
+
+
+class _StringColumn:
+    """
+    按下标读取 _encode_strings 编码的字符串列，不预先解码全部字符串：
+    第一次访问时计算各字符串在字节数组中的起止位置
+    """
+
+    def __init__(self, array, count):
+        self._array = array
+        self._count = count
+        self._bounds = None
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if self._bounds is None:
+            separators = np.flatnonzero(np.asarray(self._array) == ord(_STRING_SEPARATOR))
+            self._bounds = np.concatenate(([-1], separators, [len(self._array)])).tolist()
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        i %= self._count
+        return bytes(self._array[self._bounds[i] + 1:self._bounds[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return iter(_decode_strings(self._array, self._count))
+
+
+def _id_kind(stop_ids):
+    if all(type(stop_id) is str for stop_id in stop_ids):
+        return 'str'
+    if all(type(stop_id) is int for stop_id in stop_ids):
+        return 'int'
+    raise ValueError("Snapshot requires stop IDs that are all str or all int")
+
+
+def _adjacency_arrays(stop_ids, index, adjacency):
+    """把邻接表（按 stop_ids 顺序）转换为 (offsets, 邻居下标, 距离) 三个数组"""
+    offsets = np.zeros(len(stop_ids) + 1, dtype=np.int32)
+    neighbors = []
+    weights = []
+    for i, stop_id in enumerate(stop_ids):
+        for neighbor_id, distance in adjacency[stop_id]:
+            neighbors.append(index[neighbor_id])
+            weights.append(distance)
+        offsets[i + 1] = len(neighbors)
+    return offsets, np.array(neighbors, dtype=np.int32), np.array(weights, dtype=np.float64)
+
+
+def save_snapshot(network, directory, source_hash):
+    """
+    把网络保存为二进制快照：每列一个 .npy 文件，外加记录格式版本和源数据摘要的 manifest.json。
+
+    先删除旧的manifest，再逐个替换数组文件，最后写入新的manifest，
+    中途失败只会留下没有manifest（加载时被忽略）的快照。
+
+    Args:
+        network: TransportNetwork
+        directory: 快照目录，不存在时自动创建
+        source_hash: 源CSV文件的摘要（csv_content_hash 的结果）
+
+    Raises:
+        ValueError: 站点ID类型混杂，或字符串中含有NUL字符
+    """
+    stop_ids = list(network.adjacency_list)
+    index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+    id_kind = _id_kind(stop_ids)
+    stops = network.stops
+    if isinstance(stops, StopTable) and list(stops) == stop_ids:
+        names = stops.names()
+        latitudes, longitudes = stops.coordinate_arrays()
+        zone_codes = stops.zone_codes()
+    else:
+        ordered = [stops[stop_id] for stop_id in stop_ids]
+        names = [stop.name for stop in ordered]
+        latitudes = np.array([stop.latitude for stop in ordered], dtype=np.float64)
+        longitudes = np.array([stop.longitude for stop in ordered], dtype=np.float64)
+        zone_codes = np.array([ZONE_CODES[stop.zone_type] for stop in ordered], dtype=np.uint8)
+    csr = network.to_csr()
+    reverse_offsets, reverse_sources, reverse_weights = _adjacency_arrays(stop_ids, index, network.reverse_adjacency)
+    arrays = {
+        'stop_ids': _encode_strings(stop_ids) if id_kind == 'str' else np.array(stop_ids, dtype=np.int64),
+        'names': _encode_strings(names),
+        'latitudes': np.asarray(latitudes, dtype=np.float64),
+        'longitudes': np.asarray(longitudes, dtype=np.float64),
+        'zone_codes': np.asarray(zone_codes, dtype=np.uint8),
+        'offsets': csr.offsets,
+        'targets': csr.targets,
+        'weights': csr.weights,
+        'reverse_offsets': reverse_offsets,
+        'reverse_sources': reverse_sources,
+        'reverse_weights': reverse_weights,
+    }
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    for name in _ARRAY_NAMES:
+        final_path = os.path.join(directory, name + '.npy')
+        temp_path = final_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            np.save(file, arrays[name])
+        os.replace(temp_path, final_path)
+    manifest = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'source_hash': source_hash,
+        'id_kind': id_kind,
+        'num_stops': len(stop_ids),
+        'num_routes': csr.num_routes,
+    }
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file)
+    os.replace(temp_path, manifest_path)
+
+
+def read_manifest(directory):
+    """读取快照的manifest，不存在或无法解析时返回None"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def load_snapshot(directory, source_hash=None, columnar_stops=False, mmap=True):
+    """
+    从二进制快照恢复网络。
+
+    数组以内存映射方式打开，网络的CSR视图直接使用映射的数组而不重新构建；
+    站点和邻接表按快照中的顺序恢复，与保存时的网络完全相同。
+
+    Args:
+        directory: 快照目录
+        source_hash: 可选，期望的源数据摘要；与快照记录的不一致时视为过期
+        columnar_stops: 是否用 StopTable 保存站点
+        mmap: 是否以内存映射方式打开数组
+
+    Returns:
+        TransportNetwork；快照不存在、格式版本不同、已过期或文件损坏时返回None
+    """
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if source_hash is not None and manifest.get('source_hash') != source_hash:
+        return None
+    try:
+        with _gc_paused():
+            network = _load_network(directory, manifest, columnar_stops, mmap)
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+    return network
+
+
+def _open_arrays(directory, manifest, mmap):
+    """
+    打开快照的全部数组并解码站点ID
+
+    Returns:
+        tuple: (数组字典, 站点ID列表)；站点数与manifest不一致时站点ID为None
+    """
+    arrays = {
+        name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r' if mmap else None,
+                      allow_pickle=False)
+        for name in _ARRAY_NAMES
+    }
+    num_stops = manifest['num_stops']
+    if manifest['id_kind'] == 'str':
+        stop_ids = _decode_strings(arrays['stop_ids'], num_stops)
+    else:
+        stop_ids = arrays['stop_ids'].tolist()
+    return arrays, stop_ids if len(stop_ids) == num_stops else None
+
+
+def _load_network(directory, manifest, columnar_stops, mmap):
+    """按manifest读取快照数组并恢复网络，数据不一致时返回None"""
+    arrays, stop_ids = _open_arrays(directory, manifest, mmap)
+    num_stops = manifest['num_stops']
+    names = _decode_strings(arrays['names'], num_stops)
+    if stop_ids is None or len(names) != num_stops:
+        return None
+    latitudes = arrays['latitudes'].tolist()
+    longitudes = arrays['longitudes'].tolist()
+    if columnar_stops:
+        stops = StopTable.from_columns(stop_ids, names, latitudes, longitudes, arrays['zone_codes'])
+    else:
+        zone_types = [ZONE_TYPES[code] for code in arrays['zone_codes'].tolist()]
+        stops = dict(zip(stop_ids, map(Stop, stop_ids, names, latitudes, longitudes, zone_types)))
+    id_column = np.array(stop_ids, dtype=object)
+    from_columns = RouteList.from_columns
+    route_lists = []
+    for offsets, neighbors, weights in ((arrays['offsets'], arrays['targets'], arrays['weights']),
+                                        (arrays['reverse_offsets'], arrays['reverse_sources'],
+                                         arrays['reverse_weights'])):
+        offsets = offsets.tolist()
+        neighbor_ids = id_column[neighbors].tolist()
+        weights = weights.tolist()
+        route_lists.append(dict(zip(stop_ids, [
+            from_columns(neighbor_ids[start:end], weights[start:end])
+            for start, end in zip(offsets, offsets[1:])
+        ])))
+    network = TransportNetwork.from_parts(stops, route_lists[0], route_lists[1])
+    # 快照中的CSR数组与恢复后的邻接表一致，直接作为网络的CSR缓存
+    network._csr = CSRGraph(stop_ids, arrays['offsets'], arrays['targets'], arrays['weights'],
+                            stops=network.stops, version=network.version,
+                            index={stop_id: i for i, stop_id in enumerate(stop_ids)})
+    return network
+
+
+def open_mapped_network(directory, source_hash=None):
+    """
+    以内存映射方式打开快照，返回只读的 MappedNetwork，不在Python中重建邻接表。
+
+    线路和坐标等数组直接映射快照文件，在fork出的或各自打开同一快照的多个工作进程之间
+    共享一份物理内存；每个进程只解码站点ID并建立 ID → 下标 的索引，名称在用到时才解码。
+
+    Args:
+        directory: 快照目录
+        source_hash: 可选，期望的源数据摘要；与快照记录的不一致时视为过期
+
+    Returns:
+        MappedNetwork；快照不存在、格式版本不同、已过期或文件损坏时返回None
+    """
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if source_hash is not None and manifest.get('source_hash') != source_hash:
+        return None
+    try:
+        arrays, stop_ids = _open_arrays(directory, manifest, mmap=True)
+        if stop_ids is None:
+            return None
+        index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        graph = CSRGraph(stop_ids, arrays['offsets'], arrays['targets'], arrays['weights'], index=index)
+        reverse = CSRGraph(stop_ids, arrays['reverse_offsets'], arrays['reverse_sources'],
+                           arrays['reverse_weights'], index=index)
+        # CSRGraph 会复制ID列表，正反向图和站点列共用同一份
+        stop_ids = reverse.stop_ids = graph.stop_ids
+        stops = MappedStops(stop_ids, index, _StringColumn(arrays['names'], len(stop_ids)),
+                            arrays['latitudes'], arrays['longitudes'], arrays['zone_codes'])
+        return MappedNetwork(graph, stops, reverse_graph=reverse)
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
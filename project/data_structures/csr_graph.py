@@ -0,0 +1,131 @@
+import numpy as np
+
+
+def _frozen_array(values, dtype):
+    """将输入转换为指定类型的连续只读NumPy数组（已满足条件时不复制）"""
+    array = np.ascontiguousarray(values, dtype=dtype)
+    if array.flags.writeable:
+        array.flags.writeable = False
+    return array
+
+
+class CSRGraph:
+    """
+    压缩稀疏行(CSR)格式的只读路网视图。
+
+    站点ID被映射为连续的整数下标(0..n-1)，第i个站点的出边目标存放在
+    targets[offsets[i]:offsets[i+1]]，对应的距离存放在 weights 的同一区间。
+    相比字典+元组列表的邻接表，每条边只占 4 字节目标下标 + 8 字节权重。
+    """
+
+    def __init__(self, stop_ids, offsets, targets, weights, stops=None, version=None, index=None):
+        """
+        Args:
+            stop_ids: 按下标排列的站点ID序列
+            offsets: 长度为 n+1 的出边起始偏移数组(int32)
+            targets: 出边目标站点下标数组(int32)
+            weights: 出边距离数组(float64)
+            stops: 可选，stop_ID -> Stop 的映射，用于把结果还原为Stop对象
+            version: 构建时源网络的版本号，用于判断视图是否过期
+            index: 可选，已构建好的 stop_ID -> 下标 映射（与转置图共享）
+        """
+        self.stop_ids = list(stop_ids)
+        self.index = index if index is not None else {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+        self.offsets = _frozen_array(offsets, np.int32)
+        self.targets = _frozen_array(targets, np.int32)
+        self.weights = _frozen_array(weights, np.float64)
+        if len(self.offsets) != len(self.stop_ids) + 1:
+            raise ValueError("offsets must have exactly one more entry than stop_ids")
+        if len(self.targets) != len(self.weights) or len(self.targets) != int(self.offsets[-1]):
+            raise ValueError("targets and weights must match the last offset")
+        self.stops = stops if stops is not None else {}
+        self.version = version
+        self._reverse = None
+
+    @classmethod
+    def from_network(cls, network):
+        """
+        从 TransportNetwork（或任何提供 adjacency_list 的对象）构建CSR视图。
+        站点下标顺序与 adjacency_list 的键顺序一致，出边顺序保持不变。
+        """
+        stop_ids = list(network.adjacency_list.keys())
+        index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        offsets = np.zeros(len(stop_ids) + 1, dtype=np.int32)
+        targets = []
+        weights = []
+        for i, stop_id in enumerate(stop_ids):
+            for neighbor_id, distance in network.adjacency_list[stop_id]:
+                targets.append(index[neighbor_id])
+                weights.append(distance)
+            offsets[i + 1] = len(targets)
+        return cls(
+            stop_ids,
+            offsets,
+            np.array(targets, dtype=np.int32),
+            np.array(weights, dtype=np.float64),
+            stops=getattr(network, 'stops', None),
+            version=getattr(network, 'version', None),
+            index=index
+        )
+
+    @property
+    def num_stops(self):
+        return len(self.stop_ids)
+
+    @property
+    def num_routes(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        """三个CSR数组占用的字节数（不含ID映射）"""
+        return self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes
+
+    def __len__(self):
+        return self.num_stops
+
+    def __contains__(self, stop_id):
+        return stop_id in self.index
+
+    def index_of(self, stop_id):
+        """站点ID -> 稠密下标，不存在时返回None"""
+        return self.index.get(stop_id)
+
+    def stop_id_of(self, index):
+        """稠密下标 -> 站点ID"""
+        return self.stop_ids[index]
+
+    def neighbors(self, index):
+        """返回下标为index的站点的出边列表 [(目标下标, 距离), ...]"""
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return list(zip(self.targets[start:end].tolist(), self.weights[start:end].tolist()))
+
+    def neighbor_lists(self):
+        """
+        返回所有站点的出边列表 [[(目标下标, 距离), ...], ...]。
+        结果不会缓存：每条边一个元组，占用的内存远大于CSR数组本身，调用方用完即可释放。
+        """
+        offsets = self.offsets.tolist()
+        edges = list(zip(self.targets.tolist(), self.weights.tolist()))
+        return [edges[offsets[i]:offsets[i + 1]] for i in range(self.num_stops)]
+
+    def out_degree(self, index):
+        return int(self.offsets[index + 1] - self.offsets[index])
+
+    def get_stop_by_id(self, stop_id):
+        return self.stops.get(stop_id)
+
+    def reverse(self):
+        """返回转置图（所有边反向）的CSR视图，结果会被缓存"""
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.num_stops, dtype=np.int32), np.diff(self.offsets))
+            # 稳定排序保证同一终点的入边按原出边顺序排列
+            order = np.argsort(self.targets, kind='stable')
+            counts = np.bincount(self.targets, minlength=self.num_stops)
+            offsets = np.zeros(self.num_stops + 1, dtype=np.int32)
+            np.cumsum(counts, out=offsets[1:])
+            reverse = CSRGraph(self.stop_ids, offsets, sources[order], self.weights[order],
+                               stops=self.stops, version=self.version, index=self.index)
+            reverse._reverse = self
+            self._reverse = reverse
+        return self._reverse
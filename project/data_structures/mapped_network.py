@@ -0,0 +1,143 @@
+from collections.abc import Mapping
+import numpy as np
+from project.data_structures.stop_entity import Stop
+from project.data_structures.stop_table import ZONE_TYPES
+
+
+class MappedAdjacency(Mapping):
+    """
+    CSR数组上的只读邻接表，接口与 TransportNetwork.adjacency_list 相同：
+    stop_ID → ((邻居ID, 距离), ...)，每次访问时从数组中取出该站点的出边。
+    """
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph: CSRGraph（反向邻接表传入转置图）
+        """
+        self._graph = graph
+
+    def __getitem__(self, stop_id):
+        graph = self._graph
+        i = graph.index[stop_id]
+        start, end = int(graph.offsets[i]), int(graph.offsets[i + 1])
+        stop_ids = graph.stop_ids
+        return tuple(zip([stop_ids[j] for j in graph.targets[start:end].tolist()],
+                         graph.weights[start:end].tolist()))
+
+    def __iter__(self):
+        return iter(self._graph.stop_ids)
+
+    def __len__(self):
+        return self._graph.num_stops
+
+    def __contains__(self, stop_id):
+        return stop_id in self._graph.index
+
+
+class MappedStops(Mapping):
+    """
+    按列保存的只读站点映射 stop_ID → Stop，每次访问时由各列数据创建新的Stop对象。
+    列可以是内存映射的NumPy数组，多个进程共享同一份物理内存。
+    """
+
+    def __init__(self, stop_ids, index, names, latitudes, longitudes, zone_codes):
+        """
+        Args:
+            stop_ids: 按下标排列的站点ID序列
+            index: stop_ID → 下标 的映射
+            names: 按下标排列的名称序列
+            latitudes, longitudes: 纬度、经度数组
+            zone_codes: 区域编码数组（ZONE_TYPES中的下标）
+        """
+        self._stop_ids = stop_ids
+        self._index = index
+        self._names = names
+        self._lat = latitudes
+        self._lon = longitudes
+        self._zone = zone_codes
+
+    def __getitem__(self, stop_id):
+        i = self._index[stop_id]
+        return Stop(stop_id, self._names[i], float(self._lat[i]), float(self._lon[i]),
+                    ZONE_TYPES[self._zone[i]])
+
+    def __iter__(self):
+        return iter(self._stop_ids)
+
+    def __len__(self):
+        return len(self._stop_ids)
+
+    def __contains__(self, stop_id):
+        return stop_id in self._index
+
+    def names(self):
+        """站点名称列表（按迭代顺序）"""
+        return list(self._names)
+
+    def coordinate_arrays(self):
+        """
+        Returns:
+            tuple: (纬度数组, 经度数组)，与 StopTable.coordinate_arrays 相同
+        """
+        return np.asarray(self._lat), np.asarray(self._lon)
+
+
+class MappedNetwork:
+    """
+    由CSR数组和站点列组成的只读网络，提供 dijkstra、find_all_paths 等算法使用的
+    adjacency_list / reverse_adjacency / stops / get_stop_by_id / to_csr 接口。
+
+    数组通常是快照文件的内存映射（见 network_snapshot.open_mapped_network）：
+    多个工作进程打开同一份快照时共享一份物理内存，每个进程只额外保存站点ID和ID索引。
+    网络不可修改，版本号固定为0，按版本缓存的派生数据永远有效。
+    """
+
+    def __init__(self, graph, stops, reverse_graph=None):
+        """
+        Args:
+            graph: 正向CSRGraph
+            stops: stop_ID → Stop 的只读映射（如 MappedStops），顺序与graph的下标一致
+            reverse_graph: 可选，预先保存的转置图；不提供时需要时由graph计算
+        """
+        self.version = 0
+        graph.version = self.version
+        graph.stops = stops
+        if reverse_graph is not None:
+            reverse_graph.version = self.version
+            reverse_graph.stops = stops
+            graph._reverse = reverse_graph
+            reverse_graph._reverse = graph
+        self._csr = graph
+        self.stops = stops
+        self.adjacency_list = MappedAdjacency(graph)
+        self.reverse_adjacency = MappedAdjacency(graph.reverse())
+
+    def to_csr(self):
+        """网络的CSR视图（即构成网络的数组本身）"""
+        return self._csr
+
+    def get_stop_by_id(self, stop_id):
+        return self.stops.get(stop_id)
+
+    def has_route(self, from_stop, to_stop):
+        """是否存在从from_stop到to_stop的线路"""
+        return self.get_route_distance(from_stop, to_stop) is not None
+
+    def get_route_distance(self, from_stop, to_stop):
+        """返回线路距离，线路不存在时返回None"""
+        from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
+        to_id = to_stop.stop_ID if isinstance(to_stop, Stop) else to_stop
+        graph = self._csr
+        i, j = graph.index_of(from_id), graph.index_of(to_id)
+        if i is None or j is None:
+            return None
+        start, end = int(graph.offsets[i]), int(graph.offsets[i + 1])
+        matches = np.flatnonzero(graph.targets[start:end] == j)
+        return float(graph.weights[start + matches[0]]) if len(matches) else None
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("MappedNetwork is read-only")
+
+    add_stop = add_route = update_route = remove_stop = remove_route = _read_only
+    add_stop_columns = add_route_columns = _read_only
@@ -0,0 +1,98 @@
+class RouteList:
+    """
+    一个站点的出边（或入边）集合，按 目标站点ID → 距离 的字典保存。
+
+    对外表现为 (目标站点ID, 距离) 元组的有序序列：迭代顺序即添加顺序，可以与列表比较相等，
+    因此可以直接替换 TransportNetwork.adjacency_list 中原来的列表；
+    而按目标站点判断存在、查询/修改距离和删除都是 O(1)。
+    """
+
+    __slots__ = ('_routes',)
+
+    def __init__(self, routes=()):
+        """
+        Args:
+            routes: 可选，(目标站点ID, 距离) 的初始序列；目标重复时抛出ValueError
+        """
+        self._routes = {}
+        for route in routes:
+            self.append(route)
+
+    def __iter__(self):
+        return iter(self._routes.items())
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __contains__(self, route):
+        # 与列表相同，按 (目标站点ID, 距离) 元组判断
+        try:
+            to_id, distance = route
+        except (TypeError, ValueError):
+            return False
+        return to_id in self._routes and self._routes[to_id] == distance
+
+    def __getitem__(self, index):
+        # 按下标访问需要遍历，仅为兼容把邻接表当作列表使用的代码
+        return list(self._routes.items())[index]
+
+    def __eq__(self, other):
+        if isinstance(other, RouteList):
+            return list(self._routes.items()) == list(other._routes.items())
+        if isinstance(other, (list, tuple)):
+            return list(self._routes.items()) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self._routes.items()))
+
+    def has(self, to_id):
+        """是否存在到to_id的边"""
+        return to_id in self._routes
+
+    def get(self, to_id, default=None):
+        """返回到to_id的距离，不存在时返回default"""
+        return self._routes.get(to_id, default)
+
+    def targets(self):
+        """目标站点ID的只读视图（按添加顺序）"""
+        return self._routes.keys()
+
+    def append(self, route):
+        """
+        追加一条边
+
+        Raises:
+            ValueError: 已存在到同一目标站点的边
+        """
+        to_id, distance = route
+        if to_id in self._routes:
+            raise ValueError(f"Route to {to_id} already exists")
+        self._routes[to_id] = distance
+
+    def update(self, to_id, distance):
+        """修改已有边的距离，位置不变；边不存在时抛出KeyError"""
+        if to_id not in self._routes:
+            raise KeyError(to_id)
+        self._routes[to_id] = distance
+
+    def discard(self, to_id):
+        """
+        删除到to_id的边
+
+        Returns:
+            被删除边的距离，边不存在时返回None
+        """
+        return self._routes.pop(to_id, None)
+
+    @classmethod
+    def from_columns(cls, targets, distances):
+        """
+        由目标站点ID序列和距离序列直接创建，调用方需保证目标站点不重复
+        （用于从快照等已校验过的数据恢复邻接表）
+        """
+        routes = cls.__new__(cls)
+        routes._routes = dict(zip(targets, distances))
+        return routes
@@ -0,0 +1,300 @@
+import math
+import numpy as np
+from project.algorithms.coordinate_utils import CoordinateUtils
+
+# 每度纬度对应的公里数（与Haversine公式使用的地球半径6371km一致）
+_KM_PER_DEGREE = 6371.0 * math.pi / 180
+
+
+class GridIndex:
+    """
+    平面坐标上的均匀网格空间索引（用于GUI场景坐标）。
+
+    点按 cell_size 划分到网格单元中，查询只需检查与查询区域相交的单元，
+    在站点分布较均匀时，最近邻、半径和矩形查询的代价与结果附近的站点数成正比，而与站点总数无关。
+    同一个键只能对应一个位置，重复插入会移动该点。
+    """
+
+    def __init__(self, cell_size):
+        """
+        Args:
+            cell_size: 网格单元边长（与坐标同单位）
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _distance(self, x1, y1, x2, y2):
+        return math.hypot(x1 - x2, y1 - y2)
+
+    def _cell_range(self, x, y, radius):
+        """返回覆盖以(x, y)为中心、半径radius的圆的单元下标范围 (cx0, cx1, cy0, cy1)"""
+        cx0, cy0 = self._cell_of(x - radius, y - radius)
+        cx1, cy1 = self._cell_of(x + radius, y + radius)
+        return cx0, cx1, cy0, cy1
+
+    def insert(self, key, x, y):
+        """插入或移动一个点"""
+        if key in self._points:
+            self.remove(key)
+        cell = self._cell_of(x, y)
+        self._points[key] = (x, y, cell)
+        self._cells.setdefault(cell, []).append(key)
+
+    def remove(self, key):
+        """删除一个点，不存在时忽略"""
+        entry = self._points.pop(key, None)
+        if entry is None:
+            return
+        cell = entry[2]
+        keys = self._cells[cell]
+        keys.remove(key)
+        if not keys:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def position_of(self, key):
+        """返回点的坐标 (x, y)，不存在时返回None"""
+        entry = self._points.get(key)
+        return None if entry is None else entry[:2]
+
+    def _y_ranges(self, cy0, cy1):
+        """把单元的y下标范围拆成闭区间列表；平面网格不需要拆分（见 GeoGridIndex 的经度回绕）"""
+        return [(cy0, cy1)]
+
+    def _candidates(self, cx0, cx1, cy0, cy1):
+        cells = self._cells
+        y_ranges = self._y_ranges(cy0, cy1)
+        # 查询范围比已占用的单元数还大时，直接遍历已占用的单元
+        if (cx1 - cx0 + 1) * sum(y1 - y0 + 1 for y0, y1 in y_ranges) > len(cells):
+            for (cx, cy), keys in cells.items():
+                if cx0 <= cx <= cx1 and any(y0 <= cy <= y1 for y0, y1 in y_ranges):
+                    yield from keys
+            return
+        for cx in range(cx0, cx1 + 1):
+            for y0, y1 in y_ranges:
+                for cy in range(y0, y1 + 1):
+                    keys = cells.get((cx, cy))
+                    if keys:
+                        yield from keys
+
+    def within_radius(self, x, y, radius):
+        """
+        半径查询。
+        Returns:
+            [(键, 距离), ...]，按距离从近到远排序（距离相同时保持插入顺序）
+        """
+        if radius < 0 or not self._points:
+            return []
+        points = self._points
+        result = []
+        for key in self._candidates(*self._cell_range(x, y, radius)):
+            px, py, _ = points[key]
+            distance = self._distance(x, y, px, py)
+            if distance <= radius:
+                result.append((key, distance))
+        result.sort(key=lambda item: item[1])
+        return result
+
+    def any_within(self, x, y, radius):
+        """是否存在与(x, y)距离严格小于radius的点（找到一个即返回）"""
+        if radius <= 0 or not self._points:
+            return False
+        points = self._points
+        for key in self._candidates(*self._cell_range(x, y, radius)):
+            px, py, _ = points[key]
+            if self._distance(x, y, px, py) < radius:
+                return True
+        return False
+
+    def nearest(self, x, y, max_distance=None):
+        """
+        最近邻查询：从一个单元的半径开始逐步扩大搜索半径，直到找到点或覆盖全部点。
+        Returns:
+            (键, 距离)；没有点（或max_distance内没有点）时返回None
+        """
+        if not self._points:
+            return None
+        radius = self._initial_radius()
+        while True:
+            limit = radius if max_distance is None else min(radius, max_distance)
+            found = self.within_radius(x, y, limit)
+            if found:
+                return found[0]
+            if max_distance is not None and radius >= max_distance:
+                return None
+            if self._covers_all(x, y, radius):
+                return None
+            radius *= 2
+
+    def _initial_radius(self):
+        return self.cell_size
+
+    def _covers_all(self, x, y, radius):
+        """当前搜索范围是否已覆盖所有已占用的单元"""
+        cx0, cx1, cy0, cy1 = self._cell_range(x, y, radius)
+        y_ranges = self._y_ranges(cy0, cy1)
+        return all(cx0 <= cx <= cx1 and any(y0 <= cy <= y1 for y0, y1 in y_ranges) for cx, cy in self._cells)
+
+    def within_bbox(self, min_x, min_y, max_x, max_y):
+        """矩形查询，返回落在闭区间矩形内的键列表"""
+        cx0, cy0 = self._cell_of(min_x, min_y)
+        cx1, cy1 = self._cell_of(max_x, max_y)
+        points = self._points
+        result = []
+        for key in self._candidates(cx0, cx1, cy0, cy1):
+            px, py, _ = points[key]
+            if min_x <= px <= max_x and min_y <= py <= max_y:
+                result.append(key)
+        return result
+
+
+class GeoGridIndex(GridIndex):
+    """
+    经纬度上的网格空间索引，距离为Haversine公里数。
+
+    坐标约定为 (纬度, 经度)，与 Stop.latitude/longitude 一致；
+    查询半径按所在纬度换算为经纬度跨度后选取候选单元，再用Haversine精确过滤。
+    经度方向的单元下标对一周取模：跨越±180°经线的查询范围拆成两段，查询不会漏掉经线另一侧的站点。
+    """
+
+    def __init__(self, cell_size_km=1.0):
+        """
+        Args:
+            cell_size_km: 网格单元边长（公里，按纬度方向换算为度）
+        """
+        if cell_size_km <= 0:
+            raise ValueError("cell_size_km must be positive")
+        super().__init__(cell_size_km / _KM_PER_DEGREE)
+        self.cell_size_km = float(cell_size_km)
+        # 一周经度的单元数；360不是单元宽度的整数倍时，最后一个单元较窄
+        self._lon_cells = math.ceil(360.0 / self.cell_size)
+
+    def _lon_cell(self, lon):
+        """经度所在的单元下标，经度先规范到 [-180, 180)"""
+        return min(math.floor(((lon + 180.0) % 360.0) / self.cell_size), self._lon_cells - 1)
+
+    def _cell_of(self, lat, lon):
+        return (math.floor(lat / self.cell_size), self._lon_cell(lon))
+
+    def _y_ranges(self, cy0, cy1):
+        # cy0 > cy1 表示范围跨越±180°经线：cy0 到最后一个单元，再从0到cy1
+        if cy0 <= cy1:
+            return [(cy0, cy1)]
+        return [(cy0, self._lon_cells - 1), (0, cy1)]
+
+    def _distance(self, lat1, lon1, lat2, lon2):
+        return CoordinateUtils.calculate_haversine_distance(lat1, lon1, lat2, lon2)
+
+    def _cell_range(self, lat, lon, radius_km):
+        dlat = radius_km / _KM_PER_DEGREE
+        # 球冠的经度半宽：asin(sin(角半径) / cos(纬度))；球冠包含极点时退化为全部经度
+        angular = math.radians(dlat)
+        cos_lat = math.cos(math.radians(lat))
+        if angular >= math.pi / 2 or math.sin(angular) >= cos_lat:
+            dlon = 180.0
+        else:
+            dlon = math.degrees(math.asin(math.sin(angular) / cos_lat))
+        cx0 = math.floor((lat - dlat) / self.cell_size)
+        cx1 = math.floor((lat + dlat) / self.cell_size)
+        if dlon >= 180.0:
+            return cx0, cx1, 0, self._lon_cells - 1
+        west, east = (lon - dlon + 180.0) % 360.0, (lon + dlon + 180.0) % 360.0
+        cy0, cy1 = self._lon_cell(lon - dlon), self._lon_cell(lon + dlon)
+        if west > east and cy0 <= cy1:
+            # 跨越经线且两端落在同一单元（范围几乎绕地球一周）：取全部经度
+            return cx0, cx1, 0, self._lon_cells - 1
+        return cx0, cx1, cy0, cy1
+
+    def _initial_radius(self):
+        return self.cell_size_km
+
+    def _covers_all(self, lat, lon, radius_km):
+        # 半径超过半个地球周长后必然覆盖所有点
+        return radius_km > math.pi * 6371.0 or super()._covers_all(lat, lon, radius_km)
+
+
+def pairs_within_distance(lats, lons, max_distance, chunk_size=65536):
+    """
+    找出所有Haversine距离不超过max_distance（公里）的站点对，结果与
+    CoordinateUtils.pairwise_haversine(..., max_distance) 相同，但只比较相邻网格单元中的站点。
+
+    站点按边长不小于max_distance的经纬度网格分桶，每个站点只需与自身及右上方4个相邻单元
+    （共享边界的另外4个方向由对方负责）中的站点比较，整体为 O(N + 候选对数)。
+    假定站点不跨越180°经线。
+
+    Args:
+        lats, lons: 纬度、经度数组
+        max_distance: 距离上限（公里）
+        chunk_size: 每批处理的站点数，限制候选对数组占用的内存
+
+    Returns:
+        tuple: (i数组, j数组, 距离数组)，i < j，按 (i, j) 升序排列
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n = len(lats)
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+    if n < 2 or max_distance < 0:
+        return empty
+    angular = max_distance / 6371.0
+    max_abs_lat = float(np.max(np.abs(lats))) + math.degrees(angular)
+    cos_lat = math.cos(math.radians(min(90.0, max_abs_lat)))
+    if max_distance <= 0 or angular >= math.pi / 2 or math.sin(angular) >= cos_lat:
+        # 距离为0或网格在高纬度退化时，直接逐块两两比较
+        return CoordinateUtils.pairwise_haversine(list(zip(lats, lons)), max_distance=max_distance)
+    # 单元的纬度跨度对应max_distance，经度跨度取全体站点中最宽的球冠半宽
+    cell_lat = math.degrees(angular)
+    cell_lon = math.degrees(math.asin(math.sin(angular) / cos_lat))
+    cx = np.floor(lats / cell_lat).astype(np.int64)
+    cy = np.floor(lons / cell_lon).astype(np.int64)
+    cy -= cy.min() - 1
+    width = int(cy.max()) + 2
+    keys = cx * width + cy
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    rows, cols, distances = [], [], []
+    for offset_x, offset_y in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        delta = offset_x * width + offset_y
+        for start in range(0, n, chunk_size):
+            sources = np.arange(start, min(n, start + chunk_size))
+            target_keys = keys[sources] + delta
+            first = np.searchsorted(sorted_keys, target_keys, side='left')
+            counts = np.searchsorted(sorted_keys, target_keys, side='right') - first
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # 展开为候选对：每个源站点与目标单元中的每个站点配对
+            source_idx = np.repeat(sources, counts)
+            group_start = np.repeat(np.cumsum(counts) - counts, counts)
+            target_idx = order[np.repeat(first, counts) + (np.arange(total) - group_start)]
+            if delta == 0:
+                keep = source_idx < target_idx
+                source_idx, target_idx = source_idx[keep], target_idx[keep]
+            i_idx = np.minimum(source_idx, target_idx)
+            j_idx = np.maximum(source_idx, target_idx)
+            d = CoordinateUtils.haversine_many(lats[i_idx], lons[i_idx], lats[j_idx], lons[j_idx])
+            keep = d <= max_distance
+            rows.append(i_idx[keep])
+            cols.append(j_idx[keep])
+            distances.append(d[keep])
+    if not rows:
+        return empty
+    rows, cols, distances = np.concatenate(rows), np.concatenate(cols), np.concatenate(distances)
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order], distances[order]
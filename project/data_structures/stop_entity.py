@@ -9,6 +9,9 @@ class ZoneType(Enum):
     URBAN = "Urban"
 
 class Stop:
+    # 不使用实例 __dict__，大量站点常驻内存时每个对象只占固定的几个槽位
+    __slots__ = ('stop_ID', 'name', 'latitude', 'longitude', '_zone_type')
+
     def __init__(self, stop_ID, name, latitude, longitude, zone_type):
         if not isinstance(zone_type, ZoneType):
             raise TypeError("zone_type must be an instance of ZoneType")
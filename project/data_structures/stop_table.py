@@ -0,0 +1,325 @@
+import sys
+from collections.abc import MutableMapping
+import numpy as np
+from project.data_structures.stop_entity import Stop, ZoneType
+
+# 区域类型按枚举定义顺序编码为 uint8
+ZONE_TYPES = tuple(ZoneType)
+ZONE_CODES = {zone: code for code, zone in enumerate(ZONE_TYPES)}
+
+
+def _intern_name(name):
+    return sys.intern(name) if type(name) is str else name
+
+
+class StopTable(MutableMapping):
+    """
+    列式存储的站点表，可直接用作 TransportNetwork.stops（站点ID → 站点 的映射）。
+
+    站点ID、纬度、经度、区域编码分别存放在NumPy数组中，名称保存为驻留字符串列表，
+    每个站点只占一行而不是一个完整的Python对象；按ID取出的是轻量的 StopView，
+    读写其属性直接作用在表的列上。分析代码可以用 coordinate_arrays() 等方法对整列向量化计算。
+
+    删除站点只把所在行标记为无效，无效行过多时自动压缩；迭代顺序与插入顺序一致。
+    """
+
+    _INITIAL_CAPACITY = 16
+    # 无效行超过该数量且超过总行数一半时压缩
+    _COMPACT_MIN_DEAD = 1024
+
+    def __init__(self, capacity=0):
+        """
+        Args:
+            capacity: 预分配的行数
+        """
+        capacity = max(int(capacity), self._INITIAL_CAPACITY)
+        self._ids = np.empty(capacity, dtype=object)
+        self._lat = np.empty(capacity, dtype=np.float64)
+        self._lon = np.empty(capacity, dtype=np.float64)
+        self._zone = np.empty(capacity, dtype=np.uint8)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._names = []
+        # 已使用的行数（含已删除的行）和其中已删除的行数
+        self._size = 0
+        self._dead = 0
+        self._row_of = {}
+        # 行号整体重排（压缩）的次数，StopView 据此判断缓存的行号是否仍然有效
+        self._epoch = 0
+
+    @classmethod
+    def from_stops(cls, stops):
+        """由Stop对象序列创建站点表"""
+        stops = list(stops)
+        table = cls(len(stops))
+        for stop in stops:
+            table.append(stop.stop_ID, stop.name, stop.latitude, stop.longitude, stop.zone_type)
+        return table
+
+    @classmethod
+    def from_columns(cls, ids, names, latitudes, longitudes, zone_codes):
+        """
+        由整列数据创建站点表，不逐个创建Stop对象
+
+        Args:
+            ids: 站点ID序列
+            names: 站点名称序列
+            latitudes, longitudes: 纬度、经度序列
+            zone_codes: 区域编码序列（ZONE_TYPES中的下标）
+
+        Returns:
+            StopTable
+        """
+        table = cls(len(ids))
+        table.extend_columns(ids, names, latitudes, longitudes, zone_codes)
+        return table
+
+    # ---- 映射接口 ----
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, stop_id):
+        return stop_id in self._row_of
+
+    def __iter__(self):
+        # 新行总是追加在末尾，压缩时保持原有顺序，因此 _row_of 的插入顺序就是行顺序
+        return iter(self._row_of)
+
+    def __getitem__(self, stop_id):
+        return StopView(self, stop_id, self._row_of[stop_id])
+
+    def __setitem__(self, stop_id, stop):
+        if not isinstance(stop, Stop):
+            raise TypeError("Value must be a Stop object")
+        row = self._row_of.get(stop_id)
+        if row is None:
+            self.append(stop_id, stop.name, stop.latitude, stop.longitude, stop.zone_type)
+            return
+        if isinstance(stop, StopView) and stop._table is self and stop._locate() == row:
+            return
+        self._write_row(row, stop_id, stop.name, stop.latitude, stop.longitude, stop.zone_type)
+
+    def __delitem__(self, stop_id):
+        row = self._row_of.pop(stop_id)
+        self._alive[row] = False
+        self._ids[row] = None
+        self._names[row] = None
+        self._dead += 1
+        if self._dead >= self._COMPACT_MIN_DEAD and self._dead * 2 > self._size:
+            self.compact()
+
+    def __repr__(self):
+        return f"StopTable(size={len(self)})"
+
+    # ---- 写入 ----
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._lat):
+            return
+        capacity = max(capacity, 2 * len(self._lat))
+        for attr in ('_ids', '_lat', '_lon', '_zone', '_alive'):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype) if attr == '_alive' else np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def _write_row(self, row, stop_id, name, latitude, longitude, zone_type):
+        if not isinstance(zone_type, ZoneType):
+            raise TypeError("zone_type must be an instance of ZoneType")
+        self._ids[row] = stop_id
+        self._lat[row] = latitude
+        self._lon[row] = longitude
+        self._zone[row] = ZONE_CODES[zone_type]
+        self._alive[row] = True
+        self._names[row] = _intern_name(name)
+
+    def append(self, stop_id, name, latitude, longitude, zone_type):
+        """
+        追加一个站点
+
+        Returns:
+            新站点的行号
+
+        Raises:
+            ValueError: 站点ID已存在
+            TypeError: zone_type不是ZoneType
+        """
+        if stop_id in self._row_of:
+            raise ValueError(f"Stop with ID {stop_id} already exists")
+        if not isinstance(zone_type, ZoneType):
+            raise TypeError("zone_type must be an instance of ZoneType")
+        row = self._size
+        self._reserve(row + 1)
+        self._names.append(None)
+        self._size += 1
+        self._write_row(row, stop_id, name, latitude, longitude, zone_type)
+        self._row_of[stop_id] = row
+        return row
+
+    def extend_columns(self, ids, names, latitudes, longitudes, zone_codes):
+        """
+        批量追加整列数据，参数含义同 from_columns
+
+        Raises:
+            ValueError: 列长度不一致、站点ID重复或区域编码无效
+        """
+        ids = list(ids)
+        names = list(names)
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        codes = np.asarray(zone_codes)
+        count = len(ids)
+        if not (len(names) == len(lats) == len(lons) == len(codes) == count):
+            raise ValueError("All columns must have the same length")
+        if count and (codes.min() < 0 or codes.max() >= len(ZONE_TYPES)):
+            raise ValueError("Invalid zone code")
+        start = self._size
+        new_rows = {}
+        for offset, stop_id in enumerate(ids):
+            if stop_id in self._row_of or stop_id in new_rows:
+                raise ValueError(f"Stop with ID {stop_id} already exists")
+            new_rows[stop_id] = start + offset
+        self._reserve(start + count)
+        end = start + count
+        ids_column = self._ids
+        for row, stop_id in enumerate(ids, start):
+            ids_column[row] = stop_id
+        self._lat[start:end] = lats
+        self._lon[start:end] = lons
+        self._zone[start:end] = codes
+        self._alive[start:end] = True
+        self._names.extend(_intern_name(name) for name in names)
+        self._size = end
+        self._row_of.update(new_rows)
+
+    def compact(self):
+        """去掉已删除的行，之前取得的 StopView 会在下次访问时重新定位"""
+        if not self._dead:
+            return
+        live = np.flatnonzero(self._alive[:self._size])
+        count = len(live)
+        for attr in ('_ids', '_lat', '_lon', '_zone', '_alive'):
+            column = getattr(self, attr)
+            column[:count] = column[live]
+        self._alive[count:self._size] = False
+        self._ids[count:self._size] = None
+        names = self._names
+        self._names = [names[row] for row in live.tolist()]
+        self._row_of = {stop_id: row for row, stop_id in enumerate(self._ids[:count].tolist())}
+        self._size = count
+        self._dead = 0
+        self._epoch += 1
+
+    # ---- 按行/按列读取 ----
+
+    def row_of(self, stop_id):
+        """返回站点所在行号，不存在时抛出KeyError"""
+        return self._row_of[stop_id]
+
+    def to_stop(self, stop_id):
+        """把一行数据还原为独立的Stop对象"""
+        row = self._row_of[stop_id]
+        return Stop(stop_id, self._names[row], float(self._lat[row]), float(self._lon[row]),
+                    ZONE_TYPES[self._zone[row]])
+
+    def _live(self, column):
+        """按迭代顺序返回列中有效行的只读数组"""
+        values = column[:self._size]
+        if self._dead:
+            return values[self._alive[:self._size]]
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def ids(self):
+        """站点ID数组（object类型）"""
+        return self._live(self._ids)
+
+    def latitudes(self):
+        return self._live(self._lat)
+
+    def longitudes(self):
+        return self._live(self._lon)
+
+    def coordinate_arrays(self):
+        """
+        Returns:
+            tuple: (纬度数组, 经度数组)，与 CoordinateUtils.stop_coordinate_arrays 的结果相同
+        """
+        return self.latitudes(), self.longitudes()
+
+    def zone_codes(self):
+        """区域编码数组（ZONE_TYPES中的下标）"""
+        return self._live(self._zone)
+
+    def names(self):
+        """站点名称列表"""
+        if self._dead:
+            names = self._names
+            return [names[row] for row in np.flatnonzero(self._alive[:self._size]).tolist()]
+        return list(self._names)
+
+    def nbytes(self):
+        """列数组占用的字节数（不含ID、名称字符串本身和ID索引字典）"""
+        return sum(column.nbytes for column in (self._ids, self._lat, self._lon, self._zone, self._alive))
+
+
+class StopView(Stop):
+    """
+    StopTable 中一行的轻量视图，可以在任何需要Stop的地方使用。
+    属性读写直接作用在表的列上；站点被删除后访问属性会抛出KeyError。
+    """
+
+    __slots__ = ('_table', '_key', '_row', '_epoch')
+
+    def __init__(self, table, stop_id, row):
+        self._table = table
+        self._key = stop_id
+        self._row = row
+        self._epoch = table._epoch
+
+    def _locate(self):
+        table = self._table
+        row = self._row
+        if self._epoch != table._epoch or not table._alive[row]:
+            row = self._row = table.row_of(self._key)
+            self._epoch = table._epoch
+        return row
+
+    @property
+    def stop_ID(self):
+        return self._key
+
+    @property
+    def name(self):
+        return self._table._names[self._locate()]
+
+    @name.setter
+    def name(self, value):
+        self._table._names[self._locate()] = _intern_name(value)
+
+    @property
+    def latitude(self):
+        return float(self._table._lat[self._locate()])
+
+    @latitude.setter
+    def latitude(self, value):
+        self._table._lat[self._locate()] = value
+
+    @property
+    def longitude(self):
+        return float(self._table._lon[self._locate()])
+
+    @longitude.setter
+    def longitude(self, value):
+        self._table._lon[self._locate()] = value
+
+    @property
+    def zone_type(self):
+        return ZONE_TYPES[self._table._zone[self._locate()]]
+
+    @zone_type.setter
+    def zone_type(self, value):
+        if not isinstance(value, ZoneType):
+            raise TypeError("zone_type must be an instance of ZoneType")
+        self._table._zone[self._locate()] = ZONE_CODES[value]
@@ -1,20 +1,56 @@
 from project.data_structures.stop_entity import Stop
+from project.data_structures.csr_graph import CSRGraph
+from project.data_structures.route_list import RouteList
+from project.data_structures.stop_table import StopTable, ZONE_CODES
 import csv
+from itertools import count
 
 class TransportNetwork:
-    def __init__(self):
+    def __init__(self, stop_table=None):
+        """
+        Args:
+            stop_table: 可选，用作站点存储的 StopTable（列式存储，适合大规模网络）；
+                        默认用普通字典保存Stop对象。使用站点表时 stops 中取出的是 StopView，
+                        add_stop 会复制站点的数据，之后修改传入的Stop对象不会影响网络
+        """
         self.adjacency_list = {} 
-        self.stops = {} 
+        self.stops = {} if stop_table is None else stop_table
         self.reverse_adjacency = {}
+        # adjacency_list/reverse_adjacency 的值是 RouteList：按 (站点ID, 距离) 有序迭代，
+        # 按站点ID判断、修改和删除边都是 O(1)
+        for stop_id in self.stops:
+            self.adjacency_list[stop_id] = RouteList()
+            self.reverse_adjacency[stop_id] = RouteList()
+        # 拓扑版本号：每次增删站点或线路后递增，用于判断派生视图是否过期
+        self.version = 0
+        self._csr = None
+    
+    @classmethod
+    def from_parts(cls, stops, adjacency_list, reverse_adjacency):
+        """
+        由已构建好的站点映射和邻接表直接创建网络，不做任何校验
+        （用于从快照等已校验过的数据恢复网络，调用方需保证三者一致）
+        
+        Args:
+            stops: stop_ID → Stop 的映射（dict 或 StopTable）
+            adjacency_list, reverse_adjacency: stop_ID → RouteList 的字典
+        """
+        network = cls()
+        network.stops = stops
+        network.adjacency_list = adjacency_list
+        network.reverse_adjacency = reverse_adjacency
+        network.version += 1
+        return network
     
     def add_stop(self, stop):
         if not isinstance(stop, Stop):
             raise TypeError("Argument must be a Stop object")
         if stop.stop_ID in self.adjacency_list:
             raise ValueError(f"Stop with ID {stop.stop_ID} already exists")
-        self.adjacency_list[stop.stop_ID] = []
-        self.reverse_adjacency[stop.stop_ID] = []
+        self.adjacency_list[stop.stop_ID] = RouteList()
+        self.reverse_adjacency[stop.stop_ID] = RouteList()
         self.stops[stop.stop_ID] = stop
+        self.version += 1
     
     def add_route(self, from_stop, to_stop, distance):
         from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
@@ -25,33 +61,130 @@ class TransportNetwork:
             raise ValueError("To stop not found in network")
         if distance < 0:
             raise ValueError("Distance must be non-negative")
-        for neighbor_id, _ in self.adjacency_list[from_id]:
-            if neighbor_id == to_id:
-                raise ValueError(f"Route from {from_id} to {to_id} already exists")
+        if self.adjacency_list[from_id].has(to_id):
+            raise ValueError(f"Route from {from_id} to {to_id} already exists")
         self.adjacency_list[from_id].append((to_id, distance))
         self.reverse_adjacency[to_id].append((from_id, distance))
+        self.version += 1
+    
+    def add_stop_columns(self, stop_ids, names, latitudes, longitudes, zone_types):
+        """
+        批量添加站点：整批校验后一次写入，只递增一次版本号。
+        站点存储为 StopTable 时直接追加整列，不创建Stop对象。
+        
+        Args:
+            stop_ids, names, latitudes, longitudes, zone_types: 等长的各列数据，zone_types 为 ZoneType
+            
+        Returns:
+            被拒绝的站点 [(下标, 原因), ...]；站点ID已存在（或在本批中重复）时拒绝
+        """
+        rejected = []
+        accepted = []
+        seen = set()
+        for i, stop_id in enumerate(stop_ids):
+            if stop_id in self.adjacency_list or stop_id in seen:
+                rejected.append((i, f"Stop with ID {stop_id} already exists"))
+                continue
+            seen.add(stop_id)
+            accepted.append(i)
+        ids = [stop_ids[i] for i in accepted]
+        columns = [[column[i] for i in accepted] for column in (names, latitudes, longitudes, zone_types)]
+        if isinstance(self.stops, StopTable):
+            self.stops.extend_columns(ids, columns[0], columns[1], columns[2],
+                                      [ZONE_CODES[zone] for zone in columns[3]])
+        else:
+            for stop_id, name, lat, lon, zone in zip(ids, *columns):
+                self.stops[stop_id] = Stop(stop_id, name, lat, lon, zone)
+        for stop_id in ids:
+            self.adjacency_list[stop_id] = RouteList()
+            self.reverse_adjacency[stop_id] = RouteList()
+        if ids:
+            self.version += 1
+        return rejected
+    
+    def add_route_columns(self, from_ids, to_ids, distances):
+        """
+        批量添加线路：一次遍历直接写入邻接表，只递增一次版本号。
+        校验规则与 add_route 相同，但不合法的线路被跳过而不是抛出异常。
+        
+        Args:
+            from_ids, to_ids: 起点、终点站点ID序列
+            distances: 距离序列
+            
+        Returns:
+            被拒绝的线路 [(下标, 原因), ...]，按下标排列
+        """
+        if not len(from_ids) == len(to_ids) == len(distances):
+            raise ValueError("All columns must have the same length")
+        # 直接使用 RouteList 内部的字典，省去每条线路的方法调用
+        outgoing_of = {stop_id: routes._routes for stop_id, routes in self.adjacency_list.items()}.get
+        incoming_of = {stop_id: routes._routes for stop_id, routes in self.reverse_adjacency.items()}.get
+        rejected = []
+        added = 0
+        for i, from_id, to_id, distance in zip(count(), from_ids, to_ids, distances):
+            outgoing = outgoing_of(from_id)
+            if outgoing is None:
+                rejected.append((i, "From stop not found in network"))
+                continue
+            incoming = incoming_of(to_id)
+            if incoming is None:
+                rejected.append((i, "To stop not found in network"))
+                continue
+            if distance < 0:
+                rejected.append((i, "Distance must be non-negative"))
+                continue
+            if to_id in outgoing:
+                rejected.append((i, f"Route from {from_id} to {to_id} already exists"))
+                continue
+            outgoing[to_id] = distance
+            incoming[from_id] = distance
+            added += 1
+        if added:
+            self.version += 1
+        return rejected
+    
+    def has_route(self, from_stop, to_stop):
+        """是否存在从from_stop到to_stop的线路"""
+        from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
+        to_id = to_stop.stop_ID if isinstance(to_stop, Stop) else to_stop
+        routes = self.adjacency_list.get(from_id)
+        return routes is not None and routes.has(to_id)
+    
+    def get_route_distance(self, from_stop, to_stop):
+        """返回线路距离，线路不存在时返回None"""
+        from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
+        to_id = to_stop.stop_ID if isinstance(to_stop, Stop) else to_stop
+        routes = self.adjacency_list.get(from_id)
+        return None if routes is None else routes.get(to_id)
+    
+    def update_route(self, from_stop, to_stop, distance):
+        """修改已有线路的距离，线路在邻接表中的位置不变"""
+        from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
+        to_id = to_stop.stop_ID if isinstance(to_stop, Stop) else to_stop
+        if distance < 0:
+            raise ValueError("Distance must be non-negative")
+        if not self.has_route(from_id, to_id):
+            raise ValueError(f"Route from {from_id} to {to_id} not found")
+        self.adjacency_list[from_id].update(to_id, distance)
+        self.reverse_adjacency[to_id].update(from_id, distance)
+        self.version += 1
     
     def remove_stop(self, stop):
         stop_id = stop.stop_ID if isinstance(stop, Stop) else stop
         if stop_id not in self.adjacency_list:
             return  # 站点不存在，无需操作
         # 1. 移除所有指向该站点的边
-        for from_id, _ in list(self.reverse_adjacency[stop_id]):
-            self.adjacency_list[from_id] = [
-                (neighbor_id, dist) for neighbor_id, dist in self.adjacency_list[from_id]
-                if neighbor_id != stop_id
-            ]
+        for from_id in list(self.reverse_adjacency[stop_id].targets()):
+            self.adjacency_list[from_id].discard(stop_id)
         # 2. 移除该站点的所有出边
-        for to_id, _ in list(self.adjacency_list[stop_id]):
-            self.reverse_adjacency[to_id] = [
-                (neighbor_id, dist) for neighbor_id, dist in self.reverse_adjacency[to_id]
-                if neighbor_id != stop_id
-            ]
+        for to_id in list(self.adjacency_list[stop_id].targets()):
+            self.reverse_adjacency[to_id].discard(stop_id)
         # 3. 从数据结构中移除站点
         del self.adjacency_list[stop_id]
         del self.reverse_adjacency[stop_id]
         if stop_id in self.stops:
             del self.stops[stop_id]
+        self.version += 1
     
     def remove_route(self, from_stop, to_stop):
         from_id = from_stop.stop_ID if isinstance(from_stop, Stop) else from_stop
@@ -59,16 +192,25 @@ class TransportNetwork:
         if from_id not in self.adjacency_list:
             raise ValueError("From stop not found in network")
         # 从正向邻接表中移除
-        self.adjacency_list[from_id] = [
-            (neighbor_id, dist) for neighbor_id, dist in self.adjacency_list[from_id]
-            if neighbor_id != to_id
-        ]
+        self.adjacency_list[from_id].discard(to_id)
         # 从反向邻接表中移除
         if to_id in self.reverse_adjacency:
-            self.reverse_adjacency[to_id] = [
-                (neighbor_id, dist) for neighbor_id, dist in self.reverse_adjacency[to_id]
-                if neighbor_id != from_id
-            ]
+            self.reverse_adjacency[to_id].discard(from_id)
+        self.version += 1
+    
+    def to_csr(self):
+        """
+        获取当前网络的CSR只读视图。
+        视图按版本号缓存，网络被修改后下次调用会自动重建。
+        """
+        version = getattr(self, 'version', None)
+        csr = getattr(self, '_csr', None)
+        if version is None:
+            # 未经 __init__ 初始化的子类没有版本号，无法判断是否过期，每次重建
+            return CSRGraph.from_network(self)
+        if csr is None or csr.version != version:
+            csr = self._csr = CSRGraph.from_network(self)
+        return csr
     
     def get_stop_by_id(self, stop_id):
         return self.stops.get(stop_id)
@@ -218,9 +218,9 @@ class GUIBuilder(QMainWindow):
 
     def on_traffic_period_changed(self, period):
         """当交通时段改变时的处理"""
-        # 重新计算路径（如果有选择起点和终点）
+        # 重新计算路径效率（如果有选择起点和终点）：路径本身与时段无关，只按新时段的代价表重新评分
         if self.selected_start and self.selected_end:
-            self.update_path_info()
+            self.update_path_info(rescore_only=True)
         
         # 清除当前悬停状态，确保悬停提示会更新
         self.hovered_station = None
@@ -263,8 +263,8 @@ class GUIBuilder(QMainWindow):
     def handle_station_click(self, pos):
         self.interaction_handler.handle_station_click(pos)
 
-    def update_path_info(self):
-        self.path_display.update_path_info()
+    def update_path_info(self, rescore_only=False):
+        self.path_display.update_path_info(rescore_only=rescore_only)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
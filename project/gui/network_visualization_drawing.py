@@ -68,7 +68,7 @@ class DrawingModule:
                     else:
                         edges_to_draw[edge_key]['shortest'] = True
             
-            # 处理最高效路径的边
+            # 处理行程时间最短路径的边
             if hasattr(mw, 'efficiency_path') and mw.efficiency_path:
                 for i in range(len(mw.efficiency_path)-1):
                     from_id = str(mw.efficiency_path[i])
@@ -104,7 +104,7 @@ class DrawingModule:
                         mw.scene.addItem(line)
                         self.draw_arrow(line.line(), QColor(255, 0, 0))
                     elif edge_info['efficiency']:
-                        # 绘制绿色线（最高效路径）
+                        # 绘制绿色线（行程时间最短路径）
                         line = QGraphicsLineItem(from_station["x"], from_station["y"], to_station["x"], to_station["y"])
                         line.setPen(QPen(QColor(0, 255, 0), 5))  
                         mw.scene.addItem(line)
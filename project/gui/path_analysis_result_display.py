@@ -1,22 +1,40 @@
 from PyQt5.QtCore import Qt
 
 class PathDisplay:
+    # 路径面板最多列出的路径数和枚举时间上限（秒），避免稠密网络上的穷举卡住界面
+    MAX_DISPLAYED_PATHS = 20
+    PATH_SEARCH_TIMEOUT = 0.5
+
     def __init__(self, main_window):
         self.main_window = main_window
         self.data_manager = main_window.data_manager
         self.path_analyzer = main_window.path_analyzer
 
-    def update_path_info(self):
+    def update_path_info(self, rescore_only=False):
+        """
+        :param rescore_only: 为True且已有找到的路径时（如切换交通时段后），不重新枚举路径，
+                             只按当前时段重新计算效率和行程时间最短路径
+        """
         if not self.main_window.selected_start or not self.main_window.selected_end:
             return
-        self.main_window.all_paths = self.path_analyzer.find_all_paths(
-            str(self.main_window.selected_start),
-            str(self.main_window.selected_end),
-            include_efficiency=True
-        )
-        self.main_window.best_path = self.path_analyzer.find_best_path(str(self.main_window.selected_start), str(self.main_window.selected_end))
+        if rescore_only and self.main_window.all_paths:
+            self.main_window.all_paths = self.path_analyzer.score_paths(self.main_window.all_paths)
+        else:
+            self.main_window.all_paths = self.path_analyzer.find_all_paths(
+                str(self.main_window.selected_start),
+                str(self.main_window.selected_end),
+                include_efficiency=True,
+                limit=self.MAX_DISPLAYED_PATHS,
+                timeout=self.PATH_SEARCH_TIMEOUT
+            )
+            # 使用默认搜索方式（有效的收缩层次索引，否则缓存的最短路径树），
+            # 随后的 compare_best_paths 复用同一索引/最短路径树，不再重复搜索
+            self.main_window.best_path = self.path_analyzer.find_best_path(
+                str(self.main_window.selected_start),
+                str(self.main_window.selected_end)
+            )
         
-        # 获取路径比较结果，包含最短路径和最高效路径
+        # 获取路径比较结果，包含距离最短路径和行程时间最短路径
         compare_result = self.path_analyzer.compare_best_paths(
             str(self.main_window.selected_start),
             str(self.main_window.selected_end)
@@ -25,7 +43,7 @@ class PathDisplay:
         # 存储路径信息到主窗口
         if compare_result:
             self.main_window.shortest_path = compare_result['dijkstra_path']  # 最短路径
-            self.main_window.efficiency_path = compare_result['efficiency_path']  # 最高效路径
+            self.main_window.efficiency_path = compare_result['efficiency_path']  # 行程时间最短路径
             self.main_window.shortest_distance = compare_result['dijkstra_distance']
             self.main_window.efficiency_distance = compare_result['efficiency_distance']
             self.main_window.efficiency_value = compare_result['efficiency_value']
@@ -67,14 +85,14 @@ class PathDisplay:
             shortest_path_str = " → ".join(shortest_path_names)
             info_text += f"<b>Shortest Path (Red):</b><br>{shortest_path_str} (distance: {self.main_window.shortest_distance:.2f}km)<br>"
 
-        # 显示最高效路径信息
+        # 显示行程时间最短路径信息
         if self.main_window.efficiency_path:
             efficiency_path_names = []
             for station_id in self.main_window.efficiency_path:
                 station = self.data_manager.stations.get(str(station_id), {})
                 efficiency_path_names.append(station.get("name", str(station_id)))
             efficiency_path_str = " → ".join(efficiency_path_names)
-            info_text += f"<b>Most Efficient Path (Green):</b><br>{efficiency_path_str} (distance: {self.main_window.efficiency_distance:.2f}km, efficiency: {self.main_window.efficiency_value:.2f}km/h)<br>"
+            info_text += f"<b>Fastest Path (Green):</b><br>{efficiency_path_str} (distance: {self.main_window.efficiency_distance:.2f}km, efficiency: {self.main_window.efficiency_value:.2f}km/h)<br>"
         
         self.main_window.path_info.setText(info_text)
         self.main_window.path_info.setTextFormat(Qt.RichText)
@@ -3,8 +3,12 @@ from PyQt5.QtWidgets import (QGraphicsEllipseItem, QInputDialog, QDialog, QVBoxL
                           QLabel, QComboBox, QDialogButtonBox, QLineEdit, QMessageBox)
 from project.algorithms.distance_calculation import calculate_distance_between_stops_by_id
 from project.algorithms.traffic_condition_manager import TrafficConditionManager
+from project.data_structures.spatial_index import GridIndex
 import math
 
+# 站点图形的最大半径（Mixed站点直径25）加上描边宽度，用于空间索引拾取
+STATION_PICK_RADIUS = 25 / 2 + 1
+
 class InteractionHandler:
     def __init__(self, main_window):
         self.main_window = main_window  
@@ -40,38 +44,70 @@ class InteractionHandler:
                 return tooltip_info
 
         # 查找鼠标下方的站点
-        items = self.main_window.scene.items(pos)
-        for item in items:
-            if isinstance(item, QGraphicsEllipseItem):
-                station_id = item.data(0)
-                if station_id and station_id in self.data_manager.stations:
-                    # 扩大检测区域
-                    station = self.data_manager.stations[station_id]
-                    size = 20 if station["type"] != "Mixed" else 25
-                    item_rect = QRectF(
-                        station["x"] - size/2 - self.hover_area_padding,
-                        station["y"] - size/2 - self.hover_area_padding,
-                        size + 2 * self.hover_area_padding,
-                        size + 2 * self.hover_area_padding
-                    )
-                    
-                    # 如果鼠标在扩大的检测区域内
-                    if item_rect.contains(pos):
-                        self.main_window.hovered_station = station_id
-                        tooltip_info = self._get_station_tooltip(station_id)
-                        return tooltip_info
+        for station_id in self._stations_at(pos):
+            if station_id and station_id in self.data_manager.stations:
+                # 扩大检测区域
+                station = self.data_manager.stations[station_id]
+                size = 20 if station["type"] != "Mixed" else 25
+                item_rect = QRectF(
+                    station["x"] - size/2 - self.hover_area_padding,
+                    station["y"] - size/2 - self.hover_area_padding,
+                    size + 2 * self.hover_area_padding,
+                    size + 2 * self.hover_area_padding
+                )
+                
+                # 如果鼠标在扩大的检测区域内
+                if item_rect.contains(pos):
+                    self.main_window.hovered_station = station_id
+                    tooltip_info = self._get_station_tooltip(station_id)
+                    return tooltip_info
         if self.main_window.hovered_station:
             self.main_window.hovered_station = None
             
         return None
         
+    def _stations_at(self, pos: QPointF):
+        """
+        返回位于pos处的站点ID（可能为空）。
+        优先使用数据管理器维护的GUI空间索引，由近到远产出；没有索引时回退为扫描场景中的图形项。
+        """
+        index = getattr(self.data_manager, 'gui_index', None)
+        if isinstance(index, GridIndex):
+            stations = self.data_manager.stations
+            for station_id, distance in index.within_radius(pos.x(), pos.y(), STATION_PICK_RADIUS):
+                station = stations.get(station_id)
+                if station is None:
+                    continue
+                size = 20 if station["type"] != "Mixed" else 25
+                # 与图形项的命中范围一致：圆形本身加上描边宽度
+                if distance <= size / 2 + 1:
+                    yield station_id
+            return
+        for item in self.main_window.scene.items(pos):
+            if isinstance(item, QGraphicsEllipseItem):
+                yield item.data(0)
+
+    def _has_station_near(self, x, y, threshold):
+        """GUI坐标(x, y)附近threshold像素内是否已有站点；有空间索引时只检查附近的网格单元"""
+        index = getattr(self.data_manager, 'gui_index', None)
+        if isinstance(index, GridIndex):
+            return index.any_within(x, y, threshold)
+        for station_data in self.data_manager.stations.values():
+            distance = math.sqrt((x - station_data["x"])**2 + (y - station_data["y"])**2)
+            if distance < threshold:
+                return True
+        return False
+
     def _get_station_tooltip(self, station_id):
         """获取站点的工具提示信息"""
+        # stations/distances 只取一次，避免在循环中反复访问属性
+        stations = self.data_manager.stations
+        distances = self.data_manager.distances
         # 确保station_id存在于stations字典中
-        if station_id not in self.data_manager.stations:
+        if station_id not in stations:
             return None
             
-        station = self.data_manager.stations[station_id]
+        station = stations[station_id]
         
         # 获取站点的地理坐标（经纬度）
         stop_obj = self.data_manager.get_stop_by_id(station_id)
@@ -83,22 +119,22 @@ class InteractionHandler:
         # 收集连接信息(仅用于工具提示，不再更新左上角面板)
         conn_info = []
         for conn_id in station["connections"]:
-            conn_station = self.data_manager.stations[conn_id]
-            distance = self.data_manager.distances.get((station_id, conn_id), 0)
+            conn_station = stations[conn_id]
+            distance = distances.get((station_id, conn_id), 0)
             conn_info.append(f"{conn_station['name']}: {distance:.2f}km")
         
         # 收集出站连接信息(Out)
         outgoing_connections = []
         for conn_id in station["connections"]:
-            conn_station = self.data_manager.stations[conn_id]
-            distance = self.data_manager.distances.get((station_id, conn_id), 0)
+            conn_station = stations[conn_id]
+            distance = distances.get((station_id, conn_id), 0)
             outgoing_connections.append(f"{conn_station['name']} ({distance:.1f}km)")
             
-        # 收集入站连接信息(In)
+        # 收集入站连接信息(In)：直接读取反向邻接表，无需遍历所有站点
         incoming_connections = []
-        for other_id, other_station in self.data_manager.stations.items():
-            if station_id in other_station["connections"]:
-                distance = self.data_manager.distances.get((other_id, station_id), 0)
+        for other_id, distance in self.data_manager.get_incoming_connections(station_id):
+            other_station = stations.get(other_id)
+            if other_station is not None:
                 incoming_connections.append(f"{other_station['name']} ({distance:.1f}km)")
         
         # 格式化连接信息
@@ -155,26 +191,23 @@ class InteractionHandler:
             return
             
         # 原有的站点选择逻辑
-        items = self.main_window.scene.items(pos)
-        for item in items:
-            if isinstance(item, QGraphicsEllipseItem):
-                station_id = item.data(0)
-                if station_id:
-                    station_name = self.data_manager.stations[station_id]['name']
-                    if self.main_window.selected_start is None:
-                        self.main_window.selected_start = station_id
-                        self.main_window.info_label.setText(f"Start point selected: {station_name}\nPlease click to select end point")
-                    elif self.main_window.selected_end is None and station_id != self.main_window.selected_start:
-                        self.main_window.selected_end = station_id
-                        self.main_window.update_path_info()
-                    else:
-                        self.main_window.selected_start = station_id
-                        self.main_window.selected_end = None
-                        self.main_window.info_label.setText(f"Start point selected: {station_name}\nPlease click to select end point")
-                        self.main_window.path_info.setText("")
-                    self.main_window.draw_network()
-                    break
-                    
+        for station_id in self._stations_at(pos):
+            if station_id:
+                station_name = self.data_manager.stations[station_id]['name']
+                if self.main_window.selected_start is None:
+                    self.main_window.selected_start = station_id
+                    self.main_window.info_label.setText(f"Start point selected: {station_name}\nPlease click to select end point")
+                elif self.main_window.selected_end is None and station_id != self.main_window.selected_start:
+                    self.main_window.selected_end = station_id
+                    self.main_window.update_path_info()
+                else:
+                    self.main_window.selected_start = station_id
+                    self.main_window.selected_end = None
+                    self.main_window.info_label.setText(f"Start point selected: {station_name}\nPlease click to select end point")
+                    self.main_window.path_info.setText("")
+                self.main_window.draw_network()
+                break
+                
     def add_station_at_position(self, pos: QPointF):
         """在指定位置添加新站点"""
         # 将场景坐标转换为GUI坐标
@@ -182,24 +215,20 @@ class InteractionHandler:
         
         
         proximity_threshold = 30 
-        for station_data in self.data_manager.stations.values():
-            station_x = station_data["x"]
-            station_y = station_data["y"]
-            distance = math.sqrt((x - station_x)**2 + (y - station_y)**2)
-            if distance < proximity_threshold:
-                msg = QMessageBox()
-                msg.setIcon(QMessageBox.Warning)
-                msg.setWindowTitle("Warning")
-                msg.setText("There is already a stop here")
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec_()
-                
-                # 退出添加模式
-                self.add_station_mode = False
-                
-                # 恢复正常鼠标
-                self.main_window.view.setCursor(Qt.ArrowCursor)
-                return
+        if self._has_station_near(x, y, proximity_threshold):
+            msg = QMessageBox()
+            msg.setIcon(QMessageBox.Warning)
+            msg.setWindowTitle("Warning")
+            msg.setText("There is already a stop here")
+            msg.setStandardButtons(QMessageBox.Ok)
+            msg.exec_()
+            
+            # 退出添加模式
+            self.add_station_mode = False
+            
+            # 恢复正常鼠标
+            self.main_window.view.setCursor(Qt.ArrowCursor)
+            return
         
         # 打开名称输入对话框
         dialog = QDialog(self.main_window)
@@ -257,24 +286,21 @@ class InteractionHandler:
         
     def remove_station_at_position(self, pos: QPointF):
         """删除指定位置的站点"""
-        items = self.main_window.scene.items(pos)
-        for item in items:
-            if isinstance(item, QGraphicsEllipseItem):
-                station_id = item.data(0)
-                if station_id:
-                    station_name = self.data_manager.stations[station_id]['name']
-                    self.data_manager.remove_station(station_name)
-                    
-                    # 退出删除模式
-                    self.remove_station_mode = False
-                    
-                    # 如果删除的是当前选中的站点，清除选择
-                    if station_id == self.main_window.selected_start or station_id == self.main_window.selected_end:
-                        self.main_window.clear_selection()
-                    else:
-                        # 刷新视图
-                        self.main_window.draw_network()
-                    return
-                    
+        for station_id in self._stations_at(pos):
+            if station_id:
+                station_name = self.data_manager.stations[station_id]['name']
+                self.data_manager.remove_station(station_name)
+                
+                # 退出删除模式
+                self.remove_station_mode = False
+                
+                # 如果删除的是当前选中的站点，清除选择
+                if station_id == self.main_window.selected_start or station_id == self.main_window.selected_end:
+                    self.main_window.clear_selection()
+                else:
+                    # 刷新视图
+                    self.main_window.draw_network()
+                return
+                
         # 退出删除模式（如果没有找到站点）
         self.remove_station_mode = False
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from project.algorithms.all_pairs_shortest_paths import all_pairs_shortest_paths, _choose_method
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.data_structures.transport_network_structure import TransportNetwork
+from tests.network_factory import build_random_network as random_network
+
+def build_random_network(seed, num_stops=30, num_routes=90):
+    return random_network(seed, num_stops, num_routes)
+
+class TestAllPairsShortestPaths(unittest.TestCase):
+    def assert_matches_dijkstra(self, result, network):
+        for s in network.stops:
+            for t in network.stops:
+                path, expected = dijkstra(network, s, t)
+                self.assertAlmostEqual(result.distance(s, t), expected, places=4)
+                ids = result.path_ids(s, t)
+                if path is None:
+                    self.assertIsNone(ids)
+                    continue
+                self.assertEqual((ids[0], ids[-1]), (s, t))
+                length = sum(network.get_route_distance(a, b) for a, b in zip(ids, ids[1:]))
+                self.assertAlmostEqual(length, expected, places=4)
+
+    def test_methods_match_dijkstra(self):
+        for seed in range(3):
+            network = build_random_network(seed)
+            for method in ('floyd_warshall', 'dijkstra'):
+                result = all_pairs_shortest_paths(network, method)
+                self.assertEqual(result.method, method)
+                self.assertEqual(result.distances.dtype, np.float32)
+                self.assertEqual(result.predecessors.dtype, np.int16)
+                self.assert_matches_dijkstra(result, network)
+
+    def test_result_interface(self):
+        network = build_random_network(0, num_stops=5, num_routes=0)
+        network.add_route('0', '1', 2.0)
+        network.add_route('1', '2', 3.0)
+        result = all_pairs_shortest_paths(network)
+        path, distance = result.path('0', '2')
+        self.assertEqual(([s.stop_ID for s in path], distance), (['0', '1', '2'], 5.0))
+        self.assertEqual(result.path('2', '0'), (None, float('inf')))
+        self.assertEqual(result.path_ids('3', '3'), ['3'])
+        self.assertEqual(result.distance('0', 'missing'), float('inf'))
+        self.assertIsNone(result.path_ids('missing', '0'))
+        with self.assertRaises(ValueError):
+            all_pairs_shortest_paths(network, 'johnson')
+        empty = all_pairs_shortest_paths(TransportNetwork())
+        self.assertEqual(empty.distances.shape, (0, 0))
+
+    def test_auto_method(self):
+        self.assertEqual(_choose_method(50, 100), 'floyd_warshall')
+        self.assertEqual(_choose_method(5000, 20000), 'dijkstra')
+        # 线路越稠密，Floyd–Warshall 越划算
+        self.assertEqual(_choose_method(5000, 5000 * 2000), 'floyd_warshall')
+
+    def test_spill_to_disk(self):
+        network = build_random_network(1)
+        expected = all_pairs_shortest_paths(network, 'dijkstra')
+        with tempfile.TemporaryDirectory() as directory:
+            for method in ('floyd_warshall', 'dijkstra'):
+                spilled = all_pairs_shortest_paths(network, method, spill_dir=directory)
+                self.assertIsInstance(spilled.distances, np.memmap)
+                reopened = np.load(os.path.join(directory, 'distances.npy'), mmap_mode='r')
+                np.testing.assert_allclose(reopened, expected.distances, rtol=1e-5)
+                self.assertEqual(spilled.path_ids('0', '7'), expected.path_ids('0', '7'))
+                del spilled, reopened
+
+if __name__ == '__main__':
+    unittest.main()
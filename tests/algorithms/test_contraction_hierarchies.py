@@ -0,0 +1,90 @@
+import os
+import random
+import tempfile
+import unittest
+from project.algorithms.contraction_hierarchies import ContractionHierarchy, network_signature
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+from tests.network_factory import build_random_network as random_network
+
+def build_random_network(seed, num_stops=40, num_routes=120):
+    return random_network(seed, num_stops, num_routes, int_ids=True)
+
+class TestContractionHierarchy(unittest.TestCase):
+    def assert_matches_dijkstra(self, hierarchy, network, pairs):
+        for s, t in pairs:
+            _, expected = dijkstra(network, s, t)
+            path, dist = hierarchy.query(s, t)
+            self.assertEqual(dist, expected)
+            if path is None:
+                self.assertEqual(expected, float('inf'))
+                continue
+            self.assertEqual((path[0], path[-1]), (s, t))
+            total = sum(dict(network.adjacency_list[a])[b] for a, b in zip(path, path[1:]))
+            self.assertEqual(total, expected)
+
+    def test_queries_match_dijkstra(self):
+        for seed in range(5):
+            network = build_random_network(seed)
+            hierarchy = ContractionHierarchy.build(network)
+            rng = random.Random(seed)
+            pairs = [(rng.randrange(40), rng.randrange(40)) for _ in range(60)]
+            self.assert_matches_dijkstra(hierarchy, network, pairs)
+
+    def test_small_witness_limit_stays_exact(self):
+        # 见证搜索提前停止只会多加捷径，查询结果仍与Dijkstra一致
+        network = build_random_network(6, num_stops=60, num_routes=240)
+        hierarchy = ContractionHierarchy.build(network, witness_settle_limit=1)
+        rng = random.Random(6)
+        pairs = [(rng.randrange(60), rng.randrange(60)) for _ in range(80)]
+        self.assert_matches_dijkstra(hierarchy, network, pairs)
+
+    def test_larger_network_with_stalling(self):
+        # 站点较多、层次较深时stall-on-demand剪枝频繁发生，结果仍与Dijkstra一致
+        network = build_random_network(8, num_stops=300, num_routes=1200)
+        hierarchy = ContractionHierarchy.build(network)
+        rng = random.Random(8)
+        pairs = [(rng.randrange(300), rng.randrange(300)) for _ in range(150)]
+        self.assert_matches_dijkstra(hierarchy, network, pairs)
+
+    def test_invalid_stops(self):
+        network = build_random_network(1, num_stops=5, num_routes=5)
+        hierarchy = ContractionHierarchy.build(network)
+        self.assertEqual(hierarchy.query(0, 99), (None, float('inf')))
+        self.assertEqual(hierarchy.query(2, 2), ([2], 0))
+
+    def test_version_validity(self):
+        network = build_random_network(2)
+        hierarchy = ContractionHierarchy.build(network)
+        self.assertTrue(hierarchy.is_valid_for(network))
+        # 版本号相同的另一个网络对象（如重新加载的快照）不能复用索引
+        other = build_random_network(7)
+        other.version = network.version
+        self.assertFalse(hierarchy.is_valid_for(other))
+        network.remove_route(*next((a, n[0][0]) for a, n in network.adjacency_list.items() if n))
+        self.assertFalse(hierarchy.is_valid_for(network))
+
+    def test_save_and_load(self):
+        network = build_random_network(3)
+        hierarchy = ContractionHierarchy.build(network)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'ch.json')
+            hierarchy.save(file_path)
+            loaded = ContractionHierarchy.load(file_path)
+        self.assertFalse(loaded.is_valid_for(network))
+        self.assertTrue(loaded.bind(network))
+        self.assertTrue(loaded.is_valid_for(network))
+        self.assert_matches_dijkstra(loaded, network, [(0, 39), (5, 17), (20, 3)])
+        other = build_random_network(4)
+        self.assertFalse(loaded.bind(other))
+
+    def test_signature_depends_on_routes(self):
+        network = build_random_network(5)
+        signature = network_signature(network)
+        self.assertEqual(signature, network_signature(network.to_csr()))
+        network.add_stop(Stop(100, '100', 0, 0, ZoneType.MIXED))
+        self.assertNotEqual(signature, network_signature(network))
+
+if __name__ == '__main__':
+    unittest.main()
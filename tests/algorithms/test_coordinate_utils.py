@@ -378,5 +378,43 @@ class TestCoordinateUtils(unittest.TestCase):
         self.assertTrue(callable(CoordinateUtils.convert_gui_to_geo_coords))
         self.assertTrue(callable(CoordinateUtils.convert_geo_to_gui_coords))
 
+class TestVectorizedHaversine(unittest.TestCase):
+    """向量化Haversine的測試"""
+
+    def setUp(self):
+        import random
+        random.seed(11)
+        self.points = [(random.uniform(48.84, 48.89), random.uniform(2.23, 2.40)) for _ in range(60)]
+
+    def test_haversine_many_matches_scalar(self):
+        import numpy as np
+        lats = np.array([p[0] for p in self.points])
+        lons = np.array([p[1] for p in self.points])
+        result = CoordinateUtils.haversine_many(48.8566, 2.3522, lats, lons)
+        self.assertEqual(result.shape, (60,))
+        for (lat, lon), distance in zip(self.points, result):
+            self.assertAlmostEqual(distance, CoordinateUtils.calculate_haversine_distance(48.8566, 2.3522, lat, lon), places=9)
+        # 對蹠點不會因浮點誤差產生NaN
+        self.assertAlmostEqual(float(CoordinateUtils.haversine_many(0, 0, 0, 180)), math.pi * 6371.0, places=6)
+
+    def test_pairwise_haversine_chunked(self):
+        expected = [(i, j) for i in range(60) for j in range(i + 1, 60)
+                    if CoordinateUtils.calculate_haversine_distance(*self.points[i], *self.points[j]) <= 3.0]
+        for chunk_size in (1, 7, None):
+            rows, cols, distances = CoordinateUtils.pairwise_haversine(self.points, max_distance=3.0, chunk_size=chunk_size)
+            self.assertEqual(list(zip(rows.tolist(), cols.tolist())), expected)
+            self.assertTrue((distances <= 3.0).all())
+        rows, _, _ = CoordinateUtils.pairwise_haversine(self.points)
+        self.assertEqual(len(rows), 60 * 59 // 2)
+
+    def test_stop_coordinate_arrays_formats(self):
+        from project.data_structures.stop_entity import Stop, ZoneType
+        stops = [Stop(1, 'A', 1.0, 2.0, ZoneType.MIXED), {'lat': 3.0, 'lon': 4.0}, (5.0, 6.0)]
+        lats, lons = CoordinateUtils.stop_coordinate_arrays(stops)
+        self.assertEqual(lats.tolist(), [1.0, 3.0, 5.0])
+        self.assertEqual(lons.tolist(), [2.0, 4.0, 6.0])
+
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
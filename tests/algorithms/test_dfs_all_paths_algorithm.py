@@ -1,6 +1,7 @@
 import unittest
 from project.algorithms import dfs_all_paths_algorithm
 from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
 
 class DummyTransportNetwork(TransportNetwork):
     def __init__(self, adjacency_list, stops):
@@ -41,6 +42,10 @@ class TestDFSAllPathsAlgorithm(unittest.TestCase):
         self.assertEqual([s.stop_ID for s in paths[0][0]], ['A'])
         self.assertEqual(paths[0][1], 0)
 
+    def test_unknown_stop_yields_nothing(self):
+        self.assertEqual(list(dfs_all_paths_algorithm.iter_all_paths(self.network, 'X', 'X')), [])
+        self.assertEqual(dfs_all_paths_algorithm.find_all_paths(self.network, 'X', 'X'), [])
+
     def test_multiple_paths(self):
         # A --1--> B --1--> C
         #  \------2------/
@@ -62,5 +67,143 @@ class TestDFSAllPathsAlgorithm(unittest.TestCase):
         paths = dfs_all_paths_algorithm.find_all_paths(self.network, 'X', 'C')
         self.assertEqual(paths, [])
 
+class TestDFSOnCSRGraph(unittest.TestCase):
+    def test_matches_dict_network(self):
+        network = TransportNetwork()
+        for stop_id in ('A', 'B', 'C'):
+            network.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        network.add_route('A', 'B', 1)
+        network.add_route('B', 'C', 1)
+        network.add_route('A', 'C', 2)
+        network.add_route('C', 'A', 1)
+        expected = dfs_all_paths_algorithm.find_all_paths(network, 'A', 'C')
+        paths = dfs_all_paths_algorithm.find_all_paths(network.to_csr(), 'A', 'C')
+        self.assertEqual([([s.stop_ID for s in p], d) for p, d in paths],
+                         [([s.stop_ID for s in p], d) for p, d in expected])
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(dfs_all_paths_algorithm.find_all_paths(network.to_csr(), 'X', 'C'), [])
+
+
+class TestIterAllPaths(unittest.TestCase):
+    def setUp(self):
+        # 完全图：路径数量随站点数阶乘增长
+        self.network = TransportNetwork()
+        for i in range(9):
+            self.network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+        for a in range(9):
+            for b in range(9):
+                if a != b:
+                    self.network.add_route(a, b, 1)
+
+    def test_yields_id_paths_lazily(self):
+        paths = dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, max_distance=None)
+        first = next(paths)
+        self.assertEqual(first[0][0], 0)
+        self.assertEqual(first[0][-1], 8)
+        self.assertIsInstance(first[0][0], int)
+        self.assertEqual(first[1], len(first[0]) - 1)
+
+    def test_same_order_as_find_all_paths(self):
+        expected = [([s.stop_ID for s in p], d) for p, d in dfs_all_paths_algorithm.find_all_paths(self.network, 0, 8, max_distance=3)]
+        for graph in (self.network, self.network.to_csr()):
+            self.assertEqual(list(dfs_all_paths_algorithm.iter_all_paths(graph, 0, 8, max_distance=3)), expected)
+
+    def test_limit(self):
+        paths = list(dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, max_distance=None, limit=5))
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(list(dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, limit=0)), [])
+
+    def test_timeout(self):
+        paths = list(dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, max_distance=None, timeout=0))
+        self.assertLess(len(paths), 1000)
+
+    def test_timeout_checked_before_each_yield(self):
+        import itertools
+        from unittest.mock import patch
+        # 时钟每次读取前进1秒：截止时间为2.5，前两条路径之后即超时，即使出边计数还没到检查间隔
+        with patch('project.algorithms.dfs_all_paths_algorithm.time.monotonic', side_effect=itertools.count()):
+            paths = list(dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, max_distance=2, timeout=2.5))
+        self.assertEqual(len(paths), 2)
+
+    def test_cancel_token(self):
+        import threading
+        token = threading.Event()
+        count = 0
+        for _ in dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 8, max_distance=None, cancel_token=token):
+            count += 1
+            token.set()
+        self.assertLess(count, 1000)
+
+
+class TestDistanceBoundPruning(unittest.TestCase):
+    def setUp(self):
+        # 0 -> 1 -> 2 -> 3 为主线；0 -> 4 -> 5 是到不了终点的死胡同；权重含不可精确表示的小数
+        self.network = TransportNetwork()
+        for i in range(6):
+            self.network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+        for a, b, d in [(0, 1, 0.1), (1, 2, 0.2), (2, 3, 0.3), (0, 2, 0.3), (1, 3, 0.7),
+                        (0, 4, 0.1), (4, 5, 0.1), (5, 4, 0.1), (2, 0, 0.1)]:
+            self.network.add_route(a, b, d)
+
+    def brute_force(self, start, end, max_distance):
+        results = []
+        def visit(path, distance):
+            for neighbor, weight in self.network.adjacency_list[path[-1]]:
+                new_distance = distance + weight
+                if new_distance > max_distance or neighbor in path:
+                    continue
+                if neighbor == end:
+                    results.append((path + [neighbor], new_distance))
+                else:
+                    visit(path + [neighbor], new_distance)
+        visit([start], 0)
+        return results
+
+    def test_matches_unpruned_search(self):
+        for max_distance in (0.3, 0.6, 0.6000000000000001, 0.8, 10):
+            expected = self.brute_force(0, 3, max_distance)
+            actual = list(dfs_all_paths_algorithm.iter_all_paths(self.network, 0, 3, max_distance=max_distance))
+            self.assertEqual(actual, expected, max_distance)
+
+    def test_distances_to_target(self):
+        graph = self.network.to_csr()
+        remaining = dfs_all_paths_algorithm._distances_to_target(graph, graph.index_of(3), float('inf'))
+        self.assertAlmostEqual(remaining[graph.index_of(0)], 0.6)
+        self.assertEqual(remaining[graph.index_of(4)], float('inf'))
+        bounded = dfs_all_paths_algorithm._distances_to_target(graph, graph.index_of(3), 0.4)
+        self.assertEqual(bounded[graph.index_of(0)], float('inf'))
+
+    def test_unreachable_start_yields_nothing(self):
+        self.assertEqual(list(dfs_all_paths_algorithm.iter_all_paths(self.network, 4, 3, max_distance=None)), [])
+
+
+
+    def test_unlimited_distance_prunes_dead_ends(self):
+        # 起点挂着一个到不了终点的10站完全图：不限距离时也不能进入其中枚举
+        network = TransportNetwork()
+        for i in range(12):
+            network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+        network.add_route(0, 1, 1.0)
+        clique = range(2, 12)
+        for a in clique:
+            for b in clique:
+                if a != b:
+                    network.add_route(a, b, 1.0)
+        network.add_route(0, 2, 1.0)
+
+        class CountingToken:
+            checks = 0
+            def is_set(self):
+                self.checks += 1
+                return False
+
+        token = CountingToken()
+        paths = list(dfs_all_paths_algorithm.iter_all_paths(network, 0, 1, max_distance=None, cancel_token=token))
+        self.assertEqual(paths, [([0, 1], 1.0)])
+        # 取消标志只在产出路径前和每尝试 _CHECK_INTERVAL 条出边时检查；剪枝后只尝试了起点的两条出边，
+        # 只有产出唯一一条路径前的那一次检查
+        self.assertEqual(token.checks, 1)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
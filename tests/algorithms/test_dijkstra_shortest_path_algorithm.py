@@ -1,6 +1,7 @@
 import unittest
 from project.algorithms import dijkstra_shortest_path_algorithm
 from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
 
 class DummyTransportNetwork(TransportNetwork):
     def __init__(self, adjacency_list, stops):
@@ -76,5 +77,166 @@ class TestDijkstraShortestPathAlgorithm(unittest.TestCase):
         self.assertIn([s.stop_ID for s in path], [['A', 'B', 'C'], ['A', 'C']])
         self.assertEqual(dist, 2)
 
+class TestDijkstraOnCSRGraph(unittest.TestCase):
+    def setUp(self):
+        network = TransportNetwork()
+        for stop_id in ('A', 'B', 'C', 'D'):
+            network.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        network.add_route('A', 'B', 1)
+        network.add_route('B', 'C', 1)
+        network.add_route('A', 'C', 5)
+        self.network = network
+        self.graph = network.to_csr()
+
+    def test_matches_dict_network(self):
+        path, dist = dijkstra_shortest_path_algorithm.dijkstra(self.graph, 'A', 'C')
+        expected_path, expected_dist = dijkstra_shortest_path_algorithm.dijkstra(self.network, 'A', 'C')
+        self.assertEqual([s.stop_ID for s in path], [s.stop_ID for s in expected_path])
+        self.assertEqual(dist, expected_dist)
+        self.assertEqual(dist, 2)
+
+    def test_unreachable_and_invalid(self):
+        self.assertEqual(dijkstra_shortest_path_algorithm.dijkstra(self.graph, 'A', 'D'), (None, float('inf')))
+        self.assertEqual(dijkstra_shortest_path_algorithm.dijkstra(self.graph, 'X', 'A'), (None, float('inf')))
+
+
+class TestShortestPathTreeAndMatrix(unittest.TestCase):
+    def setUp(self):
+        # A --1--> B --1--> C,  A --5--> C,  D 孤立
+        network = TransportNetwork()
+        for stop_id in ('A', 'B', 'C', 'D'):
+            network.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        network.add_route('A', 'B', 1)
+        network.add_route('B', 'C', 1)
+        network.add_route('A', 'C', 5)
+        self.network = network
+
+    def test_tree_answers_all_destinations(self):
+        for graph in (self.network, self.network.to_csr()):
+            tree = dijkstra_shortest_path_algorithm.shortest_path_tree(graph, 'A')
+            self.assertEqual(tree.distance_to('C'), 2)
+            self.assertEqual(tree.path_ids_to('C'), ['A', 'B', 'C'])
+            path, dist = tree.path_to('B')
+            self.assertEqual([s.stop_ID for s in path], ['A', 'B'])
+            self.assertEqual(dist, 1)
+            self.assertEqual(tree.distance_to('D'), float('inf'))
+            self.assertEqual(tree.path_to('D'), (None, float('inf')))
+            self.assertEqual(sorted(tree.reachable_stop_ids()), ['A', 'B', 'C'])
+
+    def test_tree_invalid_source(self):
+        self.assertIsNone(dijkstra_shortest_path_algorithm.shortest_path_tree(self.network, 'X'))
+        self.assertIsNone(dijkstra_shortest_path_algorithm.shortest_path_tree(self.network.to_csr(), 'X'))
+
+    def test_tree_with_targets_stops_early(self):
+        for graph in (self.network, self.network.to_csr()):
+            tree = dijkstra_shortest_path_algorithm.shortest_path_tree(graph, 'A', targets=['B'])
+            self.assertEqual(tree.radius, 1)
+            self.assertEqual(tree.path_ids_to('B'), ['A', 'B'])
+            self.assertTrue(tree.covers('A'))
+            self.assertFalse(tree.covers('C'))
+            # 终点不可达时搜索完全部可达站点，结果是完整的
+            self.assertIsNone(dijkstra_shortest_path_algorithm.shortest_path_tree(graph, 'A', targets=['D']).radius)
+            self.assertIsNone(dijkstra_shortest_path_algorithm.shortest_path_tree(graph, 'A').radius)
+
+    def test_distance_matrix(self):
+        for graph in (self.network, self.network.to_csr()):
+            matrix = dijkstra_shortest_path_algorithm.distance_matrix(graph, ['A', 'B', 'X'], ['C', 'D', 'A'])
+            self.assertEqual(matrix.shape, (3, 3))
+            self.assertEqual(matrix[0].tolist(), [2, float('inf'), 0])
+            self.assertEqual(matrix[1].tolist(), [1, float('inf'), float('inf')])
+            self.assertTrue(all(v == float('inf') for v in matrix[2]))
+
+
+class TestBidirectionalDijkstra(unittest.TestCase):
+    def test_matches_dijkstra_on_random_networks(self):
+        import random
+        rng = random.Random(7)
+        for _ in range(20):
+            network = TransportNetwork()
+            for i in range(30):
+                network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+            for _ in range(80):
+                a, b = rng.randrange(30), rng.randrange(30)
+                if a != b and all(n != b for n, _ in network.adjacency_list[a]):
+                    network.add_route(a, b, rng.randint(1, 10))
+            for graph in (network, network.to_csr()):
+                for s, t in ((0, 29), (3, 17), (5, 5), (12, 1)):
+                    _, expected = dijkstra_shortest_path_algorithm.dijkstra(network, s, t)
+                    path, dist = dijkstra_shortest_path_algorithm.bidirectional_dijkstra(graph, s, t)
+                    self.assertEqual(dist, expected)
+                    if path is not None:
+                        ids = [stop.stop_ID for stop in path]
+                        self.assertEqual((ids[0], ids[-1]), (s, t))
+                        total = sum(dict(network.adjacency_list[a])[b] for a, b in zip(ids, ids[1:]))
+                        self.assertEqual(total, expected)
+
+    def test_invalid_stops(self):
+        network = TransportNetwork()
+        network.add_stop(Stop('A', 'A', 0, 0, ZoneType.MIXED))
+        self.assertEqual(dijkstra_shortest_path_algorithm.bidirectional_dijkstra(network, 'A', 'X'), (None, float('inf')))
+        self.assertEqual(dijkstra_shortest_path_algorithm.bidirectional_dijkstra(network.to_csr(), 'X', 'A'), (None, float('inf')))
+
+    def test_falls_back_without_reverse_adjacency(self):
+        network = DummyTransportNetwork(
+            adjacency_list={'A': [('B', 1)], 'B': []},
+            stops={'A': type('Stop', (), {'stop_ID': 'A'})(), 'B': type('Stop', (), {'stop_ID': 'B'})()}
+        )
+        path, dist = dijkstra_shortest_path_algorithm.bidirectional_dijkstra(network, 'A', 'B')
+        self.assertEqual([s.stop_ID for s in path], ['A', 'B'])
+        self.assertEqual(dist, 1)
+
+
+class TestAStar(unittest.TestCase):
+    def setUp(self):
+        # 站点沿经线排列，线路距离不小于大圆距离
+        self.network = TransportNetwork()
+        coords = {'A': (48.80, 2.30), 'B': (48.81, 2.30), 'C': (48.82, 2.30), 'D': (48.81, 2.35)}
+        for stop_id, (lat, lon) in coords.items():
+            self.network.add_stop(Stop(stop_id, stop_id, lat, lon, ZoneType.MIXED))
+        self.network.add_route('A', 'B', 1.2)
+        self.network.add_route('B', 'C', 1.2)
+        self.network.add_route('A', 'D', 4.0)
+        self.network.add_route('D', 'C', 4.0)
+
+    def test_scale_is_one_for_consistent_network(self):
+        self.assertEqual(dijkstra_shortest_path_algorithm.haversine_heuristic_scale(self.network), 1.0)
+
+    def test_scale_shrinks_when_route_shorter_than_geodesic(self):
+        self.network.add_route('C', 'A', 1.0)  # 大圆距离约2.2km
+        scale = dijkstra_shortest_path_algorithm.haversine_heuristic_scale(self.network)
+        self.assertLess(scale, 0.5)
+        self.assertGreater(scale, 0)
+
+    def test_scale_none_without_coordinates_or_zero_route(self):
+        self.network.add_route('C', 'D', 0)
+        self.assertIsNone(dijkstra_shortest_path_algorithm.haversine_heuristic_scale(self.network))
+        dummy = DummyTransportNetwork({'A': [('B', 1)], 'B': []}, {})
+        self.assertIsNone(dijkstra_shortest_path_algorithm.haversine_heuristic_scale(dummy))
+
+    def test_astar_matches_dijkstra(self):
+        for graph in (self.network, self.network.to_csr()):
+            path, dist = dijkstra_shortest_path_algorithm.astar(graph, 'A', 'C')
+            self.assertEqual([s.stop_ID for s in path], ['A', 'B', 'C'])
+            self.assertAlmostEqual(dist, 2.4)
+            self.assertEqual(dijkstra_shortest_path_algorithm.astar(graph, 'C', 'A'), (None, float('inf')))
+            self.assertEqual(dijkstra_shortest_path_algorithm.astar(graph, 'A', 'X'), (None, float('inf')))
+
+    def test_astar_with_scaled_heuristic(self):
+        self.network.add_route('C', 'A', 1.0)
+        self.network.add_route('B', 'A', 5.0)
+        path, dist = dijkstra_shortest_path_algorithm.astar(self.network, 'B', 'A')
+        self.assertEqual([s.stop_ID for s in path], ['B', 'C', 'A'])
+        self.assertAlmostEqual(dist, 2.2)
+
+    def test_astar_falls_back_without_coordinates(self):
+        dummy = DummyTransportNetwork(
+            {'A': [('B', 1)], 'B': []},
+            {'A': type('Stop', (), {'stop_ID': 'A'})(), 'B': type('Stop', (), {'stop_ID': 'B'})()}
+        )
+        path, dist = dijkstra_shortest_path_algorithm.astar(dummy, 'A', 'B')
+        self.assertEqual([s.stop_ID for s in path], ['A', 'B'])
+        self.assertEqual(dist, 1)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -42,5 +42,14 @@ class TestDistanceCalculation(unittest.TestCase):
         dist = distance_calculation.calculate_distance_between_stops_by_id(dm, 'A', 'B')
         self.assertEqual(dist, 0)
 
+class TestVectorizedDistanceCalculation(unittest.TestCase):
+    def test_reexported_vectorized_functions(self):
+        result = distance_calculation.haversine_many([39.9042], [116.4074], [31.2304], [121.4737])
+        self.assertAlmostEqual(float(result[0]), distance_calculation.calculate_haversine_distance(39.9042, 116.4074, 31.2304, 121.4737), places=9)
+        rows, cols, distances = distance_calculation.pairwise_haversine([(0, 0), (0, 0.001), (10, 10)], max_distance=1.0)
+        self.assertEqual((rows.tolist(), cols.tolist()), ([0], [1]))
+
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
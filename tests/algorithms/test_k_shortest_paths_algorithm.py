@@ -0,0 +1,58 @@
+import random
+import unittest
+from project.algorithms.k_shortest_paths_algorithm import k_shortest_paths
+from project.algorithms.dfs_all_paths_algorithm import find_all_paths
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+
+class TestKShortestPaths(unittest.TestCase):
+    def setUp(self):
+        # A --1--> B --1--> C,  A --3--> C,  B --1--> D --1--> C
+        self.network = TransportNetwork()
+        for stop_id in ('A', 'B', 'C', 'D'):
+            self.network.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        self.network.add_route('A', 'B', 1)
+        self.network.add_route('B', 'C', 1)
+        self.network.add_route('A', 'C', 3)
+        self.network.add_route('B', 'D', 1)
+        self.network.add_route('D', 'C', 1)
+
+    def ids(self, paths):
+        return [([s.stop_ID for s in p], d) for p, d in paths]
+
+    def test_paths_in_distance_order(self):
+        for graph in (self.network, self.network.to_csr()):
+            paths = self.ids(k_shortest_paths(graph, 'A', 'C', k=3))
+            self.assertEqual(paths[0], (['A', 'B', 'C'], 2))
+            self.assertEqual(sorted(paths[1:]), [(['A', 'B', 'D', 'C'], 3), (['A', 'C'], 3)])
+
+    def test_k_limit_and_exhaustion(self):
+        self.assertEqual(len(list(k_shortest_paths(self.network, 'A', 'C', k=1))), 1)
+        self.assertEqual(len(list(k_shortest_paths(self.network, 'A', 'C'))), 3)
+        self.assertEqual(list(k_shortest_paths(self.network, 'A', 'C', k=0)), [])
+
+    def test_max_distance(self):
+        paths = self.ids(k_shortest_paths(self.network, 'A', 'C', max_distance=2))
+        self.assertEqual(paths, [(['A', 'B', 'C'], 2)])
+
+    def test_no_path_and_invalid(self):
+        self.assertEqual(list(k_shortest_paths(self.network, 'C', 'A', k=3)), [])
+        self.assertEqual(list(k_shortest_paths(self.network, 'X', 'A', k=3)), [])
+        self.assertEqual(self.ids(k_shortest_paths(self.network, 'A', 'A', k=3)), [(['A'], 0)])
+
+    def test_matches_dfs_enumeration(self):
+        rng = random.Random(11)
+        network = TransportNetwork()
+        for i in range(12):
+            network.add_stop(Stop(i, str(i), 0, 0, ZoneType.MIXED))
+        for _ in range(30):
+            a, b = rng.randrange(12), rng.randrange(12)
+            if a != b and all(n != b for n, _ in network.adjacency_list[a]):
+                network.add_route(a, b, rng.randint(1, 5))
+        expected = sorted(d for _, d in find_all_paths(network, 0, 11, max_distance=None))
+        paths = list(k_shortest_paths(network, 0, 11))
+        self.assertEqual([d for _, d in paths], expected)
+        self.assertEqual(len({tuple(s.stop_ID for s in p) for p, _ in paths}), len(paths))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -118,5 +118,51 @@ class TestPathEfficiencyAnalysis(unittest.TestCase):
         # base_speed 應該被用到
         self.assertEqual(traffic_manager.base_speed, 42)
 
+class TestMostEfficientPathSearch(unittest.TestCase):
+    def setUp(self):
+        from project.data_structures.transport_network_structure import TransportNetwork
+        from project.data_structures.stop_entity import Stop, ZoneType
+        # A --2--> B(住宅,等候2分钟) --2--> D;  A --2--> C(商业,等候4分钟) --2--> D
+        self.network = TransportNetwork()
+        zones = {'A': ZoneType.RESIDENTIAL, 'B': ZoneType.RESIDENTIAL, 'C': ZoneType.COMMERCIAL, 'D': ZoneType.MIXED}
+        for stop_id, zone in zones.items():
+            self.network.add_stop(Stop(stop_id, stop_id, 0, 0, zone))
+        self.network.add_route('A', 'C', 2)
+        self.network.add_route('C', 'D', 2)
+        self.network.add_route('A', 'B', 2)
+        self.network.add_route('B', 'D', 2)
+        self.wait_times = {ZoneType.RESIDENTIAL: 2, ZoneType.COMMERCIAL: 4, ZoneType.INDUSTRIAL: 3, ZoneType.MIXED: 3}
+
+    def test_picks_lowest_travel_time(self):
+        for graph in (self.network, self.network.to_csr()):
+            result = path_efficiency_analysis.find_most_efficient_path_by_search(graph, 'A', 'D', self.wait_times)
+            self.assertEqual(result['path'], ['A', 'B', 'D'])
+            self.assertEqual(result['distance'], 4)
+            self.assertAlmostEqual(result['travel_time'], 4 / 23.0 + 4 / 60.0)
+            stops = [self.network.get_stop_by_id(s) for s in result['path']]
+            self.assertAlmostEqual(result['efficiency'],
+                                   path_efficiency_analysis.calculate_efficiency(stops, 4, self.wait_times))
+
+    def test_with_traffic_manager(self):
+        from project.algorithms.traffic_condition_manager import TrafficConditionManager
+        manager = TrafficConditionManager()
+        result = path_efficiency_analysis.find_most_efficient_path_by_search(
+            self.network, 'A', 'D', self.wait_times, traffic_manager=manager)
+        self.assertEqual(result['path'], ['A', 'B', 'D'])
+
+    def test_matches_enumeration_optimum(self):
+        from project.algorithms.dfs_all_paths_algorithm import find_all_paths
+        self.network.add_route('A', 'D', 5)
+        best_time = min(
+            d / 23.0 + sum(self.wait_times[s.zone_type] for s in p[:-1]) / 60.0
+            for p, d in find_all_paths(self.network, 'A', 'D'))
+        result = path_efficiency_analysis.find_most_efficient_path_by_search(self.network, 'A', 'D', self.wait_times)
+        self.assertAlmostEqual(result['travel_time'], best_time)
+
+    def test_no_path(self):
+        self.assertEqual(path_efficiency_analysis.find_most_efficient_path_by_search(self.network, 'D', 'A', self.wait_times), {})
+        self.assertEqual(path_efficiency_analysis.find_most_efficient_path_by_search(self.network, 'X', 'A', self.wait_times), {})
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import unittest
+from project.algorithms.time_dependent_routing import boarding_time, edge_arrival_time, time_dependent_fastest_path
+from project.algorithms.traffic_condition_manager import TrafficConditionManager
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+from tests.network_factory import build_random_network as random_network
+
+def build_random_network(seed, num_stops=9, num_routes=25):
+    return random_network(seed, num_stops, num_routes, random_zones=True, float_distances=True)
+
+def brute_force_arrival(network, tm, start, end, departure):
+    """枚举全部简单路径，逐站计算到达时刻"""
+    best = float('inf')
+
+    def zone(stop_id):
+        return network.get_stop_by_id(stop_id).zone_type.value.lower()
+
+    def visit(node, time, seen):
+        nonlocal best
+        if node == end:
+            best = min(best, time)
+            return
+        board = boarding_time(tm, zone(node), time)
+        for neighbor, weight in network.adjacency_list[node]:
+            if neighbor not in seen:
+                visit(neighbor, edge_arrival_time(tm, zone(node), zone(neighbor), weight, board), seen | {neighbor})
+
+    visit(start, departure, {start})
+    return best
+
+class TestTimeDependentRouting(unittest.TestCase):
+    def setUp(self):
+        self.tm = TrafficConditionManager()
+
+    def test_edge_crosses_period_change(self):
+        # 6:54出发，7:00前以23km/h行驶2.3km，之后早高峰进入住宅区降为15km/h
+        arrival = edge_arrival_time(self.tm, 'mixed', 'residential', 3.8, 6.9)
+        self.assertAlmostEqual(arrival, 7.1)
+        self.assertAlmostEqual(edge_arrival_time(self.tm, 'mixed', 'mixed', 2.3, 6.9), 7.0)
+        self.assertEqual(edge_arrival_time(self.tm, 'mixed', 'mixed', 0, 6.9), 6.9)
+
+    def test_boarding_time_is_fifo(self):
+        # 8:59到站按早高峰要等4分钟，但9:00后只需等2分钟
+        self.assertAlmostEqual(boarding_time(self.tm, 'residential', 8.99), 9.0 + 2 / 60)
+        self.assertAlmostEqual(boarding_time(self.tm, 'residential', 10.0), 10.0 + 2 / 60)
+        times = [6.5 + i / 100 for i in range(300)]
+        boards = [boarding_time(self.tm, zone, t) for zone in ('residential', 'commercial') for t in times]
+        for zone_boards in (boards[:300], boards[300:]):
+            self.assertEqual(zone_boards, sorted(zone_boards))
+
+    def test_matches_brute_force(self):
+        for seed in range(4):
+            network = build_random_network(seed)
+            for departure in (6.8, 8.0, 8.95, 16.9, 22.0):
+                for end in ('3', '5', '8'):
+                    result = time_dependent_fastest_path(network, '0', end, departure, self.tm)
+                    expected = brute_force_arrival(network, self.tm, '0', end, departure)
+                    if expected == float('inf'):
+                        self.assertEqual(result, {})
+                        continue
+                    self.assertAlmostEqual(result['arrival_time'], expected)
+                    self.assertAlmostEqual(result['travel_time'], expected - departure)
+                    self.assertEqual((result['path'][0], result['path'][-1]), ('0', end))
+                    self.assertAlmostEqual(result['distance'], sum(
+                        network.get_route_distance(a, b) for a, b in zip(result['path'], result['path'][1:])))
+                    csr_result = time_dependent_fastest_path(network.to_csr(), '0', end, departure, self.tm)
+                    self.assertAlmostEqual(csr_result['arrival_time'], expected)
+                    tables = self.tm.cost_tables(network.to_csr())
+                    table_result = time_dependent_fastest_path(network.to_csr(), '0', end, departure, self.tm,
+                                                               cost_tables=tables)
+                    self.assertAlmostEqual(table_result['arrival_time'], expected)
+                    self.assertAlmostEqual(table_result['distance'], csr_result['distance'])
+
+    def test_route_depends_on_departure_time(self):
+        network = TransportNetwork()
+        for stop_id, zone in (('a', ZoneType.MIXED), ('r', ZoneType.RESIDENTIAL),
+                              ('m', ZoneType.MIXED), ('b', ZoneType.MIXED)):
+            network.add_stop(Stop(stop_id, stop_id, 0, 0, zone))
+        # 经过住宅区的路线较短，早高峰时住宅区降速且等候更久，绕行更快
+        network.add_route('a', 'r', 5.0)
+        network.add_route('r', 'b', 5.0)
+        network.add_route('a', 'm', 6.0)
+        network.add_route('m', 'b', 6.0)
+        self.assertEqual(time_dependent_fastest_path(network, 'a', 'b', 12.0, self.tm)['path'], ['a', 'r', 'b'])
+        self.assertEqual(time_dependent_fastest_path(network, 'a', 'b', 8.0, self.tm)['path'], ['a', 'm', 'b'])
+        self.assertEqual(time_dependent_fastest_path(network, 'a', 'x', 8.0, self.tm), {})
+        self.assertEqual(time_dependent_fastest_path(network, 'b', 'a', 8.0, self.tm), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -499,5 +499,89 @@ class TestTrafficConditionManager(unittest.TestCase):
                 for to_area in area_types:
                     self.traffic_manager.get_edge_speed(area_type, to_area)
 
+    def test_period_schedule(self):
+        """測試按時刻確定時段"""
+        tm = self.traffic_manager
+        self.assertEqual(tm.period_at(6.99), TrafficConditionManager.NORMAL)
+        self.assertEqual(tm.period_at(7.0), TrafficConditionManager.PEAK_MORNING)
+        self.assertEqual(tm.period_at(18.0), TrafficConditionManager.PEAK_EVENING)
+        self.assertEqual(tm.period_at(24 + 8.0), TrafficConditionManager.PEAK_MORNING)
+        self.assertEqual(tm.next_period_change(7.0), 9.0)
+        self.assertEqual(tm.next_period_change(20.0), 24.0)
+        self.assertEqual(tm.next_period_change(24 + 17.5), 24 + 19.0)
+        # 按給定時段計算不改變當前時段
+        self.assertEqual(tm.get_wait_time('residential', TrafficConditionManager.PEAK_MORNING), 4)
+        self.assertEqual(tm.get_edge_speed('mixed', 'commercial', TrafficConditionManager.PEAK_EVENING), 15)
+        self.assertEqual(tm.get_edge_speed('mixed', 'commercial'), 23)
+        self.assertEqual(tm.period, TrafficConditionManager.NORMAL)
+
+class TestPeriodCostTable(unittest.TestCase):
+    """按時段編譯的代價表"""
+
+    def setUp(self):
+        import random
+        from project.data_structures.stop_entity import Stop, ZoneType
+        from project.data_structures.transport_network_structure import TransportNetwork
+        rng = random.Random(0)
+        zones = list(ZoneType)
+        self.network = TransportNetwork()
+        for i in range(20):
+            self.network.add_stop(Stop(str(i), str(i), 0, 0, rng.choice(zones)))
+        for _ in range(60):
+            a, b = str(rng.randrange(20)), str(rng.randrange(20))
+            if a != b and not self.network.has_route(a, b):
+                self.network.add_route(a, b, rng.randint(1, 20))
+        self.graph = self.network.to_csr()
+        self.traffic_manager = TrafficConditionManager()
+
+    def zone(self, index):
+        return self.graph.get_stop_by_id(self.graph.stop_id_of(index)).zone_type.value.lower()
+
+    def test_tables_match_lookups(self):
+        tm = self.traffic_manager
+        for period in (tm.NORMAL, tm.PEAK_MORNING, tm.PEAK_EVENING):
+            table = tm.cost_table(self.graph, period)
+            self.assertEqual(table.period, period)
+            tm.set_period(period)
+            for i in range(self.graph.num_stops):
+                self.assertEqual(table.wait_minutes[i], tm.get_wait_time(self.zone(i)))
+                self.assertEqual(table.departure_speeds[i], tm.get_speed(self.zone(i)))
+                for k in range(self.graph.offsets[i], self.graph.offsets[i + 1]):
+                    j = self.graph.targets[k]
+                    self.assertEqual(table.edge_speeds[k], tm.get_edge_speed(self.zone(i), self.zone(j)))
+                    self.assertAlmostEqual(table.edge_times[k], self.graph.weights[k] / table.edge_speeds[k])
+            self.assertFalse(table.wait_minutes.flags.writeable)
+
+    def test_set_period_swaps_compiled_table(self):
+        tm = self.traffic_manager
+        self.assertIsNone(tm.current_table)
+        normal = tm.cost_table(self.graph)
+        self.assertIs(tm.current_table, normal)
+        with patch.object(tm, 'compile_tables') as compile_tables:
+            tm.set_period(tm.PEAK_EVENING)
+            self.assertIs(tm.current_table, tm.cost_table(self.graph))
+            tm.set_period(tm.NORMAL)
+            self.assertIs(tm.current_table, normal)
+            compile_tables.assert_not_called()
+        # 網絡修改後CSR視圖換成新對象，或區域類型版本號變化時重新編譯
+        ids = self.graph.stop_ids
+        self.network.add_route(*next((a, b) for a in ids for b in ids if a != b and not self.network.has_route(a, b)), 1.0)
+        self.assertIsNot(tm.cost_table(self.network.to_csr()), normal)
+        table = tm.cost_table(self.network.to_csr())
+        self.assertIsNot(tm.cost_table(self.network.to_csr(), zones_version=1), table)
+
+    def test_path_efficiency_matches_calculate_efficiency(self):
+        from project.algorithms.path_efficiency_analysis import calculate_efficiency
+        tm = self.traffic_manager
+        ids = self.graph.stop_ids
+        for period in (tm.NORMAL, tm.PEAK_MORNING):
+            tm.set_period(period)
+            table = tm.cost_table(self.graph)
+            for path in (ids[:2], ids[3:9], ids[::-1], ids[:1]):
+                stops = [self.graph.get_stop_by_id(stop_id) for stop_id in path]
+                self.assertEqual(table.path_efficiency([self.graph.index_of(s) for s in path], 12.5),
+                                 calculate_efficiency(stops, 12.5, {}, traffic_manager=tm))
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,83 @@
+import csv
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.analysis.batch_router import BatchRouter, RESULT_COLUMNS, PATH_SEPARATOR
+from tests.network_factory import build_random_network as random_network
+
+def build_random_network(seed, num_stops=25, num_routes=70):
+    return random_network(seed, num_stops, num_routes)
+
+class TestBatchRouter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.network = build_random_network(0)
+        self.router = BatchRouter.from_network(self.network, os.path.join(self.tmpdir.name, 'snapshot'),
+                                               max_workers=2, sources_per_task=3)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assert_rows_match_dijkstra(self, rows, include_paths):
+        for origin, destination, distance, path in rows:
+            expected_path, expected = dijkstra(self.network, origin, destination)
+            self.assertEqual(distance, expected)
+            if include_paths and expected_path is not None:
+                ids = path.split(PATH_SEPARATOR)
+                self.assertEqual((ids[0], ids[-1]), (origin, destination))
+                self.assertEqual(sum(self.network.get_route_distance(a, b) for a, b in zip(ids, ids[1:])), expected)
+            else:
+                self.assertEqual(path, '')
+
+    def test_iter_routes(self):
+        rng = random.Random(1)
+        stops = list(self.network.stops)
+        pairs = [(rng.choice(stops), rng.choice(stops)) for _ in range(200)] + [('0', 'missing'), ('missing', '0')]
+        for include_paths in (False, True):
+            rows = list(self.router.iter_routes(pairs, include_paths=include_paths))
+            self.assertEqual(sorted((o, d) for o, d, _, _ in rows), sorted(pairs))
+            self.assert_rows_match_dijkstra(rows, include_paths)
+        self.assertEqual(list(self.router.iter_routes([])), [])
+
+    def test_od_matrix_to_csv(self):
+        stops = [self.network.stops[stop_id] for stop_id in list(self.network.stops)[:10]]
+        rows = list(self.router.iter_od_matrix(stops, stops))
+        self.assertEqual(len(rows), 100)
+        self.assert_rows_match_dijkstra(rows, False)
+        file_path = os.path.join(self.tmpdir.name, 'od.csv')
+        pairs = [(s, t) for s in stops for t in stops]
+        self.assertEqual(self.router.route_to_csv(pairs, file_path, include_paths=True), 100)
+        with open(file_path, encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            self.assertEqual(tuple(next(reader)), RESULT_COLUMNS)
+            written = [(o, d, float(dist), p) for o, d, dist, p in reader]
+        self.assertEqual(len(written), 100)
+        self.assert_rows_match_dijkstra(written, True)
+
+    def test_missing_snapshot(self):
+        with self.assertRaises(ValueError):
+            BatchRouter(os.path.join(self.tmpdir.name, 'missing'))
+
+    def test_parquet_requires_pyarrow(self):
+        with patch.dict(sys.modules, {'pyarrow': None, 'pyarrow.parquet': None}):
+            with self.assertRaises(ImportError):
+                self.router.route_to_parquet([('0', '1')], os.path.join(self.tmpdir.name, 'od.parquet'))
+
+    def test_parquet(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        file_path = os.path.join(self.tmpdir.name, 'od.parquet')
+        pairs = [(s, t) for s in list(self.network.stops)[:5] for t in self.network.stops]
+        self.assertEqual(self.router.route_to_parquet(pairs, file_path, batch_size=7), len(pairs))
+        table = pq.read_table(file_path)
+        self.assertEqual(tuple(table.column_names), RESULT_COLUMNS)
+        self.assertEqual(table.num_rows, len(pairs))
+
+if __name__ == '__main__':
+    unittest.main()
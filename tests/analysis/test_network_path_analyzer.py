@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from project.analysis.network_path_analyzer import PathAnalyzer
 
 class MockNetwork:
@@ -60,18 +60,17 @@ class TestPathAnalyzer(unittest.TestCase):
         def fake_find_all_paths(start, end, include_efficiency=False):
             return [{'path': ['1', '2'], 'distance': 1.0, 'efficiency': 2.0}]
         self.analyzer.find_all_paths = fake_find_all_paths
-        import project.algorithms.path_efficiency_analysis
-        project.algorithms.path_efficiency_analysis.find_most_efficient_path = lambda all_paths: {'path': ['1', '2'], 'distance': 1.0, 'efficiency': 2.0}
-        result = self.analyzer.find_best_path('1', '2', by_efficiency=True)
+        with patch('project.algorithms.path_efficiency_analysis.find_most_efficient_path',
+                   lambda all_paths: {'path': ['1', '2'], 'distance': 1.0, 'efficiency': 2.0}):
+            result = self.analyzer.find_best_path('1', '2', by_efficiency=True)
         self.assertIn('path', result)
         self.assertIn('efficiency', result)
 
     def test_compare_best_paths_no_path(self):
         # 无路径
-        import project.algorithms.dijkstra_shortest_path_algorithm
-        project.algorithms.dijkstra_shortest_path_algorithm.dijkstra = lambda net, s, e: ([], 0.0)
-        self.analyzer.find_all_paths = lambda start, end, include_efficiency=False: []
-        result = self.analyzer.compare_best_paths('1', '2')
+        # 效率路径由搜索直接得到，不再依赖 find_all_paths；'3' 没有出边，到 '1' 不可达
+        with patch('project.algorithms.dijkstra_shortest_path_algorithm.dijkstra', lambda net, s, e: ([], 0.0)):
+            result = self.analyzer.compare_best_paths('3', '1')
         self.assertIsNone(result)
 
     def test_compare_best_paths_normal(self):
@@ -93,12 +92,12 @@ class TestPathAnalyzer(unittest.TestCase):
 
     def test_compare_best_paths_same(self):
         # 最短路径和最高效路径一致
-        import project.algorithms.dijkstra_shortest_path_algorithm
-        project.algorithms.dijkstra_shortest_path_algorithm.dijkstra = lambda net, s, e: ([self.data_manager.network.stops['1'], self.data_manager.network.stops['2']], 1.0)
         self.analyzer.find_all_paths = lambda start, end, include_efficiency=False: [
             {'path': ['1', '2'], 'distance': 1.0, 'efficiency': 2.0}
         ]
-        result = self.analyzer.compare_best_paths('1', '2')
+        with patch('project.algorithms.dijkstra_shortest_path_algorithm.dijkstra',
+                   lambda net, s, e: ([self.data_manager.network.stops['1'], self.data_manager.network.stops['2']], 1.0)):
+            result = self.analyzer.compare_best_paths('1', '2')
         self.assertIsNotNone(result)
         if result is not None:
             self.assertTrue(result['is_same'])
@@ -120,5 +119,228 @@ class TestMockNetwork(unittest.TestCase):
         stop = self.network.get_stop_by_id('999')
         self.assertIsNone(stop)
 
+class TestPathAnalyzerTreeCache(unittest.TestCase):
+    def setUp(self):
+        from project.data_structures.transport_network_structure import TransportNetwork
+        from project.data_structures.stop_entity import Stop, ZoneType
+        network = TransportNetwork()
+        for stop_id in ('1', '2', '3'):
+            network.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        network.add_route('1', '2', 1.0)
+        network.add_route('2', '3', 1.0)
+        network.add_route('1', '3', 5.0)
+        self.network = network
+        self.data_manager = MagicMock()
+        self.data_manager.network = network
+        self.analyzer = PathAnalyzer(self.data_manager)
+
+    def test_tree_reused_for_same_start(self):
+        tree = self.analyzer.shortest_path_tree('1')
+        self.assertIs(self.analyzer.shortest_path_tree('1'), tree)
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        self.assertEqual(self.analyzer.find_best_path('1', '2'), ['1', '2'])
+
+    def test_tree_invalidated_after_edit(self):
+        tree = self.analyzer.shortest_path_tree('1')
+        self.network.remove_route('2', '3')
+        self.assertIsNot(self.analyzer.shortest_path_tree('1'), tree)
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '3'])
+
+    def test_heuristic_scale_keyed_on_network_identity(self):
+        from project.data_structures.transport_network_structure import TransportNetwork
+        with patch('project.analysis.network_path_analyzer.haversine_heuristic_scale', return_value=1.0) as scale:
+            self.analyzer.find_best_path('1', '3', algorithm='astar')
+            self.analyzer.find_best_path('1', '3', algorithm='astar')
+            self.assertEqual(scale.call_count, 1)
+            other = TransportNetwork()
+            other.version = self.network.version
+            self.data_manager.network = other
+            self.analyzer._get_heuristic_scale()
+            self.assertEqual(scale.call_count, 2)
+
+    def test_single_pair_query_stops_at_target(self):
+        self.assertEqual(self.analyzer.find_best_path('1', '2'), ['1', '2'])
+        partial = self.analyzer.shortest_path_tree('1', '2')
+        self.assertEqual(partial.radius, 1.0)
+        # 已覆盖的终点直接复用，未覆盖时重新搜索并替换
+        self.assertIs(self.analyzer.shortest_path_tree('1', '1'), partial)
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        self.assertIsNot(self.analyzer.shortest_path_tree('1', '3'), partial)
+        self.assertEqual(len(self.analyzer._tree_cache), 1)
+
+    def test_tree_cache_bounded_by_nodes(self):
+        self.analyzer.MAX_CACHED_TREE_NODES = 4
+        trees = [self.analyzer.shortest_path_tree(start) for start in ('1', '2', '3')]
+        self.assertLessEqual(self.analyzer._tree_cache_nodes, 4)
+        self.assertEqual(self.analyzer._tree_cache_nodes, sum(len(t) for t in self.analyzer._tree_cache.values()))
+        self.assertIs(self.analyzer.shortest_path_tree('3'), trees[2])
+        self.assertIsNot(self.analyzer.shortest_path_tree('1'), trees[0])
+
+    def test_tree_cache_keyed_on_network_identity(self):
+        from project.data_structures.transport_network_structure import TransportNetwork
+        from project.data_structures.stop_entity import Stop, ZoneType
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        other = TransportNetwork()
+        for stop_id in ('1', '2', '3'):
+            other.add_stop(Stop(stop_id, stop_id, 0, 0, ZoneType.MIXED))
+        other.add_route('1', '3', 5.0)
+        other.version = self.network.version
+        self.data_manager.network = other
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '3'])
+
+    def test_bidirectional_algorithm(self):
+        self.assertEqual(self.analyzer.find_best_path('1', '3', algorithm='bidirectional'), ['1', '2', '3'])
+        with self.assertRaises(ValueError):
+            self.analyzer.find_best_path('1', '3', algorithm='unknown')
+
+    def test_astar_algorithm(self):
+        self.assertEqual(self.analyzer.find_best_path('1', '3', algorithm='astar'), ['1', '2', '3'])
+
+    def test_contraction_hierarchy_used_until_network_changes(self):
+        import os, tempfile
+        hierarchy = self.analyzer.build_contraction_hierarchy()
+        calls = []
+        original_query = hierarchy.query
+        hierarchy.query = lambda s, e: calls.append((s, e)) or original_query(s, e)
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        self.assertEqual(calls, [('1', '3')])
+        self.network.remove_route('2', '3')
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '3'])
+        self.assertEqual(len(calls), 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'ch.json')
+            self.analyzer.build_contraction_hierarchy()
+            self.analyzer.save_contraction_hierarchy(file_path)
+            self.assertTrue(self.analyzer.load_contraction_hierarchy(file_path))
+            self.network.add_route('3', '1', 1.0)
+            self.assertFalse(self.analyzer.load_contraction_hierarchy(file_path))
+
+    def test_find_all_paths_with_k_limit(self):
+        self.assertEqual(self.analyzer.find_all_paths('1', '3', k=1), [['1', '2', '3']])
+        paths = self.analyzer.find_all_paths('1', '3', include_efficiency=True, k=5)
+        self.assertEqual([p['path'] for p in paths], [['1', '2', '3'], ['1', '3']])
+
+    def test_k_paths_use_same_distance_cap_as_enumeration(self):
+        from project.data_structures.stop_entity import Stop, ZoneType
+        self.network.add_route('2', '1', 1.0)
+        self.network.add_route('3', '2', 100.0)
+        self.network.add_stop(Stop('4', '4', 0, 0, ZoneType.MIXED))
+        self.network.add_route('1', '4', 50.0)
+        self.network.add_route('4', '3', 50.0)
+        # 1 -> 4 -> 3 长100，超过默认上限80：两种方式都不返回
+        expected = self.analyzer.find_all_paths('1', '3')
+        self.assertEqual(expected, [['1', '2', '3'], ['1', '3']])
+        self.assertEqual(self.analyzer.find_all_paths('1', '3', k=10), expected)
+        self.assertEqual(self.analyzer.find_all_paths('1', '3', k=10, max_distance=None),
+                         expected + [['1', '4', '3']])
+        self.assertEqual(self.analyzer.find_all_paths('1', '3', k=10, max_distance=3),
+                         self.analyzer.find_all_paths('1', '3', max_distance=3))
+
+    def test_efficiency_search_without_enumeration(self):
+        self.analyzer.find_all_paths = None  # 不应再被调用
+        result = self.analyzer.find_best_path('1', '3', by_efficiency=True)
+        self.assertEqual(result['path'], ['1', '2', '3'])
+        self.assertEqual(result['distance'], 2.0)
+        self.assertGreater(result['efficiency'], 0)
+        comparison = self.analyzer.compare_best_paths('1', '3')
+        self.assertEqual(comparison['efficiency_path'], ['1', '2', '3'])
+        self.assertTrue(comparison['is_same'])
+        self.assertIsNone(self.analyzer.compare_best_paths('3', '1'))
+
+    def test_efficiency_search_returns_fastest_not_highest_efficiency(self):
+        from project.data_structures.stop_entity import Stop, ZoneType
+        # 直达 1 -> 4 很短、等候一次；绕行 1 -> 2 -> 4 长得多，效率（距离/时间）更高但更慢
+        self.network.add_stop(Stop('4', '4', 0, 0, ZoneType.MIXED))
+        self.network.add_route('1', '4', 1.0)
+        self.network.add_route('2', '4', 19.0)
+        result = self.analyzer.find_best_path('1', '4', by_efficiency=True)
+        self.assertEqual(result['path'], ['1', '4'])
+        paths = {tuple(p['path']): p for p in self.analyzer.find_all_paths('1', '4', include_efficiency=True)}
+        detour = paths[('1', '2', '4')]
+        self.assertGreater(detour['efficiency'], result['efficiency'])
+        # 时间 = 距离 / 效率：返回的路径在所有路径中行程时间最短
+        self.assertAlmostEqual(result['travel_time'], result['distance'] / result['efficiency'])
+        for path in paths.values():
+            self.assertLessEqual(result['travel_time'], path['distance'] / path['efficiency'] + 1e-12)
+        comparison = self.analyzer.compare_best_paths('1', '4')
+        self.assertEqual(comparison['efficiency_path'], ['1', '4'])
+
+    def test_compare_best_paths_reuses_default_search(self):
+        # 没有索引时 find_best_path 与 compare_best_paths 共用同一棵缓存的最短路径树
+        self.assertEqual(self.analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        tree = self.analyzer.shortest_path_tree('1')
+        comparison = self.analyzer.compare_best_paths('1', '3')
+        self.assertIs(self.analyzer.shortest_path_tree('1'), tree)
+        self.assertEqual((comparison['dijkstra_path'], comparison['dijkstra_distance']), (['1', '2', '3'], 2.0))
+        # 有有效的收缩层次索引时两者都走索引，不再构建最短路径树
+        analyzer = PathAnalyzer(self.data_manager)
+        analyzer.build_contraction_hierarchy()
+        analyzer.shortest_path_tree = None
+        self.assertEqual(analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        comparison = analyzer.compare_best_paths('1', '3')
+        self.assertEqual((comparison['dijkstra_path'], comparison['dijkstra_distance']), (['1', '2', '3'], 2.0))
+        self.assertEqual(analyzer.compare_best_paths('1', '3', algorithm='astar')['dijkstra_path'], ['1', '2', '3'])
+
+    def test_find_all_paths_with_limit(self):
+        self.assertEqual(self.analyzer.find_all_paths('1', '3', limit=1), [['1', '2', '3']])
+        self.assertEqual(list(self.analyzer.iter_all_paths('1', '3')), [(['1', '2', '3'], 2.0), (['1', '3'], 5.0)])
+        self.assertEqual(list(self.analyzer.iter_all_paths('1', '99')), [])
+
+    def test_csr_mode(self):
+        analyzer = PathAnalyzer(self.data_manager, use_csr=True)
+        self.assertEqual(analyzer.find_best_path('1', '3'), ['1', '2', '3'])
+        self.assertEqual(analyzer.find_all_paths('1', '3'), [['1', '2', '3'], ['1', '3']])
+
+    def test_find_fastest_path_at(self):
+        result = self.analyzer.find_fastest_path_at('1', '3', 8.0)
+        self.assertEqual((result['path'], result['departure_time']), (['1', '2', '3'], 8.0))
+        # 全部为混合区，两次等候各3分钟，行驶2km（23km/h）
+        self.assertAlmostEqual(result['travel_time'], 6 / 60 + 2 / 23)
+        self.assertEqual(self.analyzer.find_fastest_path_at('1', '99', 8.0), {})
+
+
+    def test_period_cost_table_scoring(self):
+        from project.algorithms.path_efficiency_analysis import calculate_efficiency
+        from project.data_structures.stop_entity import ZoneType
+        self.network.get_stop_by_id('2').zone_type = ZoneType.COMMERCIAL
+        self.data_manager.zones_version = 1
+        tm = self.analyzer.traffic_manager
+
+        def expected(paths):
+            return [calculate_efficiency([self.network.get_stop_by_id(s) for s in item['path']], item['distance'],
+                                         PathAnalyzer.WAIT_TIMES, traffic_manager=tm) for item in paths]
+
+        paths = self.analyzer.find_all_paths('1', '3', include_efficiency=True)
+        self.assertEqual([item['efficiency'] for item in paths], expected(paths))
+        self.assertIs(self.analyzer.cost_table(), tm.current_table)
+        # 切換時段後只重新評分，路徑不變
+        tm.set_period(tm.PEAK_EVENING)
+        rescored = self.analyzer.score_paths(paths)
+        self.assertEqual([item['path'] for item in rescored], [item['path'] for item in paths])
+        self.assertEqual([item['efficiency'] for item in rescored], expected(paths))
+        self.assertNotEqual(rescored, paths)
+        fastest = self.analyzer.find_best_path('1', '3', by_efficiency=True)
+        self.assertEqual(fastest['efficiency'], expected([fastest])[0])
+        # 修改站點類型並更新版本號後重新編譯
+        self.network.get_stop_by_id('1').zone_type = ZoneType.RESIDENTIAL
+        self.data_manager.zones_version = 2
+        self.assertEqual([item['efficiency'] for item in self.analyzer.score_paths(paths)], expected(paths))
+
+    def test_fastest_path_at_uses_period_tables(self):
+        from project.algorithms.time_dependent_routing import time_dependent_fastest_path
+        from project.data_structures.stop_entity import ZoneType
+        self.network.get_stop_by_id('2').zone_type = ZoneType.RESIDENTIAL
+        tm = self.analyzer.traffic_manager
+        for departure in (6.95, 8.0, 8.98, 12.0):
+            result = self.analyzer.find_fastest_path_at('1', '3', departure)
+            self.assertEqual(result['path'], time_dependent_fastest_path(self.network, '1', '3', departure, tm)['path'])
+            self.assertAlmostEqual(result['arrival_time'],
+                                   time_dependent_fastest_path(self.network, '1', '3', departure, tm)['arrival_time'])
+        # 各时段的代价表只编译一次
+        with patch.object(tm, 'compile_tables') as compile_tables:
+            self.analyzer.find_fastest_path_at('1', '3', 17.5)
+            compile_tables.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -124,6 +124,17 @@ class TestStopUtilizationAnalyzer(unittest.TestCase):
         d2 = self.analyzer._calculate_distance(30, 120, 31, 121)
         self.assertGreater(d2, 0)
 
+    def test_is_location_safe_uses_spatial_index(self):
+        from project.data_structures.spatial_index import GeoGridIndex
+        index = GeoGridIndex()
+        for stop in self.data_manager.network.stops.values():
+            index.insert(stop.stop_ID, stop.latitude, stop.longitude)
+        self.data_manager.geo_index = index
+        for lat, lon, distance in [(50, 50, 1.0), (30.0, 120.0, 100), (30.005, 120.005, 0.5), (30.005, 120.005, 1.0)]:
+            expected = all(self.analyzer._calculate_distance(lat, lon, s.latitude, s.longitude) >= distance
+                           for s in self.data_manager.network.stops.values())
+            self.assertEqual(self.analyzer._is_location_safe_for_new_stop(lat, lon, distance), expected)
+
     def test_private_is_location_safe_for_new_stop(self):
         # 距離足夠遠
         safe = self.analyzer._is_location_safe_for_new_stop(50, 50, 1.0)
@@ -132,5 +143,137 @@ class TestStopUtilizationAnalyzer(unittest.TestCase):
         safe2 = self.analyzer._is_location_safe_for_new_stop(30.0, 120.0, 100)
         self.assertFalse(safe2)
 
+class TestConsolidationGridSearch(unittest.TestCase):
+    def setUp(self):
+        import random
+        random.seed(5)
+        network = MockNetwork()
+        network.stops = {}
+        network.adjacency_list = {}
+        for i in range(150):
+            lat = round(48.84 + random.uniform(0, 0.05), 4)
+            lon = round(2.24 + random.uniform(0, 0.15), 4)
+            network.stops[str(i)] = Stop(str(i), f'S{i}', lat, lon, ZoneType.MIXED)
+            network.adjacency_list[str(i)] = []
+        data_manager = MockDataManager()
+        data_manager.network = network
+        self.analyzer = StopUtilizationAnalyzer(data_manager)
+        self.analyzer.generate_random_data()
+        self.analyzer.calculate_stop_efficiency()
+
+    def legacy_pairs(self, max_distance):
+        stops = list(self.analyzer.network.stops.values())
+        pairs = []
+        for i in range(len(stops)):
+            for j in range(i + 1, len(stops)):
+                distance = self.analyzer._calculate_distance(stops[i].latitude, stops[i].longitude,
+                                                             stops[j].latitude, stops[j].longitude)
+                if distance <= max_distance:
+                    pairs.append((distance, stops[i].stop_ID, stops[j].stop_ID))
+        pairs.sort(key=lambda x: x[0])
+        return pairs
+
+    def test_matches_quadratic_search(self):
+        for max_distance in (0.3, 2.0, 50.0):
+            result = self.analyzer.find_stops_for_consolidation(max_distance=max_distance)
+            expected = self.legacy_pairs(max_distance)
+            self.assertEqual(len(result), len(expected))
+            for pair, (distance, id1, id2) in zip(result, expected):
+                self.assertAlmostEqual(pair['distance'], distance, places=9)
+                self.assertEqual({pair['keep_stop']['id'], pair['remove_stop']['id']}, {id1, id2})
+
+    def test_zero_distance_keeps_duplicates_only(self):
+        stops = self.analyzer.network.stops
+        stops['dup'] = Stop('dup', 'Dup', stops['0'].latitude, stops['0'].longitude, ZoneType.MIXED)
+        result = self.analyzer.find_stops_for_consolidation(max_distance=0)
+        self.assertEqual([{p['keep_stop']['id'], p['remove_stop']['id']} for p in result], [{'0', 'dup'}])
+
+
+
+class TestSuggestNewStopsFallback(unittest.TestCase):
+    def setUp(self):
+        import random
+        random.seed(9)
+        # 没有线路的网络：所有建议都来自第二轮（两两比较）
+        network = MockNetwork()
+        network.stops = {}
+        network.adjacency_list = {}
+        for i in range(120):
+            stop = Stop(str(i), f'S{i}', 48.70 + random.uniform(0, 0.25), 2.10 + random.uniform(0, 0.4), ZoneType.MIXED)
+            network.stops[stop.stop_ID] = stop
+            network.adjacency_list[stop.stop_ID] = []
+        data_manager = MockDataManager()
+        data_manager.network = network
+        self.analyzer = StopUtilizationAnalyzer(data_manager)
+        self.analyzer.generate_random_data()
+        self.analyzer.calculate_stop_efficiency()
+
+    def reference(self, num_suggestions):
+        import numpy as np
+        analyzer = self.analyzer
+        stops = list(analyzer.network.stops.values())
+        threshold = np.percentile(list(analyzer.utilization_scores.values()), 60)
+        high = [(analyzer.network.stops[s], v) for s, v in analyzer.utilization_scores.items() if v > threshold]
+        high.sort(key=lambda x: x[1], reverse=True)
+        result = []
+        for stop, score in high:
+            for other in stops:
+                if other is stop:
+                    continue
+                distance = analyzer._calculate_distance(stop.latitude, stop.longitude, other.latitude, other.longitude)
+                if not 1.5 < distance < 4.0:
+                    continue
+                mid_lat = (stop.latitude + other.latitude) / 2
+                mid_lon = (stop.longitude + other.longitude) / 2
+                if all(analyzer._calculate_distance(mid_lat, mid_lon, s.latitude, s.longitude) >= 1.0 for s in stops):
+                    result.append(((mid_lat, mid_lon), [stop.name, other.name], score * 0.8))
+        result.sort(key=lambda x: x[2], reverse=True)
+        return result[:num_suggestions]
+
+    def test_matches_exhaustive_search(self):
+        for num_suggestions in (1, 3, 8):
+            expected = self.reference(num_suggestions)
+            self.assertEqual(len(expected), num_suggestions)
+            result = self.analyzer.suggest_new_stops(num_suggestions=num_suggestions)
+            self.assertEqual([(s['latitude'], s['longitude']) for s in result], [e[0] for e in expected])
+            self.assertEqual([s['connects'] for s in result], [e[1] for e in expected])
+            self.assertEqual([s['score'] for s in result], [e[2] for e in expected])
+
+    def test_geo_index_source(self):
+        from project.data_structures.spatial_index import GeoGridIndex
+        built = self.analyzer._get_geo_index()
+        self.assertEqual(len(built), 120)
+        index = GeoGridIndex()
+        self.analyzer.data_manager.geo_index = index
+        self.assertIs(self.analyzer._get_geo_index(), index)
+
+
+
+class TestAnalyzerWithStopTable(unittest.TestCase):
+    """network.stops 为列式 StopTable 时结果与普通字典相同"""
+    def setUp(self):
+        import random
+        from project.data_structures.stop_table import StopTable
+        random.seed(11)
+        self.analyzers = []
+        stops = [Stop(str(i), f'S{i}', 48.80 + random.uniform(0, 0.1), 2.20 + random.uniform(0, 0.2),
+                      random.choice(list(ZoneType))) for i in range(80)]
+        for table in (False, True):
+            network = MockNetwork()
+            network.stops = StopTable.from_stops(stops) if table else {s.stop_ID: s for s in stops}
+            network.adjacency_list = {s.stop_ID: [] for s in stops}
+            data_manager = MockDataManager()
+            data_manager.network = network
+            analyzer = StopUtilizationAnalyzer(data_manager)
+            analyzer.generate_random_data()
+            self.analyzers.append(analyzer)
+
+    def test_same_results(self):
+        plain, columnar = self.analyzers
+        self.assertEqual(plain.optimize_network(), columnar.optimize_network())
+        self.assertEqual(plain._is_location_safe_for_new_stop(48.85, 2.3, 1.0),
+                         columnar._is_location_safe_for_new_stop(48.85, 2.3, 1.0))
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
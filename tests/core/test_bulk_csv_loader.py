@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from project.core.bulk_csv_loader import load_stops_bulk, load_routes_bulk
+from project.core.csv_network_data_manager import NetworkDataManager
+from project.data_structures.stop_entity import ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+STOPS = ('stop_id,name,latitude,longitude,zone_type\n'
+         '1,A,48.85,2.35,RESIDENTIAL\n'
+         '2,B,48.86,2.36,COMMERCIAL\n'
+         '3,C,48.87,2.37,MIXED\n'
+         '4,D,48.88,2.38,INDUSTRIAL\n')
+ROUTES = ('start_stop_id,end_stop_id,distance\n'
+          '1,2,1.0\n2,3,2.0\n3,1,3.0\n1,4,0.5\n4,1,0.5\n')
+
+
+class TestBulkCsvLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content, newline=None):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(content)
+        return path
+
+    def test_matches_row_by_row_loading(self):
+        stops_path, routes_path = self.write('s.csv', STOPS), self.write('r.csv', ROUTES)
+        legacy = NetworkDataManager(stops_path, routes_path)
+        bulk = NetworkDataManager(stops_path, routes_path, bulk_load=True)
+        self.assertEqual(bulk.stations, legacy.stations)
+        self.assertEqual(bulk.distances, legacy.distances)
+        self.assertEqual(bulk.station_name_to_id, legacy.station_name_to_id)
+        self.assertEqual(bulk.network.adjacency_list, legacy.network.adjacency_list)
+        self.assertEqual(bulk.network.reverse_adjacency, legacy.network.reverse_adjacency)
+        self.assertIsNone(legacy.load_summary)
+        self.assertEqual(bulk.load_summary['routes'].loaded, 5)
+        self.assertEqual(bulk.load_summary['stops'].rejected, [])
+        columnar = NetworkDataManager(stops_path, routes_path, columnar_stops=True, bulk_load=True)
+        self.assertEqual(columnar.stations, legacy.stations)
+
+    def test_rejected_rows_are_reported(self):
+        stops_path = self.write('s.csv', STOPS + '5,E,not-a-number,2.0,MIXED\n2,Dup,0,0,MIXED\n6,F,1.0\n\n7,G,1,2,UNKNOWN\n')
+        routes_path = self.write('r.csv', ROUTES + '1,2,9.0\n1,99,1.0\n99,1,1.0\n2,4,-1\n2,4,x\n3\n3,4,1.5\n')
+        manager = NetworkDataManager(stops_path, routes_path, bulk_load=True)
+        stops_summary = manager.load_summary['stops']
+        self.assertEqual(stops_summary.total_rows, 8)
+        self.assertEqual(stops_summary.loaded, 5)
+        self.assertEqual([(r['line'], r['reason']) for r in stops_summary.rejected], [
+            (6, "Invalid latitude: 'not-a-number'"),
+            (7, "Stop with ID 2 already exists"),
+            (8, "Missing fields"),
+        ])
+        self.assertEqual(stops_summary.rejected[1]['row'], ['2', 'Dup', '0', '0', 'MIXED'])
+        self.assertEqual(manager.network.get_stop_by_id('7').zone_type, ZoneType.MIXED)
+        routes_summary = manager.load_summary['routes']
+        self.assertEqual(routes_summary.total_rows, 12)
+        self.assertEqual(routes_summary.loaded, 6)
+        self.assertEqual([(r['line'], r['reason']) for r in routes_summary.rejected], [
+            (7, "Route from 1 to 2 already exists"),
+            (8, "To stop not found in network"),
+            (9, "From stop not found in network"),
+            (10, "Distance must be non-negative"),
+            (11, "Invalid distance: 'x'"),
+            (12, "Missing fields"),
+        ])
+        self.assertEqual(routes_summary.reason_counts()["Missing fields"], 1)
+        self.assertEqual(manager.distances[('1', '2')], 1.0)
+        self.assertEqual(manager.distances[('3', '4')], 1.5)
+        self.assertEqual(routes_summary.to_dict()['loaded'], 6)
+
+    def test_quoted_fields_and_crlf(self):
+        stops_path = self.write('s.csv', STOPS.replace('\n', '\r\n').replace('1,A,', '1,"Gare, Nord",'), newline='')
+        routes_path = self.write('r.csv', ROUTES.replace('\n', '\r\n'), newline='')
+        network = TransportNetwork()
+        summary = load_stops_bulk(network, stops_path, lambda zone: ZoneType[zone])
+        self.assertEqual(summary.loaded, 4)
+        self.assertEqual(network.get_stop_by_id('1').name, 'Gare, Nord')
+        self.assertEqual(network.get_stop_by_id('4').zone_type, ZoneType.INDUSTRIAL)
+        summary = load_routes_bulk(network, routes_path)
+        self.assertEqual((summary.loaded, summary.rejected), (5, []))
+        self.assertEqual(network.adjacency_list['1'], [('2', 1.0), ('4', 0.5)])
+
+    def test_convert_id_and_empty_file(self):
+        network = TransportNetwork()
+        network.add_stop_columns([1, 2], ['A', 'B'], [0.0, 0.0], [0.0, 0.0], [ZoneType.MIXED] * 2)
+        routes_path = self.write('r.csv', 'start_stop_id,end_stop_id,distance\n1,2,1.0\na,2,1.0\n')
+        summary = load_routes_bulk(network, routes_path, convert_id=int)
+        self.assertEqual(network.adjacency_list[1], [(2, 1.0)])
+        self.assertEqual([r['line'] for r in summary.rejected], [3])
+        empty = load_routes_bulk(network, self.write('e.csv', 'start_stop_id,end_stop_id,distance\n'))
+        self.assertEqual((empty.total_rows, empty.loaded), (0, 0))
+
+    def test_missing_column(self):
+        path = self.write('r.csv', 'start_stop_id,distance\n1,1.0\n')
+        with self.assertRaises(ValueError):
+            load_routes_bulk(TransportNetwork(), path)
+
+    def test_missing_file(self):
+        stops_path = self.write('s.csv', STOPS)
+        with self.assertRaises(FileNotFoundError):
+            NetworkDataManager(stops_path, os.path.join(self.tmpdir.name, 'missing.csv'), bulk_load=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import csv
+import os
+import tempfile
+import unittest
+from project.core.change_journal import ChangeJournal, apply_change, write_csv_atomic
+from project.core.csv_network_data_manager import NetworkDataManager
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+STOPS = ('stop_id,name,latitude,longitude,zone_type\n'
+         '1,A,48.85,2.35,RESIDENTIAL\n'
+         '2,B,48.86,2.36,COMMERCIAL\n'
+         '3,C,48.87,2.37,MIXED\n')
+ROUTES = 'start_stop_id,end_stop_id,distance\n1,2,1.00\n2,3,2.00\n'
+
+
+class TestChangeJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'changes.jsonl')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_append_and_read(self):
+        journal = ChangeJournal(self.path)
+        self.assertEqual((journal.read(), len(journal)), ([], 0))
+        journal.append([{'op': 'remove_stop', 'id': '1'}])
+        journal.append([])
+        journal.append([{'op': 'remove_route', 'from': '2', 'to': '3'}])
+        self.assertEqual(len(journal), 2)
+        # 写入中途崩溃留下的半行被忽略
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "add_ro')
+        reopened = ChangeJournal(self.path)
+        self.assertEqual(reopened.read(), [{'op': 'remove_stop', 'id': '1'},
+                                           {'op': 'remove_route', 'from': '2', 'to': '3'}])
+        reopened.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(reopened), 0)
+
+    def test_apply_change_is_idempotent(self):
+        network = TransportNetwork()
+        network.add_stop(Stop('1', 'A', 0, 0, ZoneType.MIXED))
+        entries = [
+            {'op': 'add_stop', 'id': '2', 'name': 'B', 'lat': 1.0, 'lon': 2.0, 'zone': 'COMMERCIAL'},
+            {'op': 'add_route', 'from': '1', 'to': '2', 'distance': 3.0},
+            {'op': 'add_route', 'from': '1', 'to': '2', 'distance': 4.0},
+            {'op': 'set_zone', 'id': '1', 'zone': 'INDUSTRIAL'},
+            {'op': 'remove_route', 'from': '2', 'to': '1'},
+            {'op': 'remove_stop', 'id': '9'},
+        ]
+        for _ in range(2):
+            for entry in entries:
+                apply_change(network, entry)
+            self.assertEqual(list(network.stops), ['1', '2'])
+            self.assertEqual(network.get_route_distance('1', '2'), 4.0)
+            self.assertEqual(network.stops['1'].zone_type, ZoneType.INDUSTRIAL)
+        with self.assertRaises(ValueError):
+            apply_change(network, {'op': 'rename'})
+
+    def test_failed_write_keeps_original(self):
+        target = os.path.join(self.tmpdir.name, 'routes.csv')
+        write_csv_atomic(target, ['a', 'b'], iter([(1, 2)]))
+
+        def rows():
+            yield (3, 4)
+            raise RuntimeError("crash")
+
+        with self.assertRaises(RuntimeError):
+            write_csv_atomic(target, ['a', 'b'], rows())
+        with open(target, encoding='utf-8', newline='') as f:
+            self.assertEqual(list(csv.reader(f)), [['a', 'b'], ['1', '2']])
+        self.assertEqual(os.listdir(self.tmpdir.name), ['routes.csv'])
+
+
+class TestJournaledSave(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stops_path = self.write('stops.csv', STOPS)
+        self.routes_path = self.write('routes.csv', ROUTES)
+        self.journal_path = os.path.join(self.tmpdir.name, 'changes.jsonl')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def manager(self, **kwargs):
+        return NetworkDataManager(self.stops_path, self.routes_path, journal_path=self.journal_path, **kwargs)
+
+    def edit(self, manager):
+        manager.add_station('D', 100, 100, 'Industrial')
+        manager.add_connection('C', 'D', 2.5)
+        manager.remove_connection('A', 'B')
+        manager.update_station_type('B', 'Mixed')
+        manager.remove_station('A')
+
+    def test_save_appends_to_journal_and_reload_replays(self):
+        manager = self.manager()
+        self.edit(manager)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        # CSV不变，修改只写入日志
+        self.assertEqual((self.read(self.stops_path), self.read(self.routes_path)), (STOPS, ROUTES))
+        self.assertEqual(len(manager.journal), 5)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        self.assertEqual(len(manager.journal), 5)
+
+        # 重新加载时重放日志，但不改写CSV
+        reloaded = self.manager()
+        self.assertEqual(reloaded.distances, manager.distances)
+        self.assertEqual(reloaded.station_name_to_id, manager.station_name_to_id)
+        self.assertEqual(reloaded.network.stops['2'].zone_type, ZoneType.MIXED)
+        self.assertEqual((self.read(self.stops_path), self.read(self.routes_path)), (STOPS, ROUTES))
+        self.assertEqual(len(reloaded.journal), 5)
+        # close() 时才合并回CSV
+        self.assertTrue(reloaded.close())
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertFalse(reloaded.close())
+        plain = NetworkDataManager(self.stops_path, self.routes_path)
+        self.assertEqual(plain.distances, manager.distances)
+        self.assertEqual(plain.stations, manager.stations)
+
+    def test_compaction(self):
+        manager = self.manager()
+        manager.JOURNAL_COMPACT_ENTRIES = 3
+        self.edit(manager)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(NetworkDataManager(self.stops_path, self.routes_path).distances, manager.distances)
+        manager.add_connection('D', 'C', 1.0)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        self.assertEqual(len(manager.journal), 1)
+        manager.save_data_to_csv(self.stops_path, self.routes_path, compact=True)
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertIn('4,3,1.0\n', self.read(self.routes_path))
+
+    def test_compaction_keeps_exact_distances(self):
+        manager = self.manager()
+        manager.add_connection('C', 'A', 2.345)
+        manager.add_connection('A', 'C', 1 / 3)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        replayed = self.manager()
+        self.assertTrue(replayed.close())
+        # 合并写出的CSV与重放得到的网络完全一致，不因保留两位小数而改变距离
+        self.assertEqual(NetworkDataManager(self.stops_path, self.routes_path).distances, replayed.distances)
+        self.assertEqual(replayed.distances[('1', '3')], 1 / 3)
+
+    def test_close_keeps_unsaved_changes_out_of_csv(self):
+        manager = self.manager()
+        self.edit(manager)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        manager.add_connection('D', 'C', 1.0)
+        self.assertFalse(manager.close())
+        self.assertEqual(self.read(self.routes_path), ROUTES)
+        self.assertEqual(len(manager.journal), 5)
+        self.assertFalse(NetworkDataManager(self.stops_path, self.routes_path).close())
+
+    def test_read_only_rejects_journal(self):
+        with self.assertRaises(ValueError):
+            self.manager(snapshot_dir=os.path.join(self.tmpdir.name, 'snapshot'), read_only=True)
+
+    def test_save_to_other_paths_keeps_journal(self):
+        manager = self.manager()
+        self.edit(manager)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        export_dir = os.path.join(self.tmpdir.name, 'export')
+        stops_copy = os.path.join(export_dir, 'stops.csv')
+        routes_copy = os.path.join(export_dir, 'routes.csv')
+        manager.save_data_to_csv(stops_copy, routes_copy)
+        self.assertEqual(NetworkDataManager(stops_copy, routes_copy).distances, manager.distances)
+        self.assertEqual(len(manager.journal), 5)
+
+    def test_snapshot_follows_replayed_journal(self):
+        snapshot_dir = os.path.join(self.tmpdir.name, 'snapshot')
+        manager = self.manager(snapshot_dir=snapshot_dir)
+        self.edit(manager)
+        manager.save_data_to_csv(self.stops_path, self.routes_path)
+        # 日志未合并时不能直接使用旧CSV的快照
+        replayed = self.manager(snapshot_dir=snapshot_dir)
+        self.assertFalse(replayed.loaded_from_snapshot)
+        self.assertEqual(replayed.distances, manager.distances)
+        self.assertFalse(self.manager(snapshot_dir=snapshot_dir).loaded_from_snapshot)
+        # 合并后第一次加载按新的CSV重新生成快照，之后直接使用
+        replayed.close()
+        self.assertFalse(self.manager(snapshot_dir=snapshot_dir).loaded_from_snapshot)
+        cached = self.manager(snapshot_dir=snapshot_dir)
+        self.assertTrue(cached.loaded_from_snapshot)
+        self.assertEqual(cached.distances, manager.distances)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -228,11 +228,13 @@ class TestCSVNetworkDataManager(unittest.TestCase):
         mock_file = mock_open()
         with patch('builtins.open', mock_file):
             with patch('os.path.exists', return_value=True):
-                with patch('os.makedirs'):
+                with patch('os.makedirs'), patch('os.fsync'), patch('os.replace') as mock_replace:
                     self.manager.save_data_to_csv('test_stops.csv', 'test_routes.csv')
         
         # 驗證文件被正確打開
         self.assertTrue(mock_file.called)
+        # 先寫臨時文件再替換目標文件
+        self.assertEqual([c.args[1] for c in mock_replace.call_args_list], ['test_stops.csv', 'test_routes.csv'])
 
     def test_save_data_to_csv_create_directory(self):
         """測試保存時創建目錄"""
@@ -243,7 +245,7 @@ class TestCSVNetworkDataManager(unittest.TestCase):
         mock_file = mock_open()
         with patch('builtins.open', mock_file):
             with patch('os.path.exists', return_value=False):
-                with patch('os.makedirs') as mock_makedirs:
+                with patch('os.makedirs') as mock_makedirs, patch('os.fsync'), patch('os.replace'):
                     self.manager.save_data_to_csv('test_stops.csv', 'test_routes.csv')
         
         # 驗證目錄創建被調用
@@ -285,5 +287,91 @@ class TestCSVNetworkDataManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.manager.add_connection('A', 'B', 5.0)
 
+class TestNetworkDataManagerViewCache(unittest.TestCase):
+    columnar_stops = False
+
+    def setUp(self):
+        import tempfile, os
+        self.tmpdir = tempfile.TemporaryDirectory()
+        stops_path = os.path.join(self.tmpdir.name, 'stops.csv')
+        routes_path = os.path.join(self.tmpdir.name, 'routes.csv')
+        with open(stops_path, 'w', encoding='utf-8') as f:
+            f.write('stop_id,name,latitude,longitude,zone_type\n1,A,48.85,2.35,RESIDENTIAL\n'
+                    '2,B,48.86,2.36,COMMERCIAL\n3,C,48.87,2.37,MIXED\n')
+        with open(routes_path, 'w', encoding='utf-8') as f:
+            f.write('start_stop_id,end_stop_id,distance\n1,2,1.0\n2,3,2.0\n3,1,3.0\n')
+        self.manager = NetworkDataManager(stops_path, routes_path, columnar_stops=self.columnar_stops)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assert_views_match_rebuild(self):
+        stations, distances = self.manager.stations, self.manager.distances
+        self.manager.invalidate_views()
+        self.assertEqual(stations, self.manager.stations)
+        self.assertEqual(distances, self.manager.distances)
+
+    def test_views_cached_between_accesses(self):
+        self.assertIs(self.manager.stations, self.manager.stations)
+        self.assertIs(self.manager.distances, self.manager.distances)
+
+    def test_incremental_updates(self):
+        stations = self.manager.stations
+        self.manager.add_station('D', 100, 100, 'Industrial')
+        self.assertIs(self.manager.stations, stations)
+        self.assertIn('4', stations)
+        self.manager.add_connection('D', 'A', 4.0)
+        self.assertEqual(self.manager.distances[('4', '1')], 4.0)
+        self.assertEqual(stations['4']['connections'], ['1'])
+        self.manager.update_station_type('D', 'Commercial')
+        self.assertEqual(stations['4']['type'], ZoneType.COMMERCIAL.value)
+        self.manager.remove_connection('A', 'B')
+        self.assertNotIn(('1', '2'), self.manager.distances)
+        self.manager.remove_station('C')
+        self.assertNotIn('3', stations)
+        self.assertEqual(stations['2']['connections'], [])
+        self.assertIs(self.manager.stations, stations)
+        self.assert_views_match_rebuild()
+
+    def test_direct_network_change_rebuilds(self):
+        stations = self.manager.stations
+        self.manager.network.remove_route('1', '2')
+        self.assertIsNot(self.manager.stations, stations)
+        self.assertEqual(self.manager.stations['1']['connections'], [])
+
+    def test_spatial_indexes_follow_changes(self):
+        geo_index, gui_index = self.manager.geo_index, self.manager.gui_index
+        self.assertEqual(len(geo_index), 3)
+        self.assertEqual(geo_index.nearest(48.851, 2.351)[0], '1')
+        self.manager.add_station('D', 100, 100, 'Mixed')
+        self.assertIs(self.manager.gui_index, gui_index)
+        self.assertEqual(gui_index.nearest(101, 99)[0], '4')
+        self.assertIn('4', geo_index)
+        self.manager.remove_station('A')
+        self.assertNotIn('1', geo_index)
+        self.assertNotIn('1', gui_index)
+        self.manager.network.remove_route('2', '3')
+        self.assertIsNot(self.manager.geo_index, geo_index)
+        self.assertEqual(len(self.manager.geo_index), 3)
+
+    def test_get_incoming_connections(self):
+        self.assertEqual(self.manager.get_incoming_connections('1'), [('3', 3.0)])
+        self.assertEqual(self.manager.get_incoming_connections('99'), [])
+
+
+
+class TestNetworkDataManagerColumnarStops(TestNetworkDataManagerViewCache):
+    """站点保存在 StopTable 中时，视图缓存与增量更新的行为不变"""
+    columnar_stops = True
+
+    def test_network_uses_stop_table(self):
+        from project.data_structures.stop_table import StopTable, StopView
+        stops = self.manager.network.stops
+        self.assertIsInstance(stops, StopTable)
+        self.assertIsInstance(stops['2'], StopView)
+        self.assertEqual(stops['2'], Stop('2', 'B', 48.86, 2.36, ZoneType.COMMERCIAL))
+        self.manager.update_station_type('B', 'Industrial')
+        self.assertEqual(stops['2'].zone_type, ZoneType.INDUSTRIAL)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,177 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from project.core.csv_network_data_manager import NetworkDataManager
+from project.algorithms.dfs_all_paths_algorithm import find_all_paths
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra
+from project.core.network_snapshot import (csv_content_hash, load_snapshot, save_snapshot, read_manifest,
+                                           open_mapped_network, MANIFEST_NAME, SNAPSHOT_FORMAT_VERSION)
+from project.data_structures.mapped_network import MappedNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.stop_table import StopTable
+from project.data_structures.transport_network_structure import TransportNetwork
+
+STOPS = ('stop_id,name,latitude,longitude,zone_type\n'
+         '1,Gare du Nord,48.85,2.35,RESIDENTIAL\n'
+         '2,Châtelet,48.86,2.36,COMMERCIAL\n'
+         '3,C,48.87,2.37,MIXED\n'
+         '4,D,48.88,2.38,INDUSTRIAL\n')
+ROUTES = ('start_stop_id,end_stop_id,distance\n'
+          '1,2,1.0\n3,2,2.5\n2,3,2.0\n3,1,3.0\n1,4,0.5\n4,1,0.5\n')
+
+
+def _worker_query(network, start, end, results):
+    path, distance = dijkstra(network, start, end)
+    results.put(([stop.stop_ID for stop in path], distance))
+
+
+class TestNetworkSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_dir = os.path.join(self.tmpdir.name, 'snapshot')
+        self.stops_path = self.write('stops.csv', STOPS)
+        self.routes_path = self.write('routes.csv', ROUTES)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def assert_same_network(self, loaded, original):
+        self.assertEqual(list(loaded.stops), list(original.stops))
+        for stop_id in original.stops:
+            self.assertEqual(loaded.stops[stop_id], original.stops[stop_id])
+        self.assertEqual(loaded.adjacency_list, original.adjacency_list)
+        self.assertEqual(loaded.reverse_adjacency, original.reverse_adjacency)
+
+    def test_round_trip(self):
+        network = NetworkDataManager(self.stops_path, self.routes_path).network
+        save_snapshot(network, self.snapshot_dir, 'abc')
+        for columnar in (False, True):
+            loaded = load_snapshot(self.snapshot_dir, 'abc', columnar_stops=columnar)
+            self.assert_same_network(loaded, network)
+            self.assertEqual(isinstance(loaded.stops, StopTable), columnar)
+            csr = loaded.to_csr()
+            self.assertEqual(csr.stop_ids, network.to_csr().stop_ids)
+            self.assertEqual(csr.neighbor_lists(), network.to_csr().neighbor_lists())
+            # 修改后的网络照常工作，CSR视图随版本号重建
+            loaded.add_route('2', '1', 4.0)
+            self.assertIsNot(loaded.to_csr(), csr)
+            self.assertEqual(loaded.reverse_adjacency['1'][-1], ('2', 4.0))
+
+    def test_int_ids_and_empty_network(self):
+        network = TransportNetwork()
+        network.add_stop(Stop(10, 'A', 1.0, 2.0, ZoneType.URBAN))
+        network.add_stop(Stop(20, 'B', 3.0, 4.0, ZoneType.MIXED))
+        network.add_route(20, 10, 1.5)
+        save_snapshot(network, self.snapshot_dir, 'h')
+        self.assert_same_network(load_snapshot(self.snapshot_dir), network)
+        save_snapshot(TransportNetwork(), self.snapshot_dir, 'empty')
+        self.assertEqual(load_snapshot(self.snapshot_dir, 'empty').adjacency_list, {})
+        mixed = TransportNetwork()
+        mixed.add_stop(Stop(1, 'A', 0, 0, ZoneType.MIXED))
+        mixed.add_stop(Stop('2', 'B', 0, 0, ZoneType.MIXED))
+        with self.assertRaises(ValueError):
+            save_snapshot(mixed, self.snapshot_dir, 'mixed')
+
+    def test_stale_or_broken_snapshot_is_ignored(self):
+        network = NetworkDataManager(self.stops_path, self.routes_path).network
+        save_snapshot(network, self.snapshot_dir, 'abc')
+        self.assertIsNone(load_snapshot(self.snapshot_dir, 'other'))
+        self.assertIsNone(load_snapshot(os.path.join(self.tmpdir.name, 'missing')))
+        manifest_path = os.path.join(self.snapshot_dir, MANIFEST_NAME)
+        manifest = read_manifest(self.snapshot_dir)
+        self.assertEqual(manifest['format_version'], SNAPSHOT_FORMAT_VERSION)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(manifest, format_version=SNAPSHOT_FORMAT_VERSION + 1), f)
+        self.assertIsNone(load_snapshot(self.snapshot_dir, 'abc'))
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.remove(os.path.join(self.snapshot_dir, 'weights.npy'))
+        self.assertIsNone(load_snapshot(self.snapshot_dir, 'abc'))
+
+    def test_manager_reuses_snapshot_until_csv_changes(self):
+        first = NetworkDataManager(self.stops_path, self.routes_path, snapshot_dir=self.snapshot_dir)
+        self.assertFalse(first.loaded_from_snapshot)
+        second = NetworkDataManager(self.stops_path, self.routes_path, snapshot_dir=self.snapshot_dir)
+        self.assertTrue(second.loaded_from_snapshot)
+        self.assert_same_network(second.network, first.network)
+        self.assertEqual(second.stations, first.stations)
+        self.assertEqual(second.distances, first.distances)
+        self.assertEqual(second.station_name_to_id, first.station_name_to_id)
+        columnar = NetworkDataManager(self.stops_path, self.routes_path, columnar_stops=True,
+                                      snapshot_dir=self.snapshot_dir)
+        self.assertTrue(columnar.loaded_from_snapshot)
+        self.assertIsInstance(columnar.network.stops, StopTable)
+        # 修改CSV后快照过期，重新解析并更新快照
+        old_hash = csv_content_hash(self.stops_path, self.routes_path)
+        self.write('routes.csv', ROUTES + '2,4,9.0\n')
+        self.assertNotEqual(csv_content_hash(self.stops_path, self.routes_path), old_hash)
+        third = NetworkDataManager(self.stops_path, self.routes_path, snapshot_dir=self.snapshot_dir)
+        self.assertFalse(third.loaded_from_snapshot)
+        self.assertEqual(third.distances[('2', '4')], 9.0)
+        fourth = NetworkDataManager(self.stops_path, self.routes_path, snapshot_dir=self.snapshot_dir)
+        self.assertTrue(fourth.loaded_from_snapshot)
+        self.assertEqual(fourth.distances, third.distances)
+
+    def test_open_mapped_network(self):
+        network = NetworkDataManager(self.stops_path, self.routes_path).network
+        save_snapshot(network, self.snapshot_dir, 'abc')
+        mapped = open_mapped_network(self.snapshot_dir, 'abc')
+        self.assertIsInstance(mapped, MappedNetwork)
+        self.assertEqual(list(mapped.stops), list(network.stops))
+        for stop_id in network.stops:
+            self.assertEqual(mapped.stops[stop_id], network.stops[stop_id])
+            self.assertEqual(list(mapped.adjacency_list[stop_id]), list(network.adjacency_list[stop_id]))
+            self.assertEqual(list(mapped.reverse_adjacency[stop_id]), list(network.reverse_adjacency[stop_id]))
+        self.assertEqual(mapped.stops.names(), [stop.name for stop in network.stops.values()])
+        for start, end in [('1', '3'), ('4', '3'), ('3', '4')]:
+            path, distance = dijkstra(mapped, start, end)
+            expected_path, expected_distance = dijkstra(network, start, end)
+            self.assertEqual(distance, expected_distance)
+            self.assertEqual([s.stop_ID for s in path], [s.stop_ID for s in expected_path])
+            self.assertEqual(len(find_all_paths(mapped, start, end)), len(find_all_paths(network, start, end)))
+        self.assertIsNone(open_mapped_network(self.snapshot_dir, 'other'))
+        self.assertIsNone(open_mapped_network(os.path.join(self.tmpdir.name, 'missing')))
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'fork not available')
+    def test_forked_workers_share_mapped_network(self):
+        network = NetworkDataManager(self.stops_path, self.routes_path).network
+        save_snapshot(network, self.snapshot_dir, 'abc')
+        mapped = open_mapped_network(self.snapshot_dir, 'abc')
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=_worker_query, args=(mapped, start, '3', results))
+                   for start in ('1', '4')]
+        for worker in workers:
+            worker.start()
+        collected = sorted(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(collected, [(['1', '2', '3'], 3.0), (['4', '1', '2', '3'], 3.5)])
+
+    def test_manager_read_only_uses_mapped_network(self):
+        with self.assertRaises(ValueError):
+            NetworkDataManager(self.stops_path, self.routes_path, read_only=True)
+        expected = NetworkDataManager(self.stops_path, self.routes_path)
+        # 第一次解析CSV并写入快照，之后两次都直接映射快照
+        for loaded in (False, True):
+            manager = NetworkDataManager(self.stops_path, self.routes_path, snapshot_dir=self.snapshot_dir,
+                                         read_only=True)
+            self.assertEqual(manager.loaded_from_snapshot, loaded)
+            self.assertIsInstance(manager.network, MappedNetwork)
+            self.assertEqual(manager.stations, expected.stations)
+            self.assertEqual(manager.distances, expected.distances)
+            self.assertEqual(manager.station_name_to_id, expected.station_name_to_id)
+        with self.assertRaises(TypeError):
+            manager.add_connection('C', 'D', 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
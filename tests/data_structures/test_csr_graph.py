@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from project.data_structures.csr_graph import CSRGraph
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.data_structures.stop_entity import Stop, ZoneType
+
+class TestCSRGraph(unittest.TestCase):
+    def setUp(self):
+        # 1 --2--> 2 --3--> 3,  1 --7--> 3,  3 --1--> 1
+        self.network = TransportNetwork()
+        for i in (1, 2, 3):
+            self.network.add_stop(Stop(i, f'S{i}', 0, 0, ZoneType.MIXED))
+        self.network.add_route(1, 2, 2.0)
+        self.network.add_route(1, 3, 7.0)
+        self.network.add_route(2, 3, 3.0)
+        self.network.add_route(3, 1, 1.0)
+        self.graph = CSRGraph.from_network(self.network)
+
+    def test_layout(self):
+        self.assertEqual(self.graph.stop_ids, [1, 2, 3])
+        self.assertEqual(self.graph.offsets.tolist(), [0, 2, 3, 4])
+        self.assertEqual(self.graph.targets.tolist(), [1, 2, 2, 0])
+        self.assertEqual(self.graph.weights.tolist(), [2.0, 7.0, 3.0, 1.0])
+        self.assertEqual(self.graph.targets.dtype, np.int32)
+        self.assertEqual(self.graph.weights.dtype, np.float64)
+        self.assertEqual(self.graph.num_stops, 3)
+        self.assertEqual(self.graph.num_routes, 4)
+
+    def test_index_mapping(self):
+        self.assertEqual(self.graph.index_of(2), 1)
+        self.assertIsNone(self.graph.index_of(99))
+        self.assertEqual(self.graph.stop_id_of(2), 3)
+        self.assertIn(3, self.graph)
+        self.assertEqual(self.graph.get_stop_by_id(1).name, 'S1')
+
+    def test_neighbors_preserve_order(self):
+        self.assertEqual(self.graph.neighbors(0), [(1, 2.0), (2, 7.0)])
+        self.assertEqual(self.graph.out_degree(0), 2)
+        self.assertEqual(self.graph.neighbors(1), [(2, 3.0)])
+
+    def test_neighbor_lists_not_cached(self):
+        lists = self.graph.neighbor_lists()
+        self.assertEqual(lists, [[(1, 2.0), (2, 7.0)], [(2, 3.0)], [(0, 1.0)]])
+        # 逐边元组列表不挂在图上，避免随网络的CSR缓存长期占用内存
+        self.assertIsNot(self.graph.neighbor_lists(), lists)
+        self.assertFalse(hasattr(self.graph, '_neighbor_lists'))
+
+    def test_frozen(self):
+        with self.assertRaises(ValueError):
+            self.graph.weights[0] = 5.0
+
+    def test_reverse(self):
+        reverse = self.graph.reverse()
+        self.assertEqual(reverse.neighbors(2), [(0, 7.0), (1, 3.0)])
+        self.assertEqual(reverse.neighbors(0), [(2, 1.0)])
+        self.assertIs(reverse.reverse(), self.graph)
+
+    def test_invalid_arrays(self):
+        with self.assertRaises(ValueError):
+            CSRGraph([1, 2], [0, 1], [1], [1.0])
+        with self.assertRaises(ValueError):
+            CSRGraph([1], [0, 2], [0], [1.0])
+
+    def test_network_to_csr_cached_by_version(self):
+        csr = self.network.to_csr()
+        self.assertIs(self.network.to_csr(), csr)
+        self.network.remove_route(3, 1)
+        rebuilt = self.network.to_csr()
+        self.assertIsNot(rebuilt, csr)
+        self.assertEqual(rebuilt.num_routes, 3)
+
+if __name__ == '__main__':
+    unittest.main()
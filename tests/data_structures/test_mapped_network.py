@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+from project.algorithms.dfs_all_paths_algorithm import find_all_paths
+from project.algorithms.dijkstra_shortest_path_algorithm import dijkstra, bidirectional_dijkstra
+from project.data_structures.mapped_network import MappedNetwork, MappedStops
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.stop_table import ZONE_CODES
+from project.data_structures.transport_network_structure import TransportNetwork
+
+class TestMappedNetwork(unittest.TestCase):
+    def setUp(self):
+        self.network = TransportNetwork()
+        for stop_id, zone in (('a', ZoneType.RESIDENTIAL), ('b', ZoneType.COMMERCIAL),
+                              ('c', ZoneType.MIXED), ('d', ZoneType.INDUSTRIAL)):
+            self.network.add_stop(Stop(stop_id, stop_id.upper(), 1.0, 2.0, zone))
+        for a, b, d in [('a', 'b', 1.0), ('b', 'c', 2.0), ('a', 'c', 5.0), ('c', 'a', 1.5), ('d', 'a', 0.5)]:
+            self.network.add_route(a, b, d)
+        graph = self.network.to_csr()
+        # 与快照打开时相同：站点列按CSR下标排列，这里用普通数组代替内存映射
+        ordered = [self.network.stops[stop_id] for stop_id in graph.stop_ids]
+        stops = MappedStops(graph.stop_ids, graph.index, [stop.name for stop in ordered],
+                            np.array([stop.latitude for stop in ordered]),
+                            np.array([stop.longitude for stop in ordered]),
+                            np.array([ZONE_CODES[stop.zone_type] for stop in ordered], dtype=np.uint8))
+        self.mapped = MappedNetwork(graph, stops)
+
+    def test_same_interface_as_transport_network(self):
+        self.assertEqual(list(self.mapped.adjacency_list), list(self.network.adjacency_list))
+        for stop_id in self.network.adjacency_list:
+            self.assertEqual(self.mapped.adjacency_list[stop_id], self.network.adjacency_list[stop_id])
+            # 未提供转置图时由CSR计算，入边按起点下标排列
+            self.assertEqual(sorted(self.mapped.reverse_adjacency[stop_id]),
+                             sorted(self.network.reverse_adjacency[stop_id]))
+        self.assertEqual(self.mapped.adjacency_list.get('x', []), [])
+        stop = self.mapped.get_stop_by_id('b')
+        self.assertEqual((stop.stop_ID, stop.name, stop.zone_type), ('b', 'B', ZoneType.COMMERCIAL))
+        self.assertIsNone(self.mapped.get_stop_by_id('x'))
+        self.assertEqual(self.mapped.get_route_distance('c', 'a'), 1.5)
+        self.assertIsNone(self.mapped.get_route_distance('a', 'd'))
+        self.assertTrue(self.mapped.has_route('d', 'a'))
+        self.assertFalse(self.mapped.has_route('x', 'a'))
+        self.assertIs(self.mapped.to_csr(), self.mapped.to_csr())
+
+    def test_algorithms_match(self):
+        for start, end in [('a', 'c'), ('d', 'c'), ('c', 'd'), ('b', 'a')]:
+            expected_path, expected_distance = dijkstra(self.network, start, end)
+            for search in (dijkstra, bidirectional_dijkstra):
+                path, distance = search(self.mapped, start, end)
+                self.assertEqual(distance, expected_distance)
+                self.assertEqual(path and [s.stop_ID for s in path], expected_path and [s.stop_ID for s in expected_path])
+            self.assertEqual(
+                [([s.stop_ID for s in path], d) for path, d in find_all_paths(self.mapped, start, end)],
+                [([s.stop_ID for s in path], d) for path, d in find_all_paths(self.network, start, end)])
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            self.mapped.add_route('a', 'd', 1.0)
+        with self.assertRaises(TypeError):
+            self.mapped.remove_stop('a')
+        with self.assertRaises(TypeError):
+            self.mapped.adjacency_list['a'] = []
+        self.assertEqual(self.mapped.version, 0)
+
+if __name__ == '__main__':
+    unittest.main()
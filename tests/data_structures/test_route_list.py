@@ -0,0 +1,38 @@
+import unittest
+from project.data_structures.route_list import RouteList
+
+class TestRouteList(unittest.TestCase):
+    def setUp(self):
+        self.routes = RouteList([('b', 2.0), ('a', 1.0), ('c', 3.0)])
+
+    def test_behaves_like_list_of_tuples(self):
+        self.assertEqual(list(self.routes), [('b', 2.0), ('a', 1.0), ('c', 3.0)])
+        self.assertEqual(self.routes, [('b', 2.0), ('a', 1.0), ('c', 3.0)])
+        self.assertEqual(self.routes, RouteList([('b', 2.0), ('a', 1.0), ('c', 3.0)]))
+        self.assertNotEqual(self.routes, [('a', 1.0), ('b', 2.0), ('c', 3.0)])
+        self.assertEqual(RouteList(), [])
+        self.assertFalse(RouteList())
+        self.assertEqual(len(self.routes), 3)
+        self.assertEqual(self.routes[0], ('b', 2.0))
+        self.assertEqual(self.routes[-1], ('c', 3.0))
+        self.assertIn(('a', 1.0), self.routes)
+        self.assertNotIn(('a', 2.0), self.routes)
+        self.assertNotIn('a', self.routes)
+        self.assertEqual(repr(self.routes), repr([('b', 2.0), ('a', 1.0), ('c', 3.0)]))
+
+    def test_keyed_operations(self):
+        self.assertTrue(self.routes.has('a'))
+        self.assertEqual(self.routes.get('c'), 3.0)
+        self.assertIsNone(self.routes.get('x'))
+        self.routes.update('b', 5.0)
+        self.assertEqual(self.routes[0], ('b', 5.0))
+        with self.assertRaises(KeyError):
+            self.routes.update('x', 1.0)
+        self.assertEqual(self.routes.discard('a'), 1.0)
+        self.assertIsNone(self.routes.discard('a'))
+        self.assertEqual(list(self.routes.targets()), ['b', 'c'])
+        with self.assertRaises(ValueError):
+            self.routes.append(('b', 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
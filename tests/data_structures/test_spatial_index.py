@@ -0,0 +1,116 @@
+import math
+import random
+import unittest
+from project.data_structures.spatial_index import GridIndex, GeoGridIndex, pairs_within_distance
+from project.algorithms.coordinate_utils import CoordinateUtils
+
+class TestGridIndex(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.index = GridIndex(30)
+        self.points = {}
+        for i in range(300):
+            x, y = random.uniform(0, 1200), random.uniform(0, 900)
+            self.points[i] = (x, y)
+            self.index.insert(i, x, y)
+
+    def brute_radius(self, x, y, r):
+        return sorted(k for k, (px, py) in self.points.items() if math.hypot(x - px, y - py) <= r)
+
+    def test_radius_matches_brute_force(self):
+        for x, y, r in [(600, 450, 80), (0, 0, 200), (-50, 1000, 10), (300, 300, 0)]:
+            result = self.index.within_radius(x, y, r)
+            self.assertEqual(sorted(k for k, _ in result), self.brute_radius(x, y, r))
+            distances = [d for _, d in result]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_nearest(self):
+        for x, y in [(600, 450), (-500, -500), (2000, 100)]:
+            expected = min(self.points, key=lambda k: math.hypot(x - self.points[k][0], y - self.points[k][1]))
+            self.assertEqual(self.index.nearest(x, y)[0], expected)
+        self.assertIsNone(self.index.nearest(-500, -500, max_distance=10))
+        self.assertIsNone(GridIndex(10).nearest(0, 0))
+
+    def test_bbox(self):
+        expected = sorted(k for k, (x, y) in self.points.items() if 100 <= x <= 400 and 200 <= y <= 250)
+        self.assertEqual(sorted(self.index.within_bbox(100, 200, 400, 250)), expected)
+
+    def test_insert_moves_and_remove(self):
+        self.index.insert(0, 5000, 5000)
+        self.assertEqual(self.index.position_of(0), (5000, 5000))
+        self.assertEqual(self.index.nearest(5001, 5001)[0], 0)
+        self.index.remove(0)
+        self.index.remove(0)
+        self.assertNotIn(0, self.index)
+        self.assertEqual(len(self.index), 299)
+        self.assertFalse(self.index.any_within(5000, 5000, 100))
+
+    def test_invalid_cell_size(self):
+        with self.assertRaises(ValueError):
+            GridIndex(0)
+        with self.assertRaises(ValueError):
+            GeoGridIndex(-1)
+
+class TestGeoGridIndex(unittest.TestCase):
+    def test_matches_haversine_at_high_latitude(self):
+        random.seed(3)
+        index = GeoGridIndex(0.5)
+        points = {}
+        for i in range(500):
+            lat, lon = random.uniform(58, 72), random.uniform(-10, 10)
+            points[i] = (lat, lon)
+            index.insert(i, lat, lon)
+        for lat, lon, r in [(65, 0, 50), (70, 5, 200), (60, -9, 1)]:
+            expected = sorted(k for k, (a, b) in points.items()
+                              if CoordinateUtils.calculate_haversine_distance(lat, lon, a, b) <= r)
+            self.assertEqual(sorted(k for k, _ in index.within_radius(lat, lon, r)), expected)
+        nearest, distance = index.nearest(40, 0)
+        expected = min(points, key=lambda k: CoordinateUtils.calculate_haversine_distance(40, 0, *points[k]))
+        self.assertEqual(nearest, expected)
+
+    def test_wraps_across_antimeridian(self):
+        random.seed(5)
+        index = GeoGridIndex(0.7)
+        points = {}
+        for i in range(400):
+            lat, lon = random.uniform(-60, 60), random.choice([random.uniform(175, 180), random.uniform(-180, -175)])
+            points[i] = (lat, lon)
+            index.insert(i, lat, lon)
+        for i in range(100):
+            # 靠近极点时经度跨度被截为180°
+            lat, lon = random.uniform(88, 90), random.uniform(-180, 180)
+            points[400 + i] = (lat, lon)
+            index.insert(400 + i, lat, lon)
+        for lat, lon, r in [(0, 179.9, 150), (0, -179.9, 150), (30, 180, 300), (-45, -180, 80),
+                            (89.5, 10, 100), (89.9, -170, 30), (10, 0, 20000)]:
+            expected = sorted(k for k, (a, b) in points.items()
+                              if CoordinateUtils.calculate_haversine_distance(lat, lon, a, b) <= r)
+            self.assertEqual(sorted(k for k, _ in index.within_radius(lat, lon, r)), expected)
+        nearest = min(points, key=lambda k: CoordinateUtils.calculate_haversine_distance(0, 179.99, *points[k]))
+        self.assertEqual(index.nearest(0, 179.99)[0], nearest)
+
+    def test_any_within_is_strict(self):
+        index = GeoGridIndex()
+        index.insert('a', 48.85, 2.35)
+        distance = CoordinateUtils.calculate_haversine_distance(48.85, 2.35, 48.86, 2.35)
+        self.assertFalse(index.any_within(48.86, 2.35, distance))
+        self.assertTrue(index.any_within(48.86, 2.35, distance + 1e-6))
+
+class TestPairsWithinDistance(unittest.TestCase):
+    def test_matches_pairwise_haversine(self):
+        import numpy as np
+        rng = np.random.default_rng(2)
+        for span, max_distance in ((0.1, 1.0), (5.0, 20.0), (0.0, 0.0)):
+            lats = np.round(60 + rng.uniform(0, span, 400), 3)
+            lons = np.round(10 + rng.uniform(0, span, 400), 3)
+            expected = CoordinateUtils.pairwise_haversine(list(zip(lats, lons)), max_distance=max_distance)
+            result = pairs_within_distance(lats, lons, max_distance, chunk_size=97)
+            for a, b in zip(expected, result):
+                self.assertTrue(np.array_equal(a, b))
+
+    def test_degenerate_inputs(self):
+        self.assertEqual(len(pairs_within_distance([1.0], [2.0], 5)[0]), 0)
+        self.assertEqual(len(pairs_within_distance([1.0, 1.0], [2.0, 2.0], -1)[0]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
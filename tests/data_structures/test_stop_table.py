@@ -0,0 +1,123 @@
+import random
+import unittest
+import numpy as np
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.stop_table import StopTable, StopView, ZONE_CODES
+from project.data_structures.transport_network_structure import TransportNetwork
+from project.algorithms.coordinate_utils import CoordinateUtils
+
+class TestStopTable(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+        zones = list(ZoneType)
+        self.stops = [Stop(i, f'S{i}', random.uniform(-60, 60), random.uniform(-170, 170), random.choice(zones))
+                      for i in range(50)]
+        self.table = StopTable.from_stops(self.stops)
+
+    def test_views_match_stops(self):
+        self.assertEqual(len(self.table), 50)
+        self.assertEqual(list(self.table), [stop.stop_ID for stop in self.stops])
+        for stop in self.stops:
+            view = self.table[stop.stop_ID]
+            self.assertIsInstance(view, Stop)
+            self.assertEqual(view, stop)
+            self.assertEqual(hash(view), hash(stop))
+            self.assertEqual(repr(view), repr(stop))
+            self.assertEqual(self.table.to_stop(stop.stop_ID), stop)
+        self.assertIsNone(self.table.get(99))
+        with self.assertRaises(KeyError):
+            self.table[99]
+
+    def test_view_writes_through(self):
+        view = self.table[3]
+        view.name = 'Renamed'
+        view.latitude = 1.5
+        view.zone_type = ZoneType.URBAN
+        other = self.table[3]
+        self.assertEqual((other.name, other.latitude, other.zone_type), ('Renamed', 1.5, ZoneType.URBAN))
+        with self.assertRaises(TypeError):
+            view.zone_type = 'Urban'
+        with self.assertRaises(AttributeError):
+            view.stop_ID = 7
+
+    def test_columns(self):
+        lats, lons = self.table.coordinate_arrays()
+        expected = CoordinateUtils.stop_coordinate_arrays(self.stops)
+        np.testing.assert_array_equal(lats, expected[0])
+        np.testing.assert_array_equal(lons, expected[1])
+        self.assertFalse(lats.flags.writeable)
+        np.testing.assert_array_equal(self.table.zone_codes(), [ZONE_CODES[s.zone_type] for s in self.stops])
+        self.assertEqual(self.table.names(), [s.name for s in self.stops])
+        self.assertEqual(self.table.ids().tolist(), [s.stop_ID for s in self.stops])
+
+    def test_delete_and_compact(self):
+        view = self.table[40]
+        for stop_id in range(0, 30):
+            del self.table[stop_id]
+        self.assertNotIn(5, self.table)
+        self.assertEqual(self.table.names(), [f'S{i}' for i in range(30, 50)])
+        self.assertEqual(len(self.table.latitudes()), 20)
+        self.table[5] = self.stops[5]
+        self.assertEqual(list(self.table)[-1], 5)
+        self.table.compact()
+        self.assertEqual(self.table.row_of(30), 0)
+        # 压缩后旧视图重新定位到新的行
+        self.assertEqual(view, self.stops[40])
+        self.assertEqual(self.table[5], self.stops[5])
+        stale = self.table[31]
+        del self.table[31]
+        with self.assertRaises(KeyError):
+            stale.name
+
+    def test_replace_and_errors(self):
+        replacement = Stop(2, 'New', 0.0, 0.0, ZoneType.MIXED)
+        self.table[2] = replacement
+        self.assertEqual(self.table[2], replacement)
+        self.assertEqual(list(self.table)[2], 2)
+        self.table[2] = self.table[2]
+        self.assertEqual(self.table[2], replacement)
+        with self.assertRaises(ValueError):
+            self.table.append(2, 'Dup', 0, 0, ZoneType.MIXED)
+        with self.assertRaises(TypeError):
+            self.table[100] = 'not a stop'
+        with self.assertRaises(TypeError):
+            self.table.append(100, 'X', 0, 0, 'Mixed')
+
+    def test_from_columns(self):
+        table = StopTable.from_columns(['a', 'b'], ['A', 'B'], [1.0, 2.0], [3.0, 4.0], [0, 1])
+        self.assertEqual(table['b'], Stop('b', 'B', 2.0, 4.0, ZoneType.COMMERCIAL))
+        with self.assertRaises(ValueError):
+            table.extend_columns(['c', 'c'], ['C', 'C'], [0, 0], [0, 0], [0, 0])
+        with self.assertRaises(ValueError):
+            table.extend_columns(['d'], ['D'], [0], [0], [9])
+        with self.assertRaises(ValueError):
+            table.extend_columns(['e'], [], [0], [0], [0])
+        self.assertEqual(len(table), 2)
+
+    def test_names_are_interned(self):
+        table = StopTable.from_columns([1, 2], [''.join(['Ma', 'in']), ''.join(['Ma', 'in'])], [0, 0], [0, 0], [0, 0])
+        self.assertIs(table[1].name, table[2].name)
+
+    def test_stop_has_no_instance_dict(self):
+        stop = Stop(1, 'A', 0.0, 0.0, ZoneType.MIXED)
+        self.assertFalse(hasattr(stop, '__dict__'))
+        self.assertFalse(hasattr(self.table[1], '__dict__'))
+
+    def test_network_backed_by_table(self):
+        network = TransportNetwork(StopTable())
+        for stop in self.stops[:5]:
+            network.add_stop(stop)
+        network.add_route(0, 1, 2.0)
+        self.assertIsInstance(network.get_stop_by_id(0), StopView)
+        self.assertEqual(network.get_stop_by_id(0), self.stops[0])
+        self.assertEqual(network.to_csr().stop_ids, [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            network.add_stop(self.stops[0])
+        network.remove_stop(1)
+        self.assertNotIn(1, network.stops)
+        self.assertEqual(network.adjacency_list[0], [])
+        prefilled = TransportNetwork(StopTable.from_stops(self.stops[:3]))
+        self.assertEqual(prefilled.adjacency_list, {0: [], 1: [], 2: []})
+
+if __name__ == '__main__':
+    unittest.main()
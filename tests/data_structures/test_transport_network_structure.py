@@ -74,5 +74,87 @@ class TestTransportNetworkStructure(unittest.TestCase):
         with patch('builtins.open', mock_open(read_data=csv_content)):
             self.network.load_routes_from_csv('dummy.csv')  # 不会抛异常，只会打印警告
 
+class TestRouteIndex(unittest.TestCase):
+    def setUp(self):
+        self.network = TransportNetwork()
+        for i in range(6):
+            self.network.add_stop(Stop(i, f'S{i}', 0, 0, ZoneType.MIXED))
+        for to_id in (1, 2, 3, 4):
+            self.network.add_route(0, to_id, float(to_id))
+        self.network.add_route(2, 0, 7.0)
+        self.network.add_route(0, 0, 0.5)
+
+    def test_lookup_and_order(self):
+        self.assertTrue(self.network.has_route(0, 3))
+        self.assertFalse(self.network.has_route(3, 0))
+        self.assertFalse(self.network.has_route(99, 0))
+        self.assertEqual(self.network.get_route_distance(2, 0), 7.0)
+        self.assertIsNone(self.network.get_route_distance(1, 2))
+        self.assertEqual(self.network.adjacency_list[0], [(1, 1.0), (2, 2.0), (3, 3.0), (4, 4.0), (0, 0.5)])
+
+    def test_update_route_keeps_position(self):
+        version = self.network.version
+        self.network.update_route(0, 2, 9.0)
+        self.assertEqual(self.network.adjacency_list[0][1], (2, 9.0))
+        self.assertIn((0, 9.0), self.network.reverse_adjacency[2])
+        self.assertGreater(self.network.version, version)
+        self.assertEqual(self.network.to_csr().neighbors(0)[1], (2, 9.0))
+        with self.assertRaises(ValueError):
+            self.network.update_route(1, 2, 1.0)
+        with self.assertRaises(ValueError):
+            self.network.update_route(0, 2, -1.0)
+
+    def test_remove_route_keeps_order(self):
+        self.network.remove_route(0, 2)
+        self.assertEqual(self.network.adjacency_list[0], [(1, 1.0), (3, 3.0), (4, 4.0), (0, 0.5)])
+        self.assertEqual(self.network.reverse_adjacency[2], [])
+        self.network.add_route(0, 2, 2.5)
+        self.assertEqual(self.network.adjacency_list[0][-1], (2, 2.5))
+
+    def test_remove_hub_stop(self):
+        self.network.remove_stop(0)
+        for stop_id in range(1, 6):
+            self.assertEqual(self.network.adjacency_list[stop_id], [])
+            self.assertEqual(self.network.reverse_adjacency[stop_id], [])
+        self.assertNotIn(0, self.network.adjacency_list)
+
+
+class TestBulkInsertion(unittest.TestCase):
+    def test_add_stop_columns(self):
+        from project.data_structures.stop_table import StopTable
+        for network in (TransportNetwork(), TransportNetwork(StopTable())):
+            network.add_stop(Stop(1, 'A', 0, 0, ZoneType.MIXED))
+            version = network.version
+            rejected = network.add_stop_columns([2, 1, 3, 2], ['B', 'A2', 'C', 'B2'], [1, 1, 2, 2], [1, 1, 2, 2],
+                                                [ZoneType.URBAN] * 4)
+            self.assertEqual([index for index, _ in rejected], [1, 3])
+            self.assertEqual(list(network.stops), [1, 2, 3])
+            self.assertEqual(network.get_stop_by_id(3), Stop(3, 'C', 2, 2, ZoneType.URBAN))
+            self.assertEqual(network.adjacency_list[3], [])
+            self.assertEqual(network.version, version + 1)
+
+    def test_add_route_columns_matches_add_route(self):
+        bulk, single = TransportNetwork(), TransportNetwork()
+        for network in (bulk, single):
+            for i in range(4):
+                network.add_stop(Stop(i, f'S{i}', 0, 0, ZoneType.MIXED))
+        routes = [(0, 1, 1.0), (1, 2, 2.0), (0, 1, 5.0), (2, 0, 1.5), (0, 9, 1.0), (3, 3, 0.0), (2, 1, -1.0), (0, 2, 4.0)]
+        single.add_route(3, 0, 7.0)
+        bulk.add_route(3, 0, 7.0)
+        rejected = bulk.add_route_columns([r[0] for r in routes] + [3], [r[1] for r in routes] + [0],
+                                          [r[2] for r in routes] + [1.0])
+        expected = []
+        for i, route in enumerate(routes + [(3, 0, 1.0)]):
+            try:
+                single.add_route(*route)
+            except ValueError as e:
+                expected.append((i, str(e)))
+        self.assertEqual(rejected, expected)
+        self.assertEqual(bulk.adjacency_list, single.adjacency_list)
+        self.assertEqual(bulk.reverse_adjacency, single.reverse_adjacency)
+        with self.assertRaises(ValueError):
+            bulk.add_route_columns([0], [1, 2], [1.0])
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -161,7 +161,8 @@ class TestMainWindowGuiBuilder(unittest.TestCase):
         
         self.gui.on_traffic_period_changed("Morning rush hour")
         
-        self.gui.update_path_info.assert_called_once()
+        # 只按新時段重新評分已找到的路徑，不重新枚舉
+        self.gui.update_path_info.assert_called_once_with(rescore_only=True)
         self.gui.draw_network.assert_called_once()
 
     def test_on_traffic_period_changed_without_selection(self):
@@ -52,6 +52,8 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.display.update_path_info()
         self.assertIn('No path found', self.main_window.path_info.setText.call_args[0][0])
         self.assertTrue(self.main_window.show_only_best_path)
+        # 使用默认搜索方式，与 compare_best_paths 共用同一索引/最短路径树
+        self.main_window.path_analyzer.find_best_path.assert_called_once_with('1', '2')
 
     def test_paths_found_and_compare(self):
         # 多条路径，最短和最高效不同
@@ -74,7 +76,7 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         text = self.main_window.path_info.setText.call_args[0][0]
         self.assertIn('All reachable paths', text)
         self.assertIn('Shortest Path', text)
-        self.assertIn('Most Efficient Path', text)
+        self.assertIn('Fastest Path', text)
         self.assertIn('A → B', text)
         self.assertIn('A → C → B', text)
         self.assertIn('distance: 1.00km', text)
@@ -100,7 +102,7 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.display.update_path_info()
         text = self.main_window.path_info.setText.call_args[0][0]
         self.assertIn('Shortest Path', text)
-        self.assertIn('Most Efficient Path', text)
+        self.assertIn('Fastest Path', text)
         self.assertTrue(self.main_window.paths_are_same)
 
     def test_only_shortest_path(self):
@@ -122,7 +124,7 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.display.update_path_info()
         text = self.main_window.path_info.setText.call_args[0][0]
         self.assertIn('Shortest Path', text)
-        self.assertNotIn('Most Efficient Path', text)
+        self.assertNotIn('Fastest Path', text)
 
     def test_only_efficiency_path(self):
         # 只有最高效路径
@@ -143,7 +145,7 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.display.update_path_info()
         text = self.main_window.path_info.setText.call_args[0][0]
         self.assertNotIn('Shortest Path', text)
-        self.assertIn('Most Efficient Path', text)
+        self.assertIn('Fastest Path', text)
 
     def test_missing_station_name(self):
         # 站点无 name 字段
@@ -185,7 +187,7 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.display.update_path_info()
         text = self.main_window.path_info.setText.call_args[0][0]
         self.assertIn('Shortest Path', text)
-        self.assertIn('Most Efficient Path', text)
+        self.assertIn('Fastest Path', text)
 
     def test_all_paths_none(self):
         self.main_window.path_analyzer.find_all_paths.return_value = []
@@ -342,5 +344,23 @@ class TestPathAnalysisResultDisplay(unittest.TestCase):
         self.assertEqual(self.main_window.best_path, [3, 4])
         self.assertTrue(self.main_window.paths_are_same)
 
+    def test_rescore_only_keeps_enumerated_paths(self):
+        paths = [{'path': ['1', '2'], 'distance': 1.0, 'efficiency': 2.0}]
+        self.main_window.all_paths = paths
+        self.main_window.path_analyzer.score_paths.return_value = [dict(paths[0], efficiency=5.0)]
+        self.main_window.path_analyzer.compare_best_paths.return_value = None
+        self.display.update_path_info(rescore_only=True)
+        self.main_window.path_analyzer.score_paths.assert_called_once_with(paths)
+        self.main_window.path_analyzer.find_all_paths.assert_not_called()
+        self.main_window.path_analyzer.find_best_path.assert_not_called()
+        self.main_window.path_analyzer.compare_best_paths.assert_called_once_with('1', '2')
+        self.assertIn('efficiency: 5.00km/h', self.main_window.path_info.setText.call_args[0][0])
+        # 還沒有找到的路徑時照常枚舉
+        self.main_window.all_paths = []
+        self.main_window.path_analyzer.find_all_paths.return_value = []
+        self.display.update_path_info(rescore_only=True)
+        self.main_window.path_analyzer.find_all_paths.assert_called_once()
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -538,5 +538,37 @@ class TestStationInteractionEventHandler(unittest.TestCase):
         mock_data_manager._convert_string_to_zone_type.assert_called_once_with(test_station_type)
         mock_data_manager._get_wait_time.assert_called_once_with(zone_type)
 
+class TestStationPickingWithSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        from project.data_structures.spatial_index import GridIndex
+        self.main_window = MockMainWindow()
+        self.main_window.data_manager.stations = {
+            '1': {'x': 0, 'y': 0, 'name': 'A', 'type': 'Residential', 'wait_time': 5, 'connections': []},
+            '2': {'x': 100, 'y': 0, 'name': 'B', 'type': 'Mixed', 'wait_time': 3, 'connections': []}
+        }
+        self.main_window.data_manager.distances = {}
+        index = GridIndex(50)
+        for station_id, station in self.main_window.data_manager.stations.items():
+            index.insert(station_id, station['x'], station['y'])
+        self.main_window.data_manager.gui_index = index
+        self.handler = InteractionHandler(self.main_window)
+
+    def test_stations_at_uses_index(self):
+        self.assertEqual(list(self.handler._stations_at(QPointF(3, 4))), ['1'])
+        # Mixed站点直径更大
+        self.assertEqual(list(self.handler._stations_at(QPointF(112, 0))), ['2'])
+        self.assertEqual(list(self.handler._stations_at(QPointF(50, 0))), [])
+        self.main_window.scene.items.assert_not_called()
+
+    def test_click_selects_start_via_index(self):
+        self.handler.handle_station_click(QPointF(1, 1))
+        self.assertEqual(self.main_window.selected_start, '1')
+
+    def test_has_station_near(self):
+        self.assertTrue(self.handler._has_station_near(20, 0, 30))
+        self.assertFalse(self.handler._has_station_near(50, 50, 30))
+
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
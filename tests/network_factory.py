@@ -0,0 +1,31 @@
+import random
+from project.data_structures.stop_entity import Stop, ZoneType
+from project.data_structures.transport_network_structure import TransportNetwork
+
+ZONES = [ZoneType.RESIDENTIAL, ZoneType.COMMERCIAL, ZoneType.INDUSTRIAL, ZoneType.MIXED]
+
+def build_random_network(seed, num_stops, num_routes, int_ids=False, random_zones=False, float_distances=False):
+    """按固定种子生成随机有向网络，供各测试与参考实现比对
+
+    Args:
+        seed: 随机种子
+        num_stops: 站点数
+        num_routes: 尝试添加的线路数，自环与重复线路会被跳过
+        int_ids: 是否使用整数站点ID，否则使用字符串ID
+        random_zones: 是否为站点随机分配区域类型，否则全部为MIXED
+        float_distances: 是否使用[1, 15)内的浮点距离，否则使用1~20的整数距离
+
+    Returns:
+        TransportNetwork: 生成的网络
+    """
+    rng = random.Random(seed)
+    stop_id = int if int_ids else str
+    network = TransportNetwork()
+    for i in range(num_stops):
+        zone = rng.choice(ZONES) if random_zones else ZoneType.MIXED
+        network.add_stop(Stop(stop_id(i), str(i), 0, 0, zone))
+    for _ in range(num_routes):
+        a, b = stop_id(rng.randrange(num_stops)), stop_id(rng.randrange(num_stops))
+        if a != b and not network.has_route(a, b):
+            network.add_route(a, b, rng.uniform(1, 15) if float_distances else rng.randint(1, 20))
+    return network